@@ -0,0 +1,370 @@
+"""
+End-to-end load and latency benchmark for the API, against a local gunicorn.
+
+Creates a fresh database (migrations, seeded menu, benchmarks/datagen.py data), starts gunicorn on
+it and runs each scenario in turn, with --concurrency client threads issuing requests back to
+back over keep-alive sessions, the way the frontend calls the API (CSRF token included):
+
+    register         POST /taste_tailor_register with a new email each time
+    login            POST /taste_tailor_login as a random generated user
+    place_order      POST /place_order with a cart drawn like the generated history
+    get_past_orders  GET  /get_past_orders (the full history, as the past-orders page loads it)
+    submit_review    POST /submit_review on one of the user's order items
+    recommendations  GET  /recommendations?k=10
+
+Scenarios run in the order given and share the database, so get_past_orders also reads what
+place_order added. Each logged-in client thread acts as a different generated user. register and
+login pay the real password hash cost: set PASSWORD_HASH_METHOD / PASSWORD_HASH_BACKEND in the
+environment to benchmark other settings. The first --warmup seconds of
+a scenario are not counted. Results (throughput, p50/p95/p99 latency and status codes per
+scenario, plus the commit and settings) are printed and written as JSON. --compare prints the
+change against an earlier JSON file.
+
+Run from the backEnd directory:
+    python benchmarks/bench_api.py [--scenarios login place_order ...] [--workers 2] [--threads 1]
+        [--concurrency 4] [--seconds 10] [--users 200] [--orders 20] [--output run.json] [--compare base.json]
+
+Pass --url http://host:port to benchmark a server that is already running instead; it must
+hold data generated by datagen.py with at least --concurrency users.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import requests
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, BENCHMARKS_DIR)
+from datagen import BENCH_PASSWORD, OrderGenerator, bench_email  # noqa: E402
+
+SCENARIO_NAMES = ('register', 'login', 'place_order', 'get_past_orders', 'submit_review', 'recommendations')
+PERCENTILES = (50, 95, 99)
+DEFAULT_RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+# Lets the frontend's Host through; the app is configured for localhost:5000
+HOST_HEADER = 'localhost:5000'
+
+
+class ApiClient:
+    """One simulated browser: a keep-alive session with its own cookies and CSRF token."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.session.headers['Host'] = HOST_HEADER
+        token = self.session.get(f"{base_url}/get-csrf-token").json()['csrf_token']
+        self.session.headers['X-CSRFToken'] = token
+
+    def get(self, path, **kwargs):
+        return self.session.get(f"{self.base_url}{path}", allow_redirects=False, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.session.post(f"{self.base_url}{path}", allow_redirects=False, **kwargs)
+
+    def login(self, user_number):
+        response = self.post('/taste_tailor_login', json={'email': bench_email(user_number), 'password': BENCH_PASSWORD})
+        if response.status_code != 200:
+            raise RuntimeError(f"Login as {bench_email(user_number)} failed with {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+
+class Scenario:
+    """
+    setup(client, context, rng) runs once per client thread before timing starts; request(client,
+    context, rng) is the timed call and returns the response.
+    """
+
+    def __init__(self, request, setup=None, logged_in=True):
+        self.request = request
+        self.setup = setup
+        self.logged_in = logged_in
+
+
+def register(client, context, rng):
+    context['registered'] += 1
+    email = f"bench-register-{context['run_id']}-{context['thread']}-{context['registered']}@example.com"
+    return client.post('/taste_tailor_register', json={
+        'firstName': 'Bench', 'lastName': 'Register', 'email': email,
+        'password': BENCH_PASSWORD, 'confirm_password': BENCH_PASSWORD,
+    })
+
+
+def login(client, context, rng):
+    return client.post('/taste_tailor_login', json={'email': bench_email(rng.randrange(context['users'])), 'password': BENCH_PASSWORD})
+
+
+def place_order(client, context, rng):
+    cart = context['generator'].cart(context['favourites'])
+    return client.post('/place_order', json={
+        'cartItems': cart,
+        'deliveryAddress': {'street': '1 Bench St', 'city': 'Benchville'},
+        'orderTotal': round(sum(line['price'] * line['quantity'] for line in cart), 2),
+    })
+
+
+def get_past_orders(client, context, rng):
+    return client.get('/get_past_orders')
+
+
+def load_order_item_ids(client, context, rng):
+    response = client.get('/get_past_orders?limit=100')
+    context['order_item_ids'] = [item['id'] for item in response.json()['items']]
+    if not context['order_item_ids']:
+        raise RuntimeError("submit_review needs users with past orders; generate data with --orders > 0")
+
+
+def submit_review(client, context, rng):
+    return client.post('/submit_review', json={
+        'order_item_id': rng.choice(context['order_item_ids']),
+        'rating': rng.randint(1, 5),
+        'review_comment': 'Benchmark review',
+    })
+
+
+def recommendations(client, context, rng):
+    return client.get('/recommendations?k=10')
+
+
+SCENARIOS = {
+    'register': Scenario(register, logged_in=False),
+    'login': Scenario(login, logged_in=False),
+    'place_order': Scenario(place_order),
+    'get_past_orders': Scenario(get_past_orders),
+    'submit_review': Scenario(submit_review, setup=load_order_item_ids),
+    'recommendations': Scenario(recommendations),
+}
+
+
+def run_client(base_url, scenario, context, seed, warmup_until, deadline, samples, errors):
+    rng = random.Random(seed)
+    try:
+        client = ApiClient(base_url)
+        if scenario.logged_in:
+            client.login(context['thread'] % context['users'])
+        context['favourites'] = context['generator'].favourite_tastes()
+        if scenario.setup is not None:
+            scenario.setup(client, context, rng)
+    except Exception as e:
+        errors.append(f"setup: {e}")
+        return
+
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        try:
+            status = scenario.request(client, context, rng).status_code
+        except requests.RequestException as e:
+            errors.append(str(e))
+            status = 0
+        finished = time.monotonic()
+        if started >= warmup_until:
+            samples.append((finished - started, status))
+
+
+def run_scenario(base_url, name, menu_items, args):
+    samples, errors = [], []
+    started = time.monotonic()
+    warmup_until = started + args.warmup
+    deadline = warmup_until + args.seconds
+    threads = []
+    for thread_number in range(args.concurrency):
+        context = {
+            'thread': thread_number,
+            'users': args.users,
+            'registered': 0,
+            'run_id': f"{os.getpid()}{int(started * 1000)}",
+            'generator': OrderGenerator(menu_items, random.Random(args.seed + thread_number)),
+        }
+        threads.append(threading.Thread(
+            target=run_client,
+            args=(base_url, SCENARIOS[name], context, args.seed * 1000 + thread_number, warmup_until, deadline, samples, errors)))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(samples, errors, args.seconds)
+
+
+def summarize(samples, errors, seconds):
+    latencies_ms = np.asarray([latency for latency, _ in samples]) * 1000
+    status_codes = {}
+    for _, status in samples:
+        status_codes[str(status)] = status_codes.get(str(status), 0) + 1
+    failed = sum(count for status, count in status_codes.items() if not 200 <= int(status) < 400)
+    summary = {
+        'requests': len(samples),
+        'failed': failed,
+        'throughput_rps': round((len(samples) - failed) / seconds, 2),
+        'status_codes': status_codes,
+        'latency_ms': {},
+        'errors': errors[:10],
+    }
+    if len(samples):
+        summary['latency_ms'] = {f"p{p}": round(float(np.percentile(latencies_ms, p)), 2) for p in PERCENTILES}
+        summary['latency_ms']['mean'] = round(float(latencies_ms.mean()), 2)
+        summary['latency_ms']['max'] = round(float(latencies_ms.max()), 2)
+    return summary
+
+
+def git_revision():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--', '.'], cwd=BACKEND_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f"{revision}-dirty" if dirty else revision
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def prepare_server(directory, args):
+    """Builds a fresh database with the generated data and starts gunicorn on it. Returns (process, base_url)."""
+    env = dict(os.environ)
+    env.update({
+        'FLASK_APP': 'app.py',
+        'DATABASE_URL': f"sqlite:///{os.path.join(directory, 'bench.db')}",
+        'UPLOAD_FOLDER': os.path.join(directory, 'uploads'),
+        'OIDC_CACHE_DIR': os.path.join(directory, 'oidc_cache'),
+        # Nothing listens here, so the workers' OpenID prewarm fails at once instead of reaching Google
+        'GOOGLE_OIDC_METADATA_URL': 'http://127.0.0.1:9/.well-known/openid-configuration',
+        'OAUTH_HTTP_RETRIES': '0',
+    })
+    env.setdefault('SECRET_KEY', 'bench')
+    env.setdefault('ALLOWED_EXTENSIONS', 'png,jpg,jpeg')
+    for command in (['flask', 'db', 'upgrade'], ['flask', 'seed-menu'],
+                    [sys.executable, os.path.join(BENCHMARKS_DIR, 'datagen.py'),
+                     '--users', str(args.users), '--orders', str(args.orders), '--seed', str(args.seed)]):
+        result = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(command)} failed:\n{result.stderr}")
+        print(result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ' '.join(command))
+
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers', str(args.workers), '--threads', str(args.threads),
+         '--bind', f"127.0.0.1:{port}", '--log-level', 'warning', 'wsgi:app'],
+        cwd=BACKEND_DIR, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {process.returncode}")
+        try:
+            if requests.get(f"{base_url}/menu", headers={'Host': HOST_HEADER}, timeout=1).status_code == 200:
+                return process, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("gunicorn did not become ready within 60s")
+
+
+def print_report(report, baseline=None):
+    print(f"\n{'scenario':<18}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'failed':>8}{'total':>8}")
+    for name, result in report['scenarios'].items():
+        latency = result['latency_ms']
+        print(f"{name:<18}{result['throughput_rps']:>9.1f}{latency.get('p50', 0):>9.1f}{latency.get('p95', 0):>9.1f}"
+              f"{latency.get('p99', 0):>9.1f}{result['failed']:>8}{result['requests']:>8}")
+        for error in result['errors'][:3]:
+            print(f"    error: {error}")
+
+    if baseline is None:
+        return
+    print(f"\nchange against {baseline['meta']['commit']} ({baseline['meta']['timestamp']}):")
+    print(f"{'scenario':<18}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+
+    def change(new, old):
+        return f"{(new - old) / old * 100:+.0f}%" if old else 'n/a'
+
+    for name, result in report['scenarios'].items():
+        old = baseline['scenarios'].get(name)
+        if old is None or not result['latency_ms'] or not old['latency_ms']:
+            continue
+        print(f"{name:<18}{change(result['throughput_rps'], old['throughput_rps']):>9}"
+              + ''.join(f"{change(result['latency_ms'][f'p{p}'], old['latency_ms'][f'p{p}']):>9}" for p in PERCENTILES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIO_NAMES, default=list(SCENARIO_NAMES))
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=1, help='gunicorn threads per worker')
+    parser.add_argument('--concurrency', type=int, default=4, help='client threads per scenario')
+    parser.add_argument('--seconds', type=float, default=10, help='measured time per scenario')
+    parser.add_argument('--warmup', type=float, default=2, help='unmeasured time before each scenario')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--orders', type=int, default=20, help='past orders per generated user')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--url', default=None, help='benchmark a running server instead of starting one')
+    parser.add_argument('--output', default=None, help=f"JSON report path (default: {os.path.relpath(DEFAULT_RESULTS_DIR, BACKEND_DIR)}/<commit>-<time>.json)")
+    parser.add_argument('--compare', default=None, help='earlier JSON report to compare against')
+    args = parser.parse_args()
+    if args.concurrency > args.users:
+        parser.error('--concurrency cannot exceed --users: each logged-in client thread is a different user')
+
+    process = None
+    directory = tempfile.TemporaryDirectory()
+    try:
+        if args.url:
+            base_url = args.url.rstrip('/')
+        else:
+            process, base_url = prepare_server(directory.name, args)
+
+        menu = requests.get(f"{base_url}/menu", headers={'Host': HOST_HEADER}).json()
+        menu_items = [{'id': item['id'], 'name': item['name'], 'image_url': item['imageUrl'], 'price': item['actualPrice'],
+                       'tastes': item['tastes'], 'recommended': item['recommended']} for item in menu]
+
+        commit = git_revision()
+        report = {
+            'meta': {
+                'commit': commit,
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'server': base_url if args.url else 'gunicorn',
+                'settings': {name: value for name, value in vars(args).items() if name not in ('output', 'compare', 'url')},
+            },
+            'scenarios': {},
+        }
+        for name in args.scenarios:
+            print(f"Running {name}...")
+            report['scenarios'][name] = run_scenario(base_url, name, menu_items, args)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        directory.cleanup()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+    print_report(report, baseline)
+
+    output = args.output
+    if output is None:
+        os.makedirs(DEFAULT_RESULTS_DIR, exist_ok=True)
+        output = os.path.join(DEFAULT_RESULTS_DIR, f"{commit}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"\nWrote {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Concurrency benchmark for the database engine profiles in db_profiles.py.
+
+Starts several worker processes (like gunicorn workers), each with a few threads, that hit
+/place_order, /submit_review and /get_past_orders as different logged-in users against a fresh
+SQLite database. Reports requests per second, p50/p99 latency and how many requests failed
+(for SQLite, mostly "database is locked") for each DB_PROFILE.
+
+Run from the backEnd directory:
+    python benchmarks/bench_db_concurrency.py [--profiles default sqlite] [--processes 4] [--threads 4] [--seconds 10]
+
+The pooled profile needs a server database: pass --database-url postgresql://... and --profiles pooled.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Cheap hashes so registering the benchmark users doesn't dominate the run
+BENCH_ENV = {
+    'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+    'SECRET_KEY': 'bench',
+    'ALLOWED_EXTENSIONS': 'png,jpg,jpeg',
+}
+# Share of requests per route; the rest are reads of the order history
+PLACE_ORDER_SHARE = 0.4
+SUBMIT_REVIEW_SHARE = 0.2
+
+
+def order_payload(rng):
+    return {
+        'cartItems': [{'id': rng.randint(1, 12), 'name': 'Bench item', 'price': 10.0, 'quantity': 1, 'selectedTastes': ['Savory', 'Spicy']}],
+        'deliveryAddress': {'street': '1 Bench St'},
+        'orderTotal': 10.0,
+    }
+
+
+def run_client(user_id, deadline, seed, results):
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app  # noqa: E402
+
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['_user_id'] = str(user_id)
+        flask_session['_fresh'] = True
+
+    rng = random.Random(seed)
+    order_item_ids = []
+    while time.monotonic() < deadline:
+        choice = rng.random()
+        started = time.perf_counter()
+        if choice < PLACE_ORDER_SHARE or not order_item_ids:
+            response = client.post('/place_order', json=order_payload(rng))
+            if response.status_code == 201:
+                order_item_ids.extend(response.get_json()['order_item_ids'])
+        elif choice < PLACE_ORDER_SHARE + SUBMIT_REVIEW_SHARE:
+            response = client.post('/submit_review', json={'order_item_id': rng.choice(order_item_ids), 'rating': rng.randint(1, 5)})
+        else:
+            response = client.get('/get_past_orders?limit=20')
+        results.append((time.perf_counter() - started, response.status_code < 400))
+
+
+def run_process(first_user_id, n_threads, seconds, seed, queue):
+    results = []
+    deadline = time.monotonic() + seconds
+    threads = [threading.Thread(target=run_client, args=(first_user_id + i, deadline, seed + i, results)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    queue.put(results)
+
+
+def prepare_database(n_users):
+    env = dict(os.environ, FLASK_APP='app.py')
+    for command in (['flask', 'db', 'upgrade'], ['flask', 'seed-menu']):
+        subprocess.run(command, cwd=BACKEND_DIR, env=env, check=True, capture_output=True)
+
+    sys.path.insert(0, BACKEND_DIR)
+    code = (
+        "from app import create_app\n"
+        "from extensions import db\n"
+        "from models import Users\n"
+        "with create_app().app_context():\n"
+        f"    users = [Users(firstName='Bench', lastName='User', email=f'bench{{i}}@example.com', password='x') for i in range({n_users})]\n"
+        "    db.session.add_all(users)\n"
+        "    db.session.commit()\n"
+        "    print(min(user.id for user in users))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True)
+    return int(output.stdout.strip().splitlines()[-1])
+
+
+def run_profile(profile, database_url, args):
+    os.environ['DB_PROFILE'] = profile
+    os.environ['DATABASE_URL'] = database_url
+    first_user_id = prepare_database(args.processes * args.threads)
+
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    processes = [
+        context.Process(target=run_process, args=(first_user_id + p * args.threads, args.threads, args.seconds, args.seed + p * 100, queue))
+        for p in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    results = [sample for _ in processes for sample in queue.get()]
+    for process in processes:
+        process.join()
+
+    latencies = np.asarray([latency for latency, _ in results]) * 1000
+    failures = sum(1 for _, ok in results if not ok)
+    return len(results) / args.seconds, np.percentile(latencies, 50), np.percentile(latencies, 99), failures, len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', default=['default', 'sqlite'])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--database-url', default=None, help='server database for the pooled profile')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for name, value in BENCH_ENV.items():
+        os.environ.setdefault(name, value)
+
+    print(f"{'profile':<10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'failed':>10}{'total':>10}")
+    for profile in args.profiles:
+        with tempfile.TemporaryDirectory() as directory:
+            os.environ['UPLOAD_FOLDER'] = os.path.join(directory, 'uploads')
+            database_url = args.database_url if profile == 'pooled' else f"sqlite:///{os.path.join(directory, 'bench.db')}"
+            throughput, p50, p99, failures, total = run_profile(profile, database_url, args)
+            print(f"{profile:<10}{throughput:>10.1f}{p50:>10.1f}{p99:>10.1f}{failures:>10}{total:>10}")
+
+
+if __name__ == '__main__':
+    main()
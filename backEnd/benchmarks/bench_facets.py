@@ -0,0 +1,127 @@
+"""
+Latency benchmark for the facet bitset engine behind /menu/browse (facet_index.py).
+
+Builds the index over synthetic catalogs of 1k, 10k and 100k items and reports p50/p99 latency of
+combined filters with all facet counts, and of reading the first page of matches, next to a
+baseline that filters and counts the item records with Python loops (what the frontend does).
+
+Run from the backEnd directory:
+    python benchmarks/bench_facets.py [--runs 200] [--limit 50]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from facet_index import FACETS, FacetIndex  # noqa: E402
+
+CATALOG_SIZES = (1_000, 10_000, 100_000)
+N_TASTES = 64
+TASTES_PER_ITEM = 3
+N_CUISINES = 40
+FILTER_SETS = (
+    {},
+    {'cuisine': ['cuisine-3'], 'max_fee': ['3']},
+    {'cuisine': ['cuisine-3', 'cuisine-7'], 'price_level': ['2'], 'min_rating': ['4'], 'taste': ['taste-1']},
+    {'taste': ['taste-1', 'taste-2'], 'min_rating': ['4.5'], 'max_fee': ['5']},
+)
+
+
+def make_items(n_items, rng):
+    taste_names = [f"taste-{i}" for i in range(N_TASTES)]
+    return [SimpleNamespace(
+        cuisine=f"cuisine-{rng.randrange(N_CUISINES)}",
+        price_level=rng.randint(1, 4),
+        delivery_fee=round(rng.uniform(0, 6), 2),
+        rating=round(rng.uniform(2.5, 5), 1),
+        tastes=rng.sample(taste_names, TASTES_PER_ITEM),
+    ) for _ in range(n_items)]
+
+
+def matches(item, filters, skip=None):
+    for facet, values in filters.items():
+        if facet == skip or not values:
+            continue
+        if facet == 'cuisine' and item.cuisine not in values:
+            return False
+        if facet == 'price_level' and str(item.price_level) not in values:
+            return False
+        if facet == 'max_fee' and item.delivery_fee > max(map(float, values)):
+            return False
+        if facet == 'min_rating' and item.rating < min(map(float, values)):
+            return False
+        if facet == 'taste' and not set(values) <= set(item.tastes):
+            return False
+    return True
+
+
+def scan_query(items, filters):
+    """Baseline: one pass over the records for the results, and one per facet for its counts."""
+    matched = [item for item in items if matches(item, filters)]
+    counts = {}
+    for facet in ('cuisine', 'price_level'):
+        facet_counts = counts[facet] = {}
+        for item in items:
+            if matches(item, filters, skip=facet):
+                value = item.cuisine if facet == 'cuisine' else str(item.price_level)
+                facet_counts[value] = facet_counts.get(value, 0) + 1
+    return matched, counts
+
+
+def percentiles(samples):
+    samples_ms = sorted(sample * 1000 for sample in samples)
+    return samples_ms[len(samples_ms) // 2], samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.99))]
+
+
+def time_runs(function, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=50, help='items read from the matches (one page)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'items':>8}  {'scenario':<32}{'p50 ms':>10}{'p99 ms':>10}")
+    for n_items in CATALOG_SIZES:
+        items = make_items(n_items, rng)
+        started = time.perf_counter()
+        index = FacetIndex(items)
+        n_values = sum(len(index.values[facet]) for facet in FACETS)
+        print(f"{n_items:>8}  {'build (' + str(n_values) + ' bitsets)':<32}{(time.perf_counter() - started) * 1000:>10.1f}")
+
+        def bitset_query():
+            for filters in FILTER_SETS:
+                matched, _ = index.query(filters)
+                index.positions(matched, 0, args.limit)
+                index.count(matched)
+
+        def scan():
+            for filters in FILTER_SETS:
+                scan_query(items, filters)
+
+        # The scan takes about half a second per run at 100k items, so it gets fewer runs
+        scan_runs = max(3, args.runs * 100 // n_items)
+        scenarios = (
+            ('bitsets: filter + counts + page', bitset_query, args.runs),
+            ('record scan (baseline)', scan, scan_runs),
+        )
+        for name, function, runs in scenarios:
+            p50, p99 = time_runs(function, runs)
+            # Per query: each run answers every filter set
+            print(f"{n_items:>8}  {name:<32}{p50 / len(FILTER_SETS):>10.3f}{p99 / len(FILTER_SETS):>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Throughput benchmark for password verification in password_hashing.py.
+
+Verifies one password from several threads at once (as a threaded gunicorn worker would on a burst
+of logins) and reports logins per second and p50/p99 latency for the inline and process backends.
+
+Run from the backEnd directory:
+    python benchmarks/bench_login.py [--requests 64] [--threads 1 4 8] [--method pbkdf2:sha256]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from password_hashing import PasswordHasher  # noqa: E402
+
+PASSWORD = 'correct horse battery staple'
+
+
+def percentiles(samples):
+    samples_ms = np.asarray(samples) * 1000
+    return np.percentile(samples_ms, 50), np.percentile(samples_ms, 99)
+
+
+def run_logins(hasher, password_hash, n_requests, n_threads):
+    def login():
+        started = time.perf_counter()
+        assert hasher.verify(password_hash, PASSWORD)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_threads) as threads:
+        samples = list(threads.map(lambda _: login(), range(n_requests)))
+    elapsed = time.perf_counter() - started
+    return n_requests / elapsed, *percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--method', default='pbkdf2:sha256')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"{'backend':<10}{'threads':>8}{'logins/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for backend in ('inline', 'process'):
+        hasher = PasswordHasher(method=args.method, backend=backend, workers=args.workers,
+                                max_pending=args.requests, queue_timeout=None)
+        try:
+            password_hash = hasher.hash(PASSWORD)
+            # Warm up so process start-up isn't counted as login latency
+            run_logins(hasher, password_hash, hasher.workers, hasher.workers)
+            for n_threads in args.threads:
+                throughput, p50, p99 = run_logins(hasher, password_hash, args.requests, n_threads)
+                print(f"{backend:<10}{n_threads:>8}{throughput:>12.1f}{p50:>10.1f}{p99:>10.1f}")
+        finally:
+            hasher.shutdown()
+
+
+if __name__ == '__main__':
+    main()
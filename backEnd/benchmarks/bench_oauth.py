@@ -0,0 +1,109 @@
+"""
+Offline load test for the /google/ and /facebook/ login flows.
+
+Starts benchmarks/mock_oauth_provider.py in-process, points the backend at it and runs complete
+logins (redirect, provider approval, callback with token exchange, ID token check or Graph API /me)
+from several threads. Reports logins per second and p50/p99 per provider, plus what the backend's
+outbound pool did: requests and mean latency per host, and how many connections the provider saw.
+
+Run from the backEnd directory:
+    python benchmarks/bench_oauth.py [--logins 200] [--threads 8] [--latency-ms 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mock_oauth_provider import serve  # noqa: E402
+
+SUCCESS_REDIRECTS = {
+    'google': 'http://localhost:3000/auth/google',
+    'facebook': 'http://localhost:3000/auth/facebook',
+}
+
+
+def percentiles(samples):
+    samples_ms = np.asarray(samples) * 1000
+    return np.percentile(samples_ms, 50), np.percentile(samples_ms, 99)
+
+
+def run_login(app, provider, provider_name, user_number):
+    client = app.test_client()
+    started = time.perf_counter()
+    response = client.get(f'/{provider_name}/')
+    # Play the browser at the provider: approve directly instead of another HTTP hop
+    authorize_query = {name: values[0] for name, values in parse_qs(urlparse(response.headers['Location']).query).items()}
+    authorize_query['login_hint'] = f"{provider_name}-user-{user_number}"
+    callback = urlparse(provider.authorize(authorize_query))
+    response = client.get(f"{callback.path}?{callback.query}")
+    elapsed = time.perf_counter() - started
+    return elapsed, response.headers.get('Location') == SUCCESS_REDIRECTS[provider_name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=200, help='logins per provider')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--users', type=int, default=50, help='distinct accounts per provider (repeat logins reuse them)')
+    parser.add_argument('--latency-ms', type=float, default=20, help='delay the mock provider adds to every response')
+    parser.add_argument('--port', type=int, default=5099)
+    args = parser.parse_args()
+
+    server, provider = serve(port=args.port, latency=args.latency_ms / 1000)
+    base_url = f"http://127.0.0.1:{args.port}"
+    directory = tempfile.mkdtemp()
+    os.environ.update({
+        'GOOGLE_OIDC_METADATA_URL': f"{base_url}/.well-known/openid-configuration",
+        'FACEBOOK_GRAPH_URL': f"{base_url}/graph/",
+        'FACEBOOK_DIALOG_URL': f"{base_url}/dialog/oauth",
+        'GOOGLE_CLIENT_ID': 'mock-client', 'GOOGLE_CLIENT_SECRET': 'mock-secret',
+        'FACEBOOK_CLIENT_ID': 'mock-client', 'FACEBOOK_CLIENT_SECRET': 'mock-secret',
+        'DATABASE_URL': f"sqlite:///{os.path.join(directory, 'bench.db')}",
+        'OIDC_CACHE_DIR': os.path.join(directory, 'oidc_cache'),
+        'UPLOAD_FOLDER': os.path.join(directory, 'uploads'),
+        'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+    })
+    os.environ.setdefault('SECRET_KEY', 'bench')
+    os.environ.setdefault('ALLOWED_EXTENSIONS', 'png,jpg,jpeg')
+
+    from app import create_app
+    from extensions import google_oidc, init_migrations, outbound_http
+    from flask_migrate import upgrade
+    app = create_app()
+    init_migrations(app)
+    with app.app_context():
+        upgrade(directory=os.path.join(BACKEND_DIR, 'migrations'))
+        google_oidc.prewarm()
+
+    print(f"{'provider':<10}{'logins/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'failed':>8}")
+    for provider_name in ('google', 'facebook'):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as threads:
+            results = list(threads.map(lambda n: run_login(app, provider, provider_name, n % args.users), range(args.logins)))
+        elapsed = time.perf_counter() - started
+        p50, p99 = percentiles([seconds for seconds, _ in results])
+        failed = sum(1 for _, ok in results if not ok)
+        print(f"{provider_name:<10}{args.logins / elapsed:>10.1f}{p50:>10.1f}{p99:>10.1f}{failed:>8}")
+
+    print()
+    with app.app_context():
+        outbound_stats = outbound_http.stats.snapshot()
+    for host, stats in outbound_stats.items():
+        print(f"outbound {host}: {stats['count']} requests, {stats['failures']} failed, "
+              f"mean {stats['seconds'] / stats['count'] * 1000:.1f} ms")
+    print(f"provider: {provider.hits['connections']} connections opened for "
+          f"{sum(count for path, count in provider.hits.items() if path != 'connections')} requests")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Latency benchmark for the blocked top-k scoring engine in recommender.py.
+
+Scores a synthetic catalog of 1k, 10k and 100k items for random users and reports p50/p99 latency,
+with and without pre-filters, next to a full-sort baseline.
+
+Run from the backEnd directory:
+    python benchmarks/bench_scoring.py [--runs 200] [--k 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import recommender  # noqa: E402
+
+CATALOG_SIZES = (1_000, 10_000, 100_000)
+N_TASTES = 64
+TASTES_PER_ITEM = 3
+N_CUISINES = 12
+
+
+def make_catalog(n_items, rng):
+    taste_names = [f"taste-{i}" for i in range(N_TASTES)]
+    taste_index = {name: column for column, name in enumerate(taste_names)}
+    item_tastes = [rng.choice(taste_names, size=TASTES_PER_ITEM, replace=False) for _ in range(n_items)]
+    return {
+        'taste_index': taste_index,
+        'taste_matrix': recommender.build_item_matrix(item_tastes, taste_index),
+        'cuisine_codes': rng.integers(0, N_CUISINES, size=n_items).astype(np.int32),
+        'price_levels': rng.integers(1, 4, size=n_items).astype(np.int8),
+        'delivery_fees': np.round(rng.uniform(0, 6, size=n_items), 2),
+    }
+
+
+def make_user_vector(rng):
+    vector = np.zeros(N_TASTES, dtype=np.float32)
+    liked = rng.choice(N_TASTES, size=8, replace=False)
+    vector[liked] = rng.integers(1, 6, size=liked.size) / recommender.MAX_RATING
+    return vector
+
+
+def full_sort_top_k(user_vector, item_matrix, k):
+    scores = item_matrix @ user_vector
+    return np.argsort(-scores, kind='stable')[:k]
+
+
+def percentiles(samples):
+    samples_ms = np.asarray(samples) * 1000
+    return np.percentile(samples_ms, 50), np.percentile(samples_ms, 99)
+
+
+def time_runs(function, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'items':>8}  {'scenario':<24}{'p50 ms':>10}{'p99 ms':>10}")
+    for n_items in CATALOG_SIZES:
+        catalog = make_catalog(n_items, rng)
+        user_vector = make_user_vector(rng)
+        mask = recommender.build_filter_mask(
+            n_items,
+            cuisine_codes=catalog['cuisine_codes'], cuisine_code=3,
+            price_levels=catalog['price_levels'], price_level=2,
+            delivery_fees=catalog['delivery_fees'], max_delivery_fee=3.0,
+        )
+        scenarios = (
+            ('full sort (baseline)', lambda: full_sort_top_k(user_vector, catalog['taste_matrix'], args.k)),
+            ('blocked top-k', lambda: recommender.blocked_top_k(user_vector, catalog['taste_matrix'], args.k)),
+            ('blocked top-k + filters', lambda: recommender.blocked_top_k(user_vector, catalog['taste_matrix'], args.k, mask=mask)),
+        )
+        for name, function in scenarios:
+            p50, p99 = time_runs(function, args.runs)
+            print(f"{n_items:>8}  {name:<24}{p50:>10.3f}{p99:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+Synthetic data for benchmarks: N users with M past orders each, drawn from the seeded menu.
+
+Every user has a few favourite tastes, picked with a Zipf-like skew so popular tastes (Spicy,
+Savory...) dominate the way they do on the real menu. Orders favour items sharing those tastes,
+most items end up rated, and ratings run higher when an item matches the user's taste. Order
+times are spread over the past year. Taste profiles are rebuilt at the end, so
+/recommendations sees the same state the API would have produced.
+
+All users share one password (BENCH_PASSWORD) and the email bench-<n>@example.com, n from 0.
+The generator is deterministic for a given --seed.
+
+Run from the backEnd directory, after `flask db upgrade` and `flask seed-menu`:
+    python benchmarks/datagen.py [--users 1000] [--orders 20] [--seed 0]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_PASSWORD = 'Bench-pass1!'
+BENCH_EMAIL = 'bench-{}@example.com'
+# Favourite tastes per user, and how much a favourite raises an item's chance of being ordered
+FAVOURITE_TASTES = 3
+FAVOURITE_WEIGHT = 4.0
+MAX_ITEMS_PER_ORDER = 4
+RATED_SHARE = 0.7
+HISTORY_DAYS = 365
+# Rows per INSERT round trip
+BATCH_SIZE = 5000
+
+
+def bench_email(user_number):
+    return BENCH_EMAIL.format(user_number)
+
+
+def zipf_weights(n, exponent=1.1):
+    return [1.0 / (rank + 1) ** exponent for rank in range(n)]
+
+
+class OrderGenerator:
+    """Draws users' favourite tastes, carts and ratings from the menu catalog."""
+
+    def __init__(self, menu_items, rng):
+        self.menu_items = menu_items
+        self.rng = rng
+        taste_counts = {}
+        for item in menu_items:
+            for taste in item['tastes']:
+                taste_counts[taste] = taste_counts.get(taste, 0) + 1
+        # Most common tastes first, so the Zipf skew follows the menu
+        self.tastes = sorted(taste_counts, key=lambda taste: (-taste_counts[taste], taste))
+        self.taste_weights = zipf_weights(len(self.tastes))
+
+    def favourite_tastes(self):
+        favourites = set()
+        while len(favourites) < min(FAVOURITE_TASTES, len(self.tastes)):
+            favourites.add(self.rng.choices(self.tastes, weights=self.taste_weights)[0])
+        return favourites
+
+    def cart(self, favourites):
+        weights = [1.0 + FAVOURITE_WEIGHT * len(favourites.intersection(item['tastes'])) for item in self.menu_items]
+        n_items = self.rng.randint(1, MAX_ITEMS_PER_ORDER)
+        cart = []
+        for item in self.rng.choices(self.menu_items, weights=weights, k=n_items):
+            # Like the frontend, the customer picks some of the item's tastes and recommended sides
+            tastes = [taste for taste in item['tastes'] if taste in favourites or self.rng.random() < 0.3] or [item['tastes'][0]]
+            recommended = [side for side in item['recommended'] if self.rng.random() < 0.3]
+            cart.append({
+                'id': item['id'],
+                'name': item['name'],
+                'imageUrl': item['image_url'],
+                'price': item['price'],
+                'quantity': self.rng.randint(1, 3),
+                'selectedTastes': tastes,
+                'selectedRecommended': recommended,
+            })
+        return cart
+
+    def rating(self, favourites, tastes):
+        if self.rng.random() >= RATED_SHARE:
+            return 0
+        matches = len(favourites.intersection(tastes))
+        return max(1, min(5, round(self.rng.gauss(2.5 + matches, 0.8))))
+
+
+def chunks(rows, size=BATCH_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def generate(n_users, orders_per_user, seed=0, log=print):
+    """
+    Adds the users and orders to the database of the current app context. Rows are written with
+    bulk INSERTs rather than through the API, so large datasets take seconds, not minutes.
+    Returns the id of the first generated user.
+    """
+    from extensions import db, password_hasher
+    from models import MenuItem, Order, OrderItem, Users, get_or_create_tastes, order_item_tastes, rebuild_taste_profile_rows
+
+    rng = random.Random(seed)
+    menu_items = [{
+        'id': item.id, 'name': item.name, 'image_url': item.image_url, 'price': item.price,
+        'tastes': json.loads(item.tastes) if item.tastes else [],
+        'recommended': json.loads(item.recommended) if item.recommended else [],
+    } for item in MenuItem.query.order_by(MenuItem.id)]
+    if not menu_items:
+        raise RuntimeError("The menu is empty; run `flask seed-menu` first")
+    generator = OrderGenerator(menu_items, rng)
+    tastes_by_name = get_or_create_tastes(generator.tastes)
+    db.session.commit()
+    taste_ids = {name: taste.id for name, taste in tastes_by_name.items()}
+
+    started = time.perf_counter()
+    # One hash for everyone; hashing per user would dominate generation time
+    password_hash = password_hasher.hash(BENCH_PASSWORD)
+    first_user_id = (db.session.query(db.func.max(Users.id)).scalar() or 0) + 1
+    next_order_id = (db.session.query(db.func.max(Order.id)).scalar() or 0) + 1
+    next_item_id = (db.session.query(db.func.max(OrderItem.id)).scalar() or 0) + 1
+    first_email = db.session.query(db.func.count(Users.id)).filter(Users.email.like(BENCH_EMAIL.format('%'))).scalar()
+
+    users, orders, items, links = [], [], [], []
+    now = datetime.now()
+    for user_offset in range(n_users):
+        user_id = first_user_id + user_offset
+        users.append({'id': user_id, 'firstName': 'Bench', 'lastName': f"User{first_email + user_offset}",
+                      'email': bench_email(first_email + user_offset), 'password': password_hash, 'data_version': 0})
+        favourites = generator.favourite_tastes()
+        order_times = sorted(now - timedelta(seconds=rng.uniform(0, HISTORY_DAYS * 86400)) for _ in range(orders_per_user))
+        for placed_at in order_times:
+            cart = generator.cart(favourites)
+            total = round(sum(line['price'] * line['quantity'] for line in cart), 2)
+            orders.append({'id': next_order_id, 'user_id': user_id, 'placed_at': placed_at, 'total': total,
+                           'delivery_address': json.dumps({'street': f"{user_offset} Bench St", 'city': 'Benchville'})})
+            for line in cart:
+                items.append({
+                    'id': next_item_id, 'user_id': user_id, 'order_id': next_order_id,
+                    'item_name': line['name'], 'item_image_url': line['imageUrl'], 'quantity': line['quantity'],
+                    'price_per_item': line['price'], 'total_item_price': line['price'] * line['quantity'],
+                    'delivered_date': placed_at,
+                    'taste_selection': json.dumps(line['selectedTastes']),
+                    'recommended_selection': json.dumps(line['selectedRecommended']),
+                    'rating': generator.rating(favourites, line['selectedTastes']),
+                    'review_comment': None,
+                })
+                links.extend({'order_item_id': next_item_id, 'taste_id': taste_ids[name]} for name in dict.fromkeys(line['selectedTastes']))
+                next_item_id += 1
+            next_order_id += 1
+
+    for table, rows in ((Users.__table__, users), (Order.__table__, orders), (OrderItem.__table__, items), (order_item_tastes, links)):
+        for batch in chunks(rows):
+            db.session.execute(table.insert(), batch)
+    rebuild_taste_profile_rows()
+    db.session.commit()
+    log(f"Generated {len(users)} users, {len(orders)} orders and {len(items)} order items "
+        f"in {time.perf_counter() - started:.1f}s (first user id {first_user_id}).")
+    return first_user_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--orders', type=int, default=20, help='past orders per user')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app
+    with create_app().app_context():
+        generate(args.users, args.orders, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
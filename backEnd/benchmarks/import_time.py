@@ -0,0 +1,102 @@
+"""
+Cold-start report: how long building the app takes and which imports account for it.
+
+Runs `python -X importtime` on a fresh interpreter that calls create_app() (what a gunicorn worker
+does when it boots), repeated a few times, and prints the median total and the slowest top-level
+packages of the last run. Heavy dependencies that should load lazily (authlib, alembic, numpy,
+requests, PIL) are flagged if they show up at boot.
+
+Run from the backEnd directory:
+    python benchmarks/import_time.py [--runs 5] [--top 15] [--json report.json] [--max-ms 600]
+
+--max-ms exits non-zero when the median exceeds it, so the report can gate a CI step.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Packages create_app() is expected not to import
+LAZY_PACKAGES = ('authlib', 'flask_migrate', 'alembic', 'numpy', 'requests', 'PIL')
+BOOT_CODE = "from app import create_app; create_app()"
+
+
+def parse_importtime(stderr):
+    """Returns {module: (self_us, cumulative_us)} from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        modules[name] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def package_times(modules):
+    """Self time per top-level package, summed over all of its modules (so submodules imported later count too)."""
+    packages = {}
+    for name, (self_us, _) in modules.items():
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0) + self_us
+    return packages
+
+
+def run_once(env):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', BOOT_CODE],
+                            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+    return time.perf_counter() - started, parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--json', default=None, help='also write the report to this file')
+    parser.add_argument('--max-ms', type=float, default=None, help='fail when the median boot time exceeds this')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    env = dict(os.environ)
+    env.setdefault('SECRET_KEY', 'import-time')
+    env.setdefault('UPLOAD_FOLDER', os.path.join(directory, 'uploads'))
+    env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(directory, 'import_time.db')}")
+
+    # The first run warms the bytecode and OS file caches and isn't counted
+    run_once(env)
+    samples = [run_once(env) for _ in range(args.runs)]
+    wall_ms = statistics.median(seconds for seconds, _ in samples) * 1000
+    modules = samples[-1][1]
+    packages = sorted(package_times(modules).items(), key=lambda item: item[1], reverse=True)
+    imports_ms = modules.get('app', (0, 0))[1] / 1000
+    eager = [package for package in LAZY_PACKAGES if package in modules]
+
+    print(f"boot (interpreter + create_app), median of {args.runs}: {wall_ms:.0f} ms")
+    print(f"imports of app.py: {imports_ms:.0f} ms, {len(modules)} modules")
+    print(f"\n{'package':<30}{'self ms':>10}")
+    for package, self_us in packages[:args.top]:
+        print(f"{package:<30}{self_us / 1000:>10.1f}")
+    print(f"\nloaded at boot that should be lazy: {', '.join(eager) or 'none'}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({
+                'boot_ms': wall_ms,
+                'app_imports_ms': imports_ms,
+                'modules': len(modules),
+                'packages_ms': {package: self_us / 1000 for package, self_us in packages},
+                'eager_lazy_packages': eager,
+            }, file, indent=2)
+
+    if args.max_ms is not None and wall_ms > args.max_ms:
+        sys.exit(f"boot took {wall_ms:.0f} ms, over the {args.max_ms:.0f} ms budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+"""
+Local stand-in for the Google (OpenID Connect) and Facebook (Graph API) login endpoints, for testing
+and load-testing the /google/ and /facebook/ flows offline.
+
+Google: discovery metadata, a JWKS, an authorization endpoint that approves immediately, and a token
+endpoint that returns RS256-signed ID tokens. Facebook: the OAuth dialog, the access token exchange
+and Graph API /me, under /dialog/oauth and /graph/. /stats reports how often each path was hit and
+how many connections were opened, which shows whether the backend's caches and keep-alive pool work.
+
+Run it, then start the backend pointed at it:
+    python benchmarks/mock_oauth_provider.py [--port 5099] [--latency-ms 0]
+    GOOGLE_OIDC_METADATA_URL=http://127.0.0.1:5099/.well-known/openid-configuration \\
+    FACEBOOK_GRAPH_URL=http://127.0.0.1:5099/graph/ FACEBOOK_DIALOG_URL=http://127.0.0.1:5099/dialog/oauth \\
+        GOOGLE_CLIENT_ID=mock-client GOOGLE_CLIENT_SECRET=mock-secret \\
+        FACEBOOK_CLIENT_ID=mock-client FACEBOOK_CLIENT_SECRET=mock-secret python app.py
+
+Both authorization endpoints sign in as ?login_hint=<id> when given, otherwise as a new user each time.
+"""
+import argparse
+import itertools
+import json
+import secrets
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from authlib.jose import JsonWebKey, jwt
+
+KEY_ID = 'mock-key-1'
+TOKEN_LIFETIME = 3600
+
+
+class MockProvider:
+    def __init__(self, base_url, latency=0.0):
+        self.base_url = base_url.rstrip('/')
+        self.latency = latency
+        self.key = JsonWebKey.generate_key('RSA', 2048, is_private=True, options={'kid': KEY_ID})
+        self.hits = Counter()
+        self._codes = {}
+        self._access_tokens = {}
+        self._user_numbers = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def metadata(self):
+        return {
+            'issuer': self.base_url,
+            'authorization_endpoint': f"{self.base_url}/o/oauth2/auth",
+            'token_endpoint': f"{self.base_url}/token",
+            'userinfo_endpoint': f"{self.base_url}/userinfo",
+            'jwks_uri': f"{self.base_url}/certs",
+            'response_types_supported': ['code'],
+            'subject_types_supported': ['public'],
+            'id_token_signing_alg_values_supported': ['RS256'],
+            'token_endpoint_auth_methods_supported': ['client_secret_post', 'client_secret_basic'],
+        }
+
+    def jwks(self):
+        return {'keys': [self.key.as_dict(is_private=False)]}
+
+    def authorize(self, query):
+        # Approve straight away and remember what the ID token must carry
+        user_id = query.get('login_hint') or f"mock-user-{next(self._user_numbers)}"
+        code = secrets.token_urlsafe(16)
+        with self._lock:
+            self._codes[code] = {'sub': user_id, 'nonce': query.get('nonce'), 'aud': query.get('client_id')}
+        params = {'code': code}
+        if 'state' in query:
+            params['state'] = query['state']
+        return f"{query['redirect_uri']}?{urlencode(params)}"
+
+    def grant(self, form):
+        with self._lock:
+            return self._codes.pop(form.get('code'), None)
+
+    def token(self, form):
+        grant = self.grant(form)
+        if grant is None:
+            return None
+        now = int(time.time())
+        claims = {
+            'iss': self.base_url,
+            'sub': grant['sub'],
+            'aud': grant['aud'] or form.get('client_id'),
+            'iat': now,
+            'exp': now + TOKEN_LIFETIME,
+            'email': f"{grant['sub']}@example.com",
+            'email_verified': True,
+            'name': f"Mock {grant['sub']}",
+            'picture': None,
+        }
+        if grant['nonce']:
+            claims['nonce'] = grant['nonce']
+        id_token = jwt.encode({'alg': 'RS256', 'kid': KEY_ID}, claims, self.key).decode('ascii')
+        return {
+            'access_token': secrets.token_urlsafe(24),
+            'token_type': 'Bearer',
+            'expires_in': TOKEN_LIFETIME,
+            'scope': 'openid email profile',
+            'id_token': id_token,
+        }
+
+    def facebook_token(self, form):
+        grant = self.grant(form)
+        if grant is None:
+            return None
+        access_token = secrets.token_urlsafe(24)
+        with self._lock:
+            self._access_tokens[access_token] = grant['sub']
+        return {'access_token': access_token, 'token_type': 'bearer', 'expires_in': TOKEN_LIFETIME}
+
+    def facebook_me(self, access_token):
+        with self._lock:
+            user_id = self._access_tokens.get(access_token)
+        if user_id is None:
+            return None
+        return {
+            'id': user_id,
+            'name': f"Mock {user_id}",
+            'email': f"{user_id}@example.com",
+            'picture': {'data': {'url': f"{self.base_url}/pictures/{user_id}.jpg"}},
+        }
+
+
+def make_handler(provider):
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive, so clients that pool connections can reuse them
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            provider.hits['connections'] += 1
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status, body):
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def route(self, method):
+            url = urlparse(self.path)
+            provider.hits[url.path] += 1
+            if provider.latency:
+                time.sleep(provider.latency)
+            query = {name: values[0] for name, values in parse_qs(url.query).items()}
+
+            if method == 'GET' and url.path == '/.well-known/openid-configuration':
+                return self.send_json(200, provider.metadata())
+            if method == 'GET' and url.path == '/certs':
+                return self.send_json(200, provider.jwks())
+            if method == 'GET' and url.path in ('/o/oauth2/auth', '/dialog/oauth'):
+                self.send_response(302)
+                self.send_header('Location', provider.authorize(query))
+                self.send_header('Content-Length', '0')
+                return self.end_headers()
+            if method == 'POST' and url.path in ('/token', '/graph/oauth/access_token'):
+                length = int(self.headers.get('Content-Length') or 0)
+                form = {name: values[0] for name, values in parse_qs(self.rfile.read(length).decode('utf-8')).items()}
+                token = provider.token(form) if url.path == '/token' else provider.facebook_token(form)
+                if token is None:
+                    return self.send_json(400, {'error': 'invalid_grant'})
+                return self.send_json(200, token)
+            if method == 'GET' and url.path == '/graph/me':
+                access_token = query.get('access_token') or self.headers.get('Authorization', '').partition(' ')[2]
+                me = provider.facebook_me(access_token)
+                if me is None:
+                    return self.send_json(401, {'error': {'message': 'Invalid OAuth access token'}})
+                return self.send_json(200, me)
+            if method == 'GET' and url.path == '/stats':
+                return self.send_json(200, dict(provider.hits))
+            return self.send_json(404, {'error': 'not_found'})
+
+        def do_GET(self):
+            self.route('GET')
+
+        def do_POST(self):
+            self.route('POST')
+
+    return Handler
+
+
+def serve(host='127.0.0.1', port=5099, latency=0.0):
+    """Starts the provider on a background thread and returns (server, provider)."""
+    provider = MockProvider(f"http://{host}:{port}", latency=latency)
+    server = ThreadingHTTPServer((host, port), make_handler(provider))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, provider
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay added to every response, to mimic a remote provider')
+    args = parser.parse_args()
+
+    server, _ = serve(args.host, args.port, args.latency_ms / 1000)
+    print(f"Mock OpenID provider on http://{args.host}:{args.port}/.well-known/openid-configuration")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
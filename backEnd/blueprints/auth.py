@@ -0,0 +1,184 @@
+import hashlib
+from functools import wraps
+
+from flask import Blueprint, current_app, g, jsonify, redirect, request
+from flask_login import current_user, login_required, login_user, logout_user
+from flask_wtf.csrf import generate_csrf
+
+from extensions import db, login_manager, password_hasher, user_cache
+from form import RegistrationForm # Assuming form.py is in the same directory or accessible
+from models import Users
+from user_cache import UserRecord
+
+bp = Blueprint('auth', __name__)
+
+@login_manager.user_loader
+def load_user(user_id):
+    # Served from the per-worker cache, so authenticated requests skip the users-table lookup
+    return user_cache.get(int(user_id), lambda key: UserRecord.from_user(Users.query.get_or_404(key)))
+
+def user_data_etag(view):
+    """
+    Tags the view's response with the current user's data version and answers a matching
+    If-None-Match with 304 before the view runs. Must be applied below @login_required.
+    """
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        # Read in the same transaction the view then reads from, so the tag never runs ahead of the data
+        g.user_data_version = db.session.query(Users.data_version).filter_by(id=current_user.id).scalar()
+        # Each query string (page, format, grouping) is a different representation with its own tag
+        etag = f"{current_user.id}-{g.user_data_version}-{hashlib.sha1(request.query_string).hexdigest()[:12]}"
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304) # Not Modified
+        else:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapped
+
+# --- NEW ENDPOINT TO GET CSRF TOKEN ---
+@bp.route('/get-csrf-token', methods=['GET'])
+def get_csrf():
+    """Endpoint to provide a CSRF token to the frontend."""
+    # generate_csrf() requires a SECRET_KEY to be set in Flask config
+    # When generate_csrf() is called, Flask-WTF stores a token in the session.
+    token = generate_csrf()
+    return jsonify({'csrf_token': token})
+# --- END NEW ENDPOINT ---
+
+@bp.route('/taste_tailor_register', methods=["POST"])
+def register():
+    json_data = request.get_json()
+    form = RegistrationForm(data=json_data)
+
+    if form.validate():
+        firstName = form.firstName.data
+        lastName = form.lastName.data
+        email = form.email.data
+        password = form.password.data
+
+        # Check if email already exists
+        # Note: Users model has unique=False for email. Consider changing this.
+        if Users.query.filter_by(email=email).first():
+            return jsonify({"message": "Email address is already registered."}), 409 # Conflict status code
+
+        # Hash the password
+        hashed_password = password_hasher.hash(password)
+
+        # Create a new user instance
+        new_user = Users(firstName=firstName, lastName=lastName, email=email, password=hashed_password)
+
+        # Add the new user to the database session and commit
+        db.session.add(new_user)
+        db.session.commit()
+
+        # Return success response
+        return jsonify({"message": "Registration successful."}), 201 # Created status code
+
+    else:
+        # If form validation fails, return validation errors
+        errors = {}
+        for field, error_list in form.errors.items():
+            errors[field] = error_list
+        # Return all errors, including csrf_token if present
+        # Exclude csrf_token error from the response shown to the user if it's the only error
+        # This logic was slightly off in the PDF, correcting it.
+        if 'csrf_token' in errors and len(errors) == 1:
+             return jsonify({'message': 'Validation failed (CSRF token missing).'}), 400
+        return jsonify({'errors': errors, 'message': 'Validation failed'}), 400
+
+#Modified to accept GET requests as well
+@bp.route("/taste_tailor_login", methods=["GET", "POST"])
+def login():
+    if request.method == "POST":
+        data = request.get_json()
+        if not data:
+            return jsonify({"message": "Invalid JSON data"}), 400
+
+        email = data.get("email")
+        password = data.get("password")
+
+        if not email or not password:
+            return jsonify({"message": "Username and password are required"}), 400
+
+        user = Users.query.filter_by(email=email).first()
+
+        if not user:
+            return jsonify({"message": "The user with the provided email didn't exist"}), 409
+        
+        if user and user.check_password(password):
+            # Upgrade hashes made with an older method or cost while the plain password is at hand
+            if password_hasher.needs_rehash(user.password):
+                user.set_password(password)
+                db.session.commit()
+            login_user(user)
+            #Flask-Login handles setting the session cookie here
+            login_response = {
+                'message': 'Login successful',
+                'profile': f'Welcome, {user.firstName}', # Corrected f-string syntax
+                'firstName': user.firstName, # Corrected attribute name
+                'lastName': user.lastName, # Corrected attribute name
+                'email': user.email, # Corrected attribute name
+                'id': user.id, # Corrected attribute name
+                'profilePicture': user.profile_picture_filename, # Corrected attribute name
+            }
+
+            #After successful login, redirect to the 'next' URL if provided by Flask-Login
+            next_url = request.args.get('next')
+
+            if next_url:
+                return redirect(next_url)
+            else:
+                # If no 'next' URL, return the JSON response for the frontend to handle
+                return jsonify(login_response), 200
+        else:
+            return jsonify({"message": "Invalid email or password" }), 401 # Unauthorized status code
+    else: # Handle GET request for login page
+        #This route is primarily for Flask-Login's internal redirect.
+        #If a user directly accesses this with GET, might want to return an HTML page
+        # or a simple message indicating it's a login endpoint.
+        #Returning a 200 with a message is fine for debugging, but for production,
+        #Likely render an HTML login form or redirect to the frontend login page.
+        return jsonify({"message": "Login endpoint. Please use POST to authenticate."}), 200
+
+@bp.route('/taste_tailor_google_api') # Renamed from api_session for clarity
+@login_required # This route requires authentication
+@user_data_etag
+def get_authenticated_user():
+    """
+    Endpoint to check if the user is logged in according to the Flask backend session.
+    Returns user data if logged in, otherwise returns an unauthorized response (handled by
+    @login_required redirect).
+    """
+    # If current_user is authenticated by Flask-Login, this function will be reached.
+    # If not authenticated, Flask-Login will intercept and redirect to login_view.
+    user = current_user
+    if user.data_version != g.user_data_version:
+        # This worker's cached copy predates a change made through another worker
+        user_cache.invalidate(user.id)
+        user = load_user(user.id)
+    user_data = {
+        'isLoggedIn': True,
+        'userId': user.id,
+        'firstName': user.firstName,
+        'lastName': user.lastName,
+        'email': user.email,
+        'profilePicture': user.profile_picture_filename,
+        # Add other necessary user data
+    }
+    return jsonify(user_data), 200
+
+@bp.route('/taste_tailor_logout')
+@login_required # Ensure user is logged in to log out
+def logout():
+    """
+    Logs out the current user using Flask-Login.
+    This terminates the Flask session for the user.
+    """
+    # --- Flask-Login Session Terminated Here ---
+    logout_user()
+    # Return a JSON response indicating success
+    return jsonify({'message': 'Logged out successfully'}), 200
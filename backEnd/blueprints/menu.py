@@ -0,0 +1,220 @@
+from flask import Blueprint, current_app, jsonify, request
+from flask_login import current_user, login_required
+
+from extensions import menu_catalog, neighbour_table
+from menu_search import query_terms, search_menu_ids
+from models import UserTasteProfile
+
+bp = Blueprint('menu', __name__)
+
+@bp.route('/menu', methods=['GET'])
+def get_menu():
+    """
+    Returns the full menu catalog.
+    Served from the worker's in-memory snapshot, which is serialized once per catalog version.
+    """
+    try:
+        snapshot = menu_catalog.get()
+        return current_app.response_class(snapshot.payload, status=200, mimetype='application/json')
+    except Exception as e:
+        print(f"Error fetching menu: {e}")
+        return jsonify({"error": "An error occurred while fetching the menu"}), 500 # Internal Server Error
+
+# Most items returned by one /menu/browse page
+MAX_BROWSE_LIMIT = 100
+
+@bp.route('/menu/browse', methods=['GET'])
+def browse_menu():
+    """
+    Filters the menu and counts each facet value in the same call.
+    Filters: cuisine, price_level and taste (repeat a parameter to select several values; items need
+    one of the cuisines/price levels and all of the tastes), max_fee (1, 3 or 5) and min_rating (3 to 5).
+    Answered from the snapshot's facet bitsets. Items come in menu order, limit per page; pass the
+    returned next_cursor as after to get the next page.
+    """
+    try:
+        limit = int(request.args.get('limit', 50))
+        after = int(request.args['after']) if 'after' in request.args else None
+    except ValueError:
+        limit = None
+    if limit is None or not (1 <= limit <= MAX_BROWSE_LIMIT):
+        return jsonify({"error": f"limit must be between 1 and {MAX_BROWSE_LIMIT} and after an item id"}), 400 # Bad Request
+
+    # Imported here so numpy only loads in processes that browse or rank menu items
+    from facet_index import FACETS, FEE_BUCKETS, RATING_BUCKETS, bucket_label
+
+    filters = {facet: request.args.getlist(facet) for facet in FACETS}
+    for facet, bounds in (('max_fee', FEE_BUCKETS), ('min_rating', RATING_BUCKETS)):
+        labels = [bucket_label(bound) for bound in bounds]
+        try:
+            filters[facet] = [bucket_label(float(value)) for value in filters[facet]]
+        except ValueError:
+            filters[facet] = [None]
+        if any(value not in labels for value in filters[facet]):
+            return jsonify({"error": f"{facet} must be one of: {', '.join(labels)}"}), 400 # Bad Request
+
+    try:
+        snapshot = menu_catalog.get()
+        start = 0
+        if after is not None:
+            if snapshot.get(after) is None:
+                return jsonify({"error": "Unknown cursor, start again without after"}), 400 # Bad Request
+            start = snapshot.index_by_id[after] + 1
+
+        matched, counts = snapshot.facets.query(filters)
+        # One extra position tells whether there is a next page
+        positions = snapshot.facets.positions(matched, start, limit + 1)
+        items = [snapshot.items[position].to_dict() for position in positions[:limit]]
+        next_cursor = items[-1]['id'] if len(positions) > limit else None
+
+        return jsonify({"items": items, "total": snapshot.facets.count(matched), "next_cursor": next_cursor, "facets": counts}), 200 # OK
+
+    except Exception as e:
+        print(f"Error browsing the menu: {e}")
+        return jsonify({"error": "An error occurred while browsing the menu"}), 500 # Internal Server Error
+
+@bp.route('/menu/<int:item_id>/similar', methods=['GET'])
+def get_similar_menu_items(item_id):
+    """
+    Returns the menu items most similar to the given one ("more like this").
+    Neighbours are read from the precomputed, memory-mapped table built by `flask build-similarity`.
+    """
+    try:
+        limit = int(request.args.get('n', 10))
+    except ValueError:
+        limit = None
+    if limit is None or limit < 1:
+        return jsonify({"error": "n must be a positive integer"}), 400 # Bad Request
+
+    try:
+        snapshot = menu_catalog.get()
+        if snapshot.get(item_id) is None:
+            return jsonify({"message": "Menu item not found"}), 404 # Not Found
+
+        neighbours = neighbour_table.neighbours(item_id, limit)
+        if neighbours is None:
+            # Table not built yet, or built before this item was added
+            return jsonify([]), 200
+
+        similar_items = []
+        for neighbour_id, score in neighbours:
+            neighbour = snapshot.get(neighbour_id)
+            if neighbour is not None:
+                similar_item = neighbour.to_dict()
+                similar_item['score'] = round(score, 4)
+                similar_items.append(similar_item)
+        return jsonify(similar_items), 200 # OK
+
+    except Exception as e:
+        print(f"Error fetching similar menu items: {e}")
+        return jsonify({"error": "An error occurred while fetching similar menu items"}), 500 # Internal Server Error
+
+# Most results returned by one /search page
+MAX_SEARCH_LIMIT = 50
+
+@bp.route('/search', methods=['GET'])
+def search_menu():
+    """
+    Full-text search over menu item names, descriptions, cuisines and tastes.
+    Every word of q must match the start of a word in the item ('spic nood' finds 'Spicy Noodles').
+    Results are ranked by relevance and paginated with limit/offset; next_offset is null on the last page.
+    """
+    text = request.args.get('q', '').strip()
+    if not text:
+        return jsonify({"error": "q is required"}), 400 # Bad Request
+    try:
+        limit = int(request.args.get('limit', 20))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        limit = offset = None
+    if limit is None or not (1 <= limit <= MAX_SEARCH_LIMIT) or offset < 0:
+        return jsonify({"error": f"limit must be between 1 and {MAX_SEARCH_LIMIT} and offset a non-negative integer"}), 400 # Bad Request
+
+    terms = query_terms(text)
+    if not terms:
+        return jsonify({"items": [], "next_offset": None}), 200
+
+    try:
+        # One extra row tells whether there is a next page
+        matches = search_menu_ids(terms, limit + 1, offset)
+        snapshot = menu_catalog.get()
+        items = []
+        for item_id, score in matches[:limit]:
+            record = snapshot.get(item_id)
+            if record is not None:
+                item = record.to_dict()
+                item['score'] = score
+                items.append(item)
+        next_offset = offset + limit if len(matches) > limit else None
+        return jsonify({"items": items, "next_offset": next_offset}), 200 # OK
+
+    except Exception as e:
+        print(f"Error searching the menu: {e}")
+        return jsonify({"error": "An error occurred while searching the menu"}), 500 # Internal Server Error
+
+# New route to rank menu items against the logged-in user's taste history
+@bp.route('/recommendations', methods=['GET'])
+@login_required # Ensure user is logged in
+def get_recommendations():
+    """
+    Returns the top-k menu items for the logged-in user.
+    Builds the user's taste vector from the highest rating given to each taste they have ordered,
+    scores it against the menu items' taste vectors block by block and
+    returns only the k best items, highest score first.
+    Optional cuisine, price_level and max_delivery_fee query parameters restrict the candidates before scoring.
+    """
+    try:
+        k = int(request.args.get('k', 10))
+    except ValueError:
+        k = None
+    if k is None or k < 1:
+        return jsonify({"error": "k must be a positive integer"}), 400 # Bad Request
+
+    cuisine = request.args.get('cuisine')
+    try:
+        price_level = int(request.args['price_level']) if 'price_level' in request.args else None
+        max_delivery_fee = float(request.args['max_delivery_fee']) if 'max_delivery_fee' in request.args else None
+    except ValueError:
+        return jsonify({"error": "price_level must be an integer and max_delivery_fee a number"}), 400 # Bad Request
+
+    # Imported here so numpy only loads in processes that rank menu items
+    import recommender
+
+    try:
+        snapshot = menu_catalog.get()
+
+        # One profile row per distinct taste the user has ordered, so this doesn't grow with order history
+        profiles = UserTasteProfile.query.filter_by(user_id=current_user.id).all()
+
+        user_vectors = recommender.build_user_vectors(
+            [0] * len(profiles),
+            [[profile.taste.name] for profile in profiles],
+            [profile.max_rating for profile in profiles],
+            1,
+            snapshot.taste_index,
+        )
+
+        if cuisine is not None and cuisine not in snapshot.cuisine_code_by_name:
+            return jsonify([]), 200 # No item has this cuisine
+        mask = recommender.build_filter_mask(
+            len(snapshot.items),
+            cuisine_codes=snapshot.cuisine_codes,
+            cuisine_code=snapshot.cuisine_code_by_name.get(cuisine),
+            price_levels=snapshot.price_levels,
+            price_level=price_level,
+            delivery_fees=snapshot.delivery_fees,
+            max_delivery_fee=max_delivery_fee,
+        )
+        indices, scores = recommender.blocked_top_k(user_vectors[0], snapshot.taste_matrix, k, mask=mask)
+
+        recommendations = []
+        for index, score in zip(indices, scores):
+            recommendation = snapshot.items[index].to_dict()
+            recommendation['score'] = round(float(score), 4)
+            recommendations.append(recommendation)
+
+        return jsonify(recommendations), 200 # OK
+
+    except Exception as e:
+        print(f"Error computing recommendations: {e}")
+        return jsonify({"error": "An error occurred while computing recommendations"}), 500 # Internal Server Error
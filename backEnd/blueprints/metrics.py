@@ -0,0 +1,15 @@
+from flask import Blueprint, current_app
+
+from metrics import collect
+
+bp = Blueprint('metrics', __name__)
+
+@bp.route('/metrics', methods=['GET'])
+def export_metrics():
+    try:
+        # Write this worker's latest numbers first, so a scrape always sees its own requests
+        current_app.extensions['taste_tailor_metrics'].flush()
+        return collect(current_app.config['METRICS_DIR']), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+    except Exception as e:
+        print(f"Error exporting metrics: {e}")
+        return "Internal server error", 500
@@ -0,0 +1,232 @@
+import base64
+import os
+import threading
+
+from flask import Blueprint, current_app, redirect, session, url_for
+from flask_login import login_user
+
+from extensions import db, google_oidc, outbound_http, password_hasher
+from models import Users
+
+bp = Blueprint('oauth', __name__)
+
+_oauth_lock = threading.Lock()
+
+def generate_nonce():
+    #Generates a secure, URL-safe nonce
+    return base64.urlsafe_b64encode(os.urandom(24)).decode('utf-8')
+
+def get_oauth():
+    # authlib is imported on the first OAuth login rather than when the worker boots
+    oauth = current_app.extensions.get('authlib.integrations.flask_client')
+    if oauth is None:
+        with _oauth_lock:
+            oauth = current_app.extensions.get('authlib.integrations.flask_client')
+            if oauth is None:
+                from authlib.integrations.flask_client import OAuth
+                oauth = OAuth(current_app)
+    return oauth
+
+# --- Google OAuth Routes ---
+def get_google_client():
+    # Registered on first use by either route, since the callback may land on a different worker than the redirect
+    oauth = get_oauth()
+    if 'google' not in oauth._clients:
+        from http_client import pooled_oauth_client_cls
+        from oidc_cache import cached_oidc_client_cls
+        oauth.register(
+            name='google',
+            client_id=os.environ.get('GOOGLE_CLIENT_ID'),
+            client_secret=os.environ.get('GOOGLE_CLIENT_SECRET'),
+            server_metadata_url=current_app.config['GOOGLE_OIDC_METADATA_URL'],
+            # Discovery metadata and JWKS come from google_oidc instead of a fetch per worker
+            client_cls=cached_oidc_client_cls(google_oidc, base=pooled_oauth_client_cls(outbound_http)),
+            client_kwargs={
+                'scope': 'openid email profile'
+            }
+        )
+    return oauth.google
+
+@bp.route('/google/')
+def google():
+    nonce = generate_nonce() # Custom nonce function
+    session['nonce'] = nonce # Store custom nonce in the session
+
+    # Redirect to google_auth function
+    # Ensure _external=True is used for generating the full callback URL
+    redirect_uri = url_for('oauth.google_auth', _external=True)
+
+    # Explicitly include nonce in the authorize_redirect call using generate_token (aliased as generate_nonce)
+    # Authlib's authorize_redirect should handle storing its own nonce in the session as well.
+    return get_google_client().authorize_redirect(redirect_uri, nonce=nonce) # Using custom generate_nonce
+
+@bp.route('/google/auth/')
+def google_auth():
+    try:
+        # Retrieve custom nonce from the session
+        stored_nonce = session.pop('nonce', None)
+        if stored_nonce is None:
+            print("Error: Custom Nonce missing from session during Google OAuth callback.")
+            # Redirect to frontend with error
+            return redirect('http://localhost:3000/auth/login?error=google_auth_failed_nonce_missing')
+
+        # Authenticate the user with Google. Authlib handles its own session state/nonce here.
+        google_client = get_google_client()
+        token = google_client.authorize_access_token()
+
+        # Get user info from ID token, passing custom stored_nonce for verification
+        # Authlib will now check if the nonce in the ID token matches stored_nonce
+        userinfo = google_client.parse_id_token(token, nonce=stored_nonce)
+
+        google_user_id = userinfo.get('sub')
+        user_name = userinfo.get('name')
+        user_email = userinfo.get('email')
+        picture = userinfo.get('picture')
+
+        if not google_user_id or not user_email:
+            print("Error: Missing Google User ID or Email in callback.") # Debugging
+            # Handle missing info - maybe redirect to an error page or login
+            return redirect('http://localhost:3000/auth/login?error=google_auth_failed')
+
+        # Check if the user exists in database
+        user = Users.query.filter_by(google_id=google_user_id).first()
+        if user:
+            # Existing user, log them in using Flask-Login
+            login_user(user)
+        else:
+            # New user, create an account
+            # Might want to prompt the user for more info here or set a temporary flag
+            # For simplicity, let's create a basic account
+            new_user = Users(firstName=user_name.split(' ')[0] if user_name else 'GoogleUser',
+                             lastName=user_name.split(' ')[-1] if user_name and len(user_name.split(' ')) > 1 else '',
+                             email=user_email,
+                             password=password_hasher.hash(os.urandom(16).hex()), # Generate a random password for OAuth users
+                             profile_picture_filename=picture,
+                             google_id=google_user_id)
+            db.session.add(new_user)
+            db.session.commit()
+            login_user(new_user) # Log in the newly created user
+
+        # Redirect back to the frontend callback page
+        # The browser should now have the Flask-Login session cookie
+        return redirect('http://localhost:3000/auth/google') # Redirect to a frontend route that handles post-login
+
+    except Exception as e:
+        print(f"Error during Google OAuth callback: {e}") # Debugging
+        # Handle OAuth errors - redirect to an error page or login
+        return redirect('http://localhost:3000/auth/login?error=google_auth_error')
+# --- End Google OAuth Routes ---
+
+# --- Facebook OAuth Routes ---
+def get_facebook_client():
+    # Registered on first use by either route, like the Google client
+    oauth = get_oauth()
+    if 'facebook' not in oauth._clients: # Check if 'facebook' client is already registered
+        from http_client import pooled_oauth_client_cls
+        oauth.register(
+            name='facebook',
+            client_id=os.environ.get('FACEBOOK_CLIENT_ID'),
+            client_secret=os.environ.get('FACEBOOK_CLIENT_SECRET'),
+            access_token_url=f"{current_app.config['FACEBOOK_GRAPH_URL']}oauth/access_token",
+            access_token_params=None,
+            authorize_url=current_app.config['FACEBOOK_DIALOG_URL'],
+            authorize_params=None,
+            api_base_url=current_app.config['FACEBOOK_GRAPH_URL'],
+            # Token exchange and Graph API calls share the worker's keep-alive pool
+            client_cls=pooled_oauth_client_cls(outbound_http),
+            client_kwargs={'scope': 'email public_profile'}, # Ensure public_profile is requested for name/ID
+        )
+    return oauth.facebook
+
+@bp.route('/facebook/')
+def facebook():
+    redirect_uri = url_for('oauth.facebook_auth', _external=True)
+    return get_facebook_client().authorize_redirect(redirect_uri)
+
+@bp.route('/facebook/auth/')
+def facebook_auth():
+    try:
+        # Authenticate the user with Facebook
+        facebook_client = get_facebook_client()
+        token = facebook_client.authorize_access_token()
+        access_token = token.get('access_token')
+        if not access_token:
+            print("Error: Missing Facebook access token in callback.") # Debugging
+            return redirect('http://localhost:3000/auth/login?error=facebook_auth_failed')
+
+        # Use the access token to call the Graph API /me endpoint
+        # Specify fields to retrieve (id, name, email, picture)
+        user_info_url = f"{facebook_client.api_base_url}me?fields=id,name,email,picture"
+
+        user_info_response = facebook_client.get(user_info_url, params={'access_token': access_token})
+        user_info = None
+        facebook_user_id = None
+        user_name = None
+        user_email = None
+        picture_data = None
+
+        if user_info_response.ok:
+            user_info = user_info_response.json()
+
+            facebook_user_id = user_info.get('id')
+            user_name = user_info.get('name')
+            user_email = user_info.get('email') # Email might be None if user didn't grant permission
+            picture_data = user_info.get('picture')
+
+            picture_url = None
+            if picture_data and 'data' in picture_data and 'url' in picture_data['data']:
+                picture_url = picture_data['data']['url']
+
+            if not facebook_user_id:
+                print("Error: Missing Facebook User ID in callback.") # Debugging
+                return redirect('http://localhost:3000/auth/login?error=facebook_auth_failed')
+
+            # Check if the user exists in database using Facebook ID
+            user = Users.query.filter_by(facebook_id=facebook_user_id).first()
+
+            # If user not found by Facebook ID, try by email if available and unique in DB
+            # Note: Users model has unique=False for email. If using email as a primary
+            # identifier for non-OAuth users, consider making it unique.
+            # For OAuth users, using the unique provider ID (google_id, facebook_id) is safer.
+            if not user and user_email:
+                 user = Users.query.filter_by(email=user_email).first()
+                 if user:
+                     # If user found by email, link their Facebook ID
+                     user.facebook_id = facebook_user_id
+                     db.session.commit()
+                     login_user(user)
+                     return redirect('http://localhost:3000/auth/facebook') # Redirect after linking and login
+
+            if not user:
+                # If user not found by Facebook ID AND not found by email (or email not provided)
+                new_user = Users(firstName=user_name.split(' ')[0] if user_name else 'FacebookUser',
+                                 lastName=user_name.split(' ')[-1] if user_name and len(user_name.split(' ')) > 1 else '',
+                                 email=user_email, # Store email if available
+                                 password=password_hasher.hash(os.urandom(16).hex()), # Generate a random password
+                                 profile_picture_filename=picture_url,
+                                 facebook_id=facebook_user_id) # Store Facebook ID
+                db.session.add(new_user)
+                db.session.commit()
+                login_user(new_user) # Log in the newly created user
+                # Redirect back to the frontend callback page
+                return redirect('http://localhost:3000/auth/facebook')
+
+            elif user:
+                # Existing user found by Facebook ID, log them in
+                login_user(user)
+                # Redirect back to the frontend callback page
+                return redirect('http://localhost:3000/auth/facebook')
+
+            else:
+                 # This case should ideally not be reached if the logic is sound,
+                 # but as a fallback, handle the scenario where a user isn't found
+                 # and email wasn't provided.
+                 print("Error: User not found by Facebook ID or email, and email not provided by Facebook.") # Debugging
+                 return redirect('http://localhost:3000/auth/login?error=facebook_email_missing_or_user_not_found')
+
+
+    except Exception as e:
+        print(f"Error during Facebook OAuth callback: {e}") # Debugging
+        # Handle OAuth errors - redirect to an error page or login
+        return redirect('http://localhost:3000/auth/login?error=facebook_auth_error')
+# --- End Facebook OAuth Routes ---
@@ -0,0 +1,399 @@
+import base64
+import json # Import json for handling list data
+from datetime import datetime # Import datetime
+
+from flask import Blueprint, current_app, jsonify, request, stream_with_context
+from flask_login import current_user, login_required
+
+from blueprints.auth import user_data_etag
+from extensions import db
+from models import Order, OrderItem, bump_user_data_version, get_or_create_tastes, order_item_tastes, record_order_in_taste_profiles, record_rating_in_taste_profiles, record_ratings_in_taste_profiles
+
+bp = Blueprint('orders', __name__)
+
+# New route to handle placing an order
+@bp.route('/place_order', methods=['POST'])
+@login_required # Ensure user is logged in to place an order
+def place_order():
+    """
+    Handles incoming POST requests to place an order.
+    Expects JSON data containing cart items, delivery address, and order total.
+    Saves each item as a separate record in the database, all in one bulk insert.
+    """
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 415 # Unsupported Media Type
+
+    data = request.get_json()
+    cart_items_data = data.get('cartItems')
+    delivery_address_data = data.get('deliveryAddress')
+    order_total = data.get('orderTotal')
+
+    # Basic validation of incoming data
+    if not cart_items_data or not delivery_address_data or order_total is None:
+        return jsonify({"error": "Missing order data (cartItems, deliveryAddress, or orderTotal)"}), 400 # Bad Request
+
+    if not isinstance(cart_items_data, list) or not isinstance(delivery_address_data, dict) or not isinstance(order_total, (int, float)):
+        return jsonify({"error": "Invalid data format for order data"}), 400 # Bad Request
+
+    # Validate every cart line up front so nothing is written for a malformed cart
+    for index, item_data in enumerate(cart_items_data):
+        if not isinstance(item_data, dict) or not all(key in item_data for key in ['name', 'price', 'quantity']):
+            return jsonify({"error": f"Cart item {index} is missing name, price or quantity"}), 400 # Bad Request
+        if not isinstance(item_data['price'], (int, float)) or not isinstance(item_data['quantity'], int) or item_data['quantity'] < 1:
+            return jsonify({"error": f"Cart item {index} has an invalid price or quantity"}), 400 # Bad Request
+        selections = (item_data.get('selectedTastes') or [], item_data.get('selectedRecommended') or [])
+        if not all(isinstance(selection, list) and all(isinstance(value, str) for value in selection) for selection in selections):
+            return jsonify({"error": f"Cart item {index} has invalid taste or recommended selections"}), 400 # Bad Request
+
+    # Get the current logged-in user's ID from Flask-Login's current_user
+    user_id = current_user.id
+
+    try:
+        order_item_ids = insert_order_items(user_id, cart_items_data, delivery_address_data, order_total)
+        bump_user_data_version(user_id)
+        db.session.commit()
+
+        # Return a success response
+        return jsonify({"message": "Order placed successfully", "order_item_ids": order_item_ids}), 201 # Created
+
+    except Exception as e:
+        # Roll back the database session in case of any error
+        db.session.rollback()
+        print(f"Database error during order placement: {e}")
+        # Return an error response
+        return jsonify({"error": "An error occurred while placing the order"}), 500 # Internal Server Error
+
+def insert_order_items(user_id, cart_items_data, delivery_address_data, order_total):
+    """
+    Creates the Order header, inserts every line of a validated cart with one bulk INSERT ... RETURNING
+    and returns the new item ids in cart order.
+    Taste links and the user's taste profile are written in the same transaction; the caller commits.
+    """
+    ordered_at = datetime.now() # One timestamp for every item in the order
+    # The total and delivery address are stored once, on the order header
+    order = Order(user_id=user_id, placed_at=ordered_at, total=order_total, delivery_address=json.dumps(delivery_address_data))
+    db.session.add(order)
+
+    # Look up (or create) every taste in the cart with a single query, and flush so new tastes get ids
+    item_taste_names = [list(dict.fromkeys(item_data.get('selectedTastes') or [])) for item_data in cart_items_data]
+    tastes_by_name = get_or_create_tastes(name for names in item_taste_names for name in names)
+    db.session.flush() # Also assigns the order its id
+
+    order_item_rows = [{
+        'user_id': user_id,
+        'order_id': order.id,
+        'item_name': item_data['name'],
+        'item_image_url': item_data.get('imageUrl'),
+        'quantity': item_data['quantity'],
+        'price_per_item': item_data['price'],
+        'total_item_price': item_data['price'] * item_data['quantity'], # Calculate total price for this item
+        'delivered_date': ordered_at,
+        'taste_selection': json.dumps(item_data.get('selectedTastes') or []), # Store tastes as JSON string
+        'recommended_selection': json.dumps(item_data.get('selectedRecommended') or []), # Store recommended as JSON string
+        'rating': 0,
+    } for item_data in cart_items_data]
+    # RETURNING doesn't guarantee row order, but ids are assigned in increasing order as the rows are
+    # inserted, so sorting them restores cart order without forcing SQLAlchemy into one INSERT per row
+    order_item_ids = sorted(db.session.execute(db.insert(OrderItem).returning(OrderItem.id), order_item_rows).scalars())
+
+    taste_links = [
+        {'order_item_id': order_item_id, 'taste_id': tastes_by_name[name].id}
+        for order_item_id, names in zip(order_item_ids, item_taste_names)
+        for name in names
+    ]
+    if taste_links:
+        db.session.execute(order_item_tastes.insert(), taste_links)
+
+    # Update the user's taste profile in the same transaction
+    record_order_in_taste_profiles(user_id, [[tastes_by_name[name] for name in names] for names in item_taste_names], ordered_at)
+    return order_item_ids
+
+# Page size limits for keyset-paginated past orders
+PAST_ORDERS_DEFAULT_PAGE_SIZE = 20
+PAST_ORDERS_MAX_PAGE_SIZE = 100
+# Rows fetched from the database per round trip when streaming past orders
+PAST_ORDERS_STREAM_BATCH_SIZE = 500
+
+def serialize_order_item(item, include_order=True):
+    serialized = {
+        'id': item.id,
+        'item_name': item.item_name,
+        'item_image_url': item.item_image_url,
+        'quantity': item.quantity,
+        'price_per_item': item.price_per_item,
+        'total_item_price': item.total_item_price,
+        'delivered_date': item.delivered_date.isoformat(), # Format datetime as ISO string
+        'taste_selection': json.loads(item.taste_selection) if item.taste_selection else [], # Load JSON string back to list
+        'recommended_selection': json.loads(item.recommended_selection) if item.recommended_selection else [], # Load JSON string back to list
+        'rating': item.rating,
+        'review_comment': item.review_comment # Include review comment
+    }
+    if include_order:
+        # Order-level fields, repeated on each item for the flat response
+        serialized['order_id'] = item.order_id
+        serialized['order_total_price'] = item.order.total
+        serialized['delivery_address'] = json.loads(item.order.delivery_address) if item.order.delivery_address else {} # Load JSON string back to dict
+    return serialized
+
+def serialize_order(order):
+    # Grouped response: the order's total and address are sent once, followed by its items
+    return {
+        'order_id': order.id,
+        'placed_at': order.placed_at.isoformat(),
+        'order_total_price': order.total,
+        'delivery_address': json.loads(order.delivery_address) if order.delivery_address else {},
+        'items': [serialize_order_item(item, include_order=False) for item in order.items],
+    }
+
+def encode_order_cursor(timestamp, row_id):
+    # Opaque cursor holding the (timestamp, id) of the last row on a page
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{row_id}".encode('utf-8')).decode('utf-8')
+
+def decode_order_cursor(cursor):
+    timestamp, row_id = base64.urlsafe_b64decode(cursor.encode('utf-8')).decode('utf-8').split('|')
+    return datetime.fromisoformat(timestamp), int(row_id)
+
+def past_orders_query(user_id):
+    # Matches ix_order_items_user_id_delivered_date so both paging and streaming walk the index.
+    # The order header is joined in (many-to-one, so it also works with yield_per).
+    return OrderItem.query.filter_by(user_id=user_id) \
+        .options(db.joinedload(OrderItem.order)) \
+        .order_by(OrderItem.delivered_date.desc(), OrderItem.id)
+
+def past_orders_grouped_query(user_id):
+    # Matches ix_orders_user_id_placed_at; each page's items are loaded with one extra IN query
+    return Order.query.filter_by(user_id=user_id) \
+        .options(db.selectinload(Order.items)) \
+        .order_by(Order.placed_at.desc(), Order.id)
+
+def stream_past_orders(user_id, stream_format):
+    """Yields the user's past orders as a JSON array or NDJSON, holding one batch of rows in memory at a time."""
+    items = past_orders_query(user_id).yield_per(PAST_ORDERS_STREAM_BATCH_SIZE)
+    if stream_format == 'ndjson':
+        for item in items:
+            yield json.dumps(serialize_order_item(item)) + '\n'
+        return
+
+    yield '['
+    separator = ''
+    for item in items:
+        yield separator + json.dumps(serialize_order_item(item))
+        separator = ','
+    yield ']'
+
+# New route to fetch past orders for the logged-in user
+@bp.route('/get_past_orders', methods=['GET'])
+@login_required # Ensure user is logged in
+@user_data_etag
+def get_past_orders():
+    """
+    Fetches past order items for the logged-in user.
+    Returns a list of order items ordered by delivered date descending.
+    Returns an empty list if no orders are found.
+    Includes review_comment if available.
+
+    Optional query parameters:
+    - limit / cursor: keyset pagination. Returns {"items": [...], "next_cursor": ...};
+      pass next_cursor back as cursor to get the following page (null on the last page).
+    - stream=json or stream=ndjson: streams the whole history without building it in memory.
+    - group_by=order: returns orders (total and delivery address once each) with their items nested.
+      Can be combined with limit / cursor, which then page over orders.
+    """
+    group_by = request.args.get('group_by')
+    if group_by is not None and group_by != 'order':
+        return jsonify({"error": "group_by must be 'order'"}), 400 # Bad Request
+    if group_by is not None and 'stream' in request.args:
+        return jsonify({"error": "group_by cannot be combined with stream"}), 400 # Bad Request
+
+    stream_format = request.args.get('stream')
+    if stream_format is not None:
+        if stream_format not in ('json', 'ndjson'):
+            return jsonify({"error": "stream must be 'json' or 'ndjson'"}), 400 # Bad Request
+        mimetype = 'application/x-ndjson' if stream_format == 'ndjson' else 'application/json'
+        return current_app.response_class(stream_with_context(stream_past_orders(current_user.id, stream_format)), status=200, mimetype=mimetype)
+
+    if 'limit' in request.args or 'cursor' in request.args:
+        try:
+            limit = int(request.args.get('limit', PAST_ORDERS_DEFAULT_PAGE_SIZE))
+        except ValueError:
+            limit = None
+        if limit is None or not (1 <= limit <= PAST_ORDERS_MAX_PAGE_SIZE):
+            return jsonify({"error": f"limit must be between 1 and {PAST_ORDERS_MAX_PAGE_SIZE}"}), 400 # Bad Request
+
+        if group_by:
+            query, model, timestamp_column, serialize = past_orders_grouped_query(current_user.id), Order, 'placed_at', serialize_order
+        else:
+            query, model, timestamp_column, serialize = past_orders_query(current_user.id), OrderItem, 'delivered_date', serialize_order_item
+
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                last_timestamp, last_id = decode_order_cursor(cursor)
+            except ValueError:
+                return jsonify({"error": "Invalid cursor"}), 400 # Bad Request
+            # Continue strictly after the last row of the previous page in (timestamp DESC, id) order
+            timestamp = getattr(model, timestamp_column)
+            query = query.filter(db.or_(
+                timestamp < last_timestamp,
+                db.and_(timestamp == last_timestamp, model.id > last_id),
+            ))
+
+        try:
+            # Fetch one extra row to know whether another page follows
+            page_rows = query.limit(limit + 1).all()
+            next_cursor = None
+            if len(page_rows) > limit:
+                last_row = page_rows[limit - 1]
+                next_cursor = encode_order_cursor(getattr(last_row, timestamp_column), last_row.id)
+            return jsonify({
+                'items': [serialize(row) for row in page_rows[:limit]],
+                'next_cursor': next_cursor,
+            }), 200 # OK
+        except Exception as e:
+            print(f"Error fetching past orders: {e}")
+            return jsonify({"error": "An error occurred while fetching past orders"}), 500 # Internal Server Error
+
+    if group_by:
+        try:
+            return jsonify([serialize_order(order) for order in past_orders_grouped_query(current_user.id)]), 200 # OK
+        except Exception as e:
+            print(f"Error fetching past orders: {e}")
+            return jsonify({"error": "An error occurred while fetching past orders"}), 500 # Internal Server Error
+
+    try:
+        # Query OrderItem records for the current user, ordered by delivered_date descending
+        past_order_items = past_orders_query(current_user.id).all()
+
+        # If no order items are found, return an empty list
+        if not past_order_items:
+            return jsonify([]), 200 # Return empty list
+
+        # Serialize the order items into a list of dictionaries
+        serialized_order_items = [serialize_order_item(item) for item in past_order_items]
+
+        # Return the list of serialized order items as JSON
+        return jsonify(serialized_order_items), 200 # OK
+
+    except Exception as e:
+        print(f"Error fetching past orders: {e}")
+        return jsonify({"error": "An error occurred while fetching past orders"}), 500 # Internal Server Error
+
+# Most reviews accepted by one /submit_reviews request
+MAX_REVIEWS_PER_REQUEST = 100
+
+def review_error(review):
+    """Returns why a submitted review is invalid, or None when it is valid."""
+    if not isinstance(review, dict) or review.get('order_item_id') is None or review.get('rating') is None:
+        return "Missing order_item_id or rating"
+    order_item_id, rating = review['order_item_id'], review['rating']
+    if not isinstance(order_item_id, int) or not isinstance(rating, int) or not (0 <= rating <= 5):
+        return "Invalid data format for order_item_id or rating"
+    return None
+
+# New route to update the rating and review comment of an order item
+@bp.route('/submit_review', methods=['POST']) # Using a dedicated endpoint for submitting reviews
+@login_required # Ensure user is logged in
+def submit_review():
+    """
+    Updates the rating and review comment for a specific order item.
+    Expects JSON data containing order_item_id, rating, and review_comment.
+    """
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 415 # Unsupported Media Type
+
+    data = request.get_json()
+    order_item_id = data.get('order_item_id')
+    rating = data.get('rating')
+    review_comment = data.get('review_comment', '') # Get comment, default to empty string
+
+    # Validate incoming data
+    error = review_error(data)
+    if error:
+        return jsonify({"error": error}), 400 # Bad Request
+
+    try:
+        # Find the order item by ID and ensure it belongs to the current user
+        order_item = OrderItem.query.filter_by(id=order_item_id, user_id=current_user.id).first()
+
+        if not order_item:
+            return jsonify({"message": "Order item not found or does not belong to the user"}), 404 # Not Found
+
+        # Update the rating and review comment
+        old_rating = order_item.rating
+        order_item.rating = rating
+        order_item.review_comment = review_comment # Save the comment
+        # Update the user's taste profile in the same transaction
+        record_rating_in_taste_profiles(order_item, old_rating, rating)
+        bump_user_data_version(current_user.id)
+        db.session.commit()
+
+        return jsonify({"message": "Review submitted successfully"}), 200 # OK
+
+    except Exception as e:
+        db.session.rollback() # Roll back changes if something goes wrong
+        print(f"Database error during review submission: {e}")
+        return jsonify({"error": "An error occurred while submitting the review"}), 500 # Internal Server Error
+
+@bp.route('/submit_reviews', methods=['POST'])
+@login_required
+def submit_reviews():
+    """
+    Submits several reviews at once. Expects a JSON list of {order_item_id, rating, review_comment}
+    (or {"reviews": [...]}). All rows are loaded with one query and updated in one transaction.
+    Returns one result per review, in order, with the status /submit_review would have answered.
+    """
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 415 # Unsupported Media Type
+
+    data = request.get_json()
+    reviews = data.get('reviews') if isinstance(data, dict) else data
+    if not isinstance(reviews, list) or not reviews:
+        return jsonify({"error": "Expected a non-empty list of reviews"}), 400 # Bad Request
+    if len(reviews) > MAX_REVIEWS_PER_REQUEST:
+        return jsonify({"error": f"At most {MAX_REVIEWS_PER_REQUEST} reviews per request"}), 400 # Bad Request
+
+    results = []
+    valid_reviews = {}
+    for review in reviews:
+        error = review_error(review)
+        if error:
+            results.append({"order_item_id": review.get('order_item_id') if isinstance(review, dict) else None, "status": 400, "error": error})
+        elif review['order_item_id'] in valid_reviews:
+            results.append({"order_item_id": review['order_item_id'], "status": 400, "error": "Duplicate order_item_id in this request"})
+        else:
+            valid_reviews[review['order_item_id']] = review
+            results.append({"order_item_id": review['order_item_id'], "status": None})
+
+    try:
+        # One IN query for every target row, scoped to the current user
+        order_items = {}
+        if valid_reviews:
+            order_items = {item.id: item for item in OrderItem.query.filter(
+                OrderItem.user_id == current_user.id, OrderItem.id.in_(valid_reviews.keys()))}
+
+        changes = []
+        for result in results:
+            if result['status'] is not None:
+                continue
+            order_item = order_items.get(result['order_item_id'])
+            if order_item is None:
+                result.update(status=404, message="Order item not found or does not belong to the user")
+                continue
+            review = valid_reviews[order_item.id]
+            changes.append((order_item.id, order_item.rating, review['rating']))
+            order_item.rating = review['rating']
+            order_item.review_comment = review.get('review_comment', '')
+            result.update(status=200, message="Review submitted successfully")
+
+        if changes:
+            # Taste profiles and the past-orders ETag change in the same transaction
+            record_ratings_in_taste_profiles(current_user.id, changes)
+            bump_user_data_version(current_user.id)
+            db.session.commit()
+
+        return jsonify({"results": results, "updated": len(changes)}), 200 # OK
+
+    except Exception as e:
+        db.session.rollback() # Nothing is saved if any update fails
+        print(f"Database error during batch review submission: {e}")
+        return jsonify({"error": "An error occurred while submitting the reviews"}), 500 # Internal Server Error
@@ -0,0 +1,221 @@
+import os
+import re
+
+from flask import Blueprint, current_app, jsonify, request
+
+from extensions import db, password_hasher, picture_variant_worker
+from models import Users, bump_user_data_version
+from picture_store import save_upload
+
+bp = Blueprint('profile', __name__)
+
+#Helper function to check allowed file extensions
+def allowed_file(filename):
+    return '.' in filename and \
+           filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
+
+@bp.route('/taste_tailor_update_picture', methods=['POST'])
+def update_picture():
+    if 'profilePicture' not in request.files:
+        return jsonify({"error": "No profile Picture file part in the request" }), 400 #Bad Request
+
+    file = request.files['profilePicture']
+    user_id = request.form.get('userID') #Access text field from request.form
+
+    if user_id is None:
+        return jsonify({"error": "userID is required"}), 400 # Bad Request
+
+    if file.filename == '':
+        return jsonify({"error": "No selected file"}), 400 # Bad Request
+
+    if file and allowed_file(file.filename):
+        # Look the user up first so nothing is written to disk for an unknown user
+        user = Users.query.get_or_404(user_id)
+        # Already checked against ALLOWED_EXTENSIONS by allowed_file, so it is safe in a path
+        extension = file.filename.rsplit('.', 1)[1].lower()
+        filepath = None
+        created = False
+
+        try:
+            # Stored under the hash of its content, so identical pictures are kept once
+            # and two users' "avatar.png" never overwrite each other
+            filename, created = save_upload(file.stream, current_app.config['UPLOAD_FOLDER'], extension)
+            filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+
+            user.profile_picture_filename = filename
+            bump_user_data_version(user.id)
+            db.session.commit()
+
+            # Thumbnails are made in the background; until they exist the original is served for every size
+            picture_variant_worker.submit(current_app.config['UPLOAD_FOLDER'], filename)
+
+            return jsonify({"message": "Profile picture updated successfully", "filename": filename}), 200 # OK
+
+        except Exception as e:
+            db.session.rollback() # Roll back database changes if save or commit fails
+            print(f"Error saving file or updating database: {e}")
+
+            #Attempt to remove the file if this upload created it but DB update failed (an existing file may be shared)
+            if created and os.path.exists(filepath):
+                try:
+                    os.remove(filepath)
+                except Exception as cleanup_e:
+                    print(f"Error cleaning up file {filepath}: {cleanup_e}")
+
+            return jsonify({"error": "An error occurred during file upload or database update" }), 500 # Internal Server Error
+    else:
+        return jsonify({"error": "Invalid file type"}), 400 # Bad Request
+
+@bp.route('/taste_tailor_update_info', methods=['PUT'])
+def update_info():
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 415 # Unsupported Media Type
+
+    data = request.get_json()
+    user_id = data.get('id')
+
+    if user_id is None:
+        return jsonify({"error": "User ID is required for update"}), 400
+
+    user = Users.query.get_or_404(user_id)
+
+    if user is None:
+        return jsonify({"message": "User not found" }), 404
+
+    updated_fields = False
+    errors = {} # Dictionary to collect validation errors
+    name_regex = r'^[A-Za-z\s]+$' # Define the regex for names (letters)
+    name_error_message = 'Both first and last name must contain only letters!'
+
+    # --- First Name Validation ---
+    if 'firstName' in data and data['firstName'] is not None:
+        firstName_to_update = data['firstName'].strip() # Strip whitespace
+        if not firstName_to_update: # Check if empty after stripping
+             errors['firstName'] = ['First name cannot be empty.']
+        elif not re.match(name_regex, firstName_to_update):
+             errors['firstName'] = [name_error_message]
+        else:
+            user.firstName = firstName_to_update
+            updated_fields = True
+    # --- End First Name Validation ---
+
+    # --- Last Name Validation ---
+    if 'lastName' in data and data['lastName'] is not None:
+        lastName_to_update = data['lastName'].strip() # Strip whitespace
+        if not lastName_to_update: # Check if empty after stripping
+             errors['lastName'] = ['Last name cannot be empty.']
+        elif not re.match(name_regex, lastName_to_update):
+             errors['lastName'] = [name_error_message]
+        else:
+            user.lastName = lastName_to_update
+            updated_fields = True
+    # --- End Last Name Validation ---
+
+    # --- Email Validation ---
+    if 'email' in data and data['email'] is not None:
+        email_to_update = data['email'].strip() # Strip whitespace
+        # Basic email format validation using regex
+        email_regex = r'^[\w\.-]+@[\w\.-]+\.\w+$'
+        if not re.match(email_regex, email_to_update):
+            errors['email'] = ['Invalid email format.']
+        else:
+            # Check if the email is already registered by another user
+            existing_user = Users.query.filter_by(email=email_to_update).first()
+            # Ensure the existing user is not the current user being updated
+            if existing_user and existing_user.id != user.id:
+                errors['email'] = ['Email address is already registered.']
+            else:
+                # If validation passes, update the email
+                user.email = email_to_update
+                updated_fields = True
+    # --- End Email Validation ---
+
+    if errors:
+        # If there are any validation errors (currently only email), return them
+        return jsonify({'errors': errors, 'message': 'Validation failed'}), 400
+
+    if not updated_fields:
+        return jsonify({"message": "No fields provided for update"}), 200 # OK
+
+    try:
+        bump_user_data_version(user.id)
+        db.session.commit()
+        # Ensure current_user is available if needed here (requires login_required)
+        # If this route is not login_required, might not have current_user
+        update_info_response = {
+            'message': 'Successfully updated personal info',
+            'firstName': user.firstName, # Use user object if current_user not guaranteed
+            'lastName': user.lastName,
+            'email': user.email,
+        }
+        return jsonify(update_info_response), 200 # OK
+    except Exception as e:
+        db.session.rollback() # Roll back changes if something goes wrong
+        print(f"Database error during update: {e}")
+        return jsonify({"error": "Database error during update"}), 500
+
+@bp.route('/taste_tailor_update_password', methods=['PUT'])
+def update_password():
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 415 # Unsupported Media Type
+
+    data = request.get_json()
+    user_id = data.get('id')
+    old_password = data.get('old_password')
+    new_password = data.get('new_password')
+    confirm_password = data.get('confirm_password')
+
+    if None in [user_id, old_password, new_password, confirm_password]:
+        return jsonify({"error": "User ID, old, new, and confirm password are required"}), 400 # Bad Request
+    
+    if len(old_password) < 8:
+        return jsonify({"error": "Old password must be at least 8 characters long."}), 400
+    
+    if len(new_password) < 8:
+        return jsonify({"error": "New password must be at least 8 characters long."}), 400
+    
+    if len(confirm_password) < 8:
+        return jsonify({"error": "Confirmation password must be at least 8 characters long."}), 400
+    
+    # Check character types: letters, numbers, and special characters
+    # `any(not char.isalnum() for char in new_password)` checks for special characters
+    # by finding if any character is *not* alphanumeric.
+    if not (any(char.isdigit() for char in old_password) and
+            any(char.isalpha() for char in old_password) and
+            any(not char.isalnum() for char in old_password)):
+        return jsonify({"error": "Old password must contain letters, numbers, and special characters."}), 400
+    
+    if not (any(char.isdigit() for char in new_password) and
+            any(char.isalpha() for char in new_password) and
+            any(not char.isalnum() for char in new_password)):
+        return jsonify({"error": "New password must contain letters, numbers, and special characters."}), 400
+    
+    if not (any(char.isdigit() for char in confirm_password) and
+            any(char.isalpha() for char in confirm_password) and
+            any(not char.isalnum() for char in confirm_password)):
+        return jsonify({"error": "Confirmation password must contain letters, numbers, and special characters."}), 400
+    # --- End Strong Password Validation ---
+    
+    user = Users.query.get_or_404(user_id)
+
+    if user is None:
+        return jsonify({"message": "User not found"}), 404 # Not Found
+    
+    if not user.check_password(old_password):
+        return jsonify({"error": "Incorrect old password"}), 401 # Unauthorized
+
+    if not new_password == confirm_password:
+        return jsonify({"error": "New password and confirm password do not match"}), 400
+
+    # Hash before the try block so a busy hashing queue answers 503 rather than 500
+    new_password_hash = password_hasher.hash(new_password)
+
+    try:
+        user.password = new_password_hash
+        bump_user_data_version(user.id)
+        db.session.commit()
+        return jsonify({"message": "Password updated successfully"}), 200 # OK
+    except Exception as e:
+        db.session.rollback() # Roll back changes if something goes wrong
+        print(f"Database error during password update: {e}")
+        return jsonify({"error": "An error occurred while updating the password"}), 500
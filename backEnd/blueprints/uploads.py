@@ -0,0 +1,54 @@
+import os
+
+from flask import Blueprint, current_app, request
+from werkzeug.security import safe_join
+
+from file_serving import serve_file
+from picture_store import PICTURE_SIZES, content_hash_tag, variant_filename
+
+bp = Blueprint('uploads', __name__)
+
+@bp.route('/uploads/profile_pictures/<filename>')
+def uploaded_file(filename):
+    try:
+        #Prevent serving invalid filenames like "null" or empty strings
+        if not filename or filename == 'null':
+            #print(f"Attempted to serve invalid filename: {filename}") # Corrected f-string
+            return "Invalid file request", 400 #Or 404, depending on desired behavior
+
+        # Reject names that would escape the upload folder or point at a directory
+        path = safe_join(current_app.config['UPLOAD_FOLDER'], filename)
+        if path is None or not os.path.isfile(path):
+            raise FileNotFoundError(path)
+
+        # ?size=small|medium picks a precomputed variant; the original is served until it has been generated
+        size = request.args.get('size')
+        fallback = False
+        if size is not None:
+            if size not in PICTURE_SIZES:
+                return f"size must be one of: {', '.join(PICTURE_SIZES)}", 400 # Bad Request
+            if os.path.exists(os.path.join(current_app.config['UPLOAD_FOLDER'], variant_filename(filename, size))):
+                filename = variant_filename(filename, size)
+            else:
+                fallback = True
+
+        # Content-addressed names can be cached for good. A size fallback can't, or the
+        # browser would keep the full original under the variant's URL.
+        tag = content_hash_tag(filename)
+        if tag is not None and not fallback:
+            etag, cache_control = tag, f"public, max-age={current_app.config['PICTURE_MAX_AGE']}, immutable"
+        else:
+            etag, cache_control = None, 'no-cache'
+
+        return serve_file(current_app.config['UPLOAD_FOLDER'], filename, etag, cache_control,
+                          mode=current_app.config['PICTURE_SERVE_MODE'], accel_prefix=current_app.config['PICTURE_ACCEL_PREFIX'])
+
+    except FileNotFoundError:
+        #Explicitly handle FileNotFoundError and return 404
+        print(f"File not found in upload folder: {filename}") # Corrected f-string
+        return "File not found", 404
+
+    except Exception as e:
+        #Catch any other unexpected errors during file serving
+        print(f"Error serving file {filename}: {e}") # Corrected f-string
+        return "Internal server error", 500
@@ -0,0 +1,175 @@
+import json
+import sys
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from extensions import db, menu_catalog
+from menu_data import MENU_ITEMS
+import order_transfer
+from profiling import PROFILE_MODES, make_profile_token
+from models import MenuItem, OrderItem, UserTasteProfile, find_taste_profile_mismatches, load_menu_catalog_version, rebuild_taste_profile_rows
+
+@click.command('rebuild-taste-profiles')
+@click.option('--verify-only', is_flag=True, help='Only check the stored profiles against the order history.')
+@with_appcontext
+def rebuild_taste_profiles(verify_only):
+    """Rebuilds user_taste_profiles from the order history and verifies it is consistent."""
+    if not verify_only:
+        rebuild_taste_profile_rows()
+        db.session.commit()
+        click.echo(f"Rebuilt {UserTasteProfile.query.count()} taste profile rows.")
+
+    mismatches = find_taste_profile_mismatches()
+    for (user_id, taste_id), stored, expected in mismatches:
+        click.echo(f"Mismatch for user {user_id}, taste {taste_id}: stored {stored}, expected {expected}")
+    if mismatches:
+        raise click.ClickException(f"{len(mismatches)} taste profile rows are inconsistent.")
+    click.echo("Taste profiles are consistent with the order history.")
+
+@click.command('seed-menu')
+@with_appcontext
+def seed_menu():
+    """Loads the menu from menu_data.py into the menu_items table (insert or update by id)."""
+    for item_data in MENU_ITEMS:
+        db.session.merge(MenuItem(
+            id=item_data['id'],
+            name=item_data['name'],
+            cuisine=item_data['cuisine'],
+            rating=item_data['rating'],
+            reviews=item_data['reviews'],
+            delivery_fee=item_data['delivery_fee'],
+            image_url=item_data['image_url'],
+            price_level=item_data['price_level'],
+            description=item_data['description'],
+            price=item_data['price'],
+            tastes=json.dumps(item_data['tastes']),
+            recommended=json.dumps(item_data['recommended']),
+        ))
+    db.session.commit()
+    click.echo(f"Seeded {len(MENU_ITEMS)} menu items (catalog version {load_menu_catalog_version()}).")
+
+def iter_order_item_positions(position_by_name):
+    """
+    Yields the catalog positions of the items in each past order, streaming order_items in batches.
+    """
+    rows = db.session.query(OrderItem.order_id, OrderItem.item_name) \
+        .order_by(OrderItem.order_id) \
+        .yield_per(1000)
+    current_order, positions = None, []
+    for order_id, item_name in rows:
+        if order_id != current_order:
+            if positions:
+                yield positions
+            current_order, positions = order_id, []
+        position = position_by_name.get(item_name)
+        if position is not None:
+            positions.append(position)
+    if positions:
+        yield positions
+
+@click.command('build-similarity')
+@click.option('--neighbours', default=20, show_default=True, help='Neighbours stored per menu item.')
+@click.option('--content-weight', default=0.5, show_default=True, help='Weight of taste similarity versus co-purchase similarity (0..1).')
+@with_appcontext
+def build_similarity(neighbours, content_weight):
+    """Computes item-item similarity and writes the top-N neighbour table used by /menu/<id>/similar."""
+    import similarity
+
+    snapshot = menu_catalog.refresh(force=True)
+    position_by_name = {item.name: position for position, item in enumerate(snapshot.items)}
+    co_purchases = similarity.count_co_purchases(iter_order_item_positions(position_by_name), len(snapshot.items))
+
+    table = similarity.build_neighbour_table(
+        [item.id for item in snapshot.items], snapshot.taste_matrix, co_purchases, neighbours, content_weight=content_weight)
+    similarity.save_neighbour_table(table, current_app.config['SIMILARITY_PATH'])
+    click.echo(f"Wrote neighbours for {len(table)} menu items to {current_app.config['SIMILARITY_PATH']}.")
+
+# Rows between progress lines of export-orders / import-orders
+PROGRESS_EVERY = 100_000
+
+def report_throughput(verb, count, started, err=True):
+    elapsed = time.perf_counter() - started
+    click.echo(f"{verb} {count} rows in {elapsed:.1f}s ({count / elapsed if elapsed else 0:,.0f} rows/s).", err=err)
+
+@click.command('export-orders')
+@click.option('--output', '-o', default='-', show_default=True, help="File to write, or '-' for stdout.")
+@click.option('--format', 'file_format', type=click.Choice(order_transfer.FORMATS), default=None, help='Defaults to csv for *.csv outputs, ndjson otherwise.')
+@click.option('--batch-size', default=order_transfer.DEFAULT_BATCH_SIZE, show_default=True, help='Rows fetched per database round trip.')
+@click.option('--user-id', type=int, default=None, help="Only export this user's order items.")
+@click.option('--since', type=click.DateTime(), default=None, help='Only export items delivered on or after this date.')
+@with_appcontext
+def export_orders(output, file_format, batch_size, user_id, since):
+    """Streams order items (with their orders' fields) as NDJSON or CSV, in constant memory."""
+    file_format = file_format or order_transfer.guess_format(output)
+    started = time.perf_counter()
+
+    def progress(count):
+        if count % PROGRESS_EVERY == 0:
+            report_throughput('Exported', count, started)
+
+    file = order_transfer.open_output(output, file_format)
+    try:
+        count = order_transfer.write_rows(order_transfer.iter_export_rows(batch_size, user_id, since), file, file_format, on_row=progress)
+    finally:
+        if file is not sys.stdout:
+            file.close()
+    # End the read transaction the streamed query held open
+    db.session.commit()
+    report_throughput('Exported', count, started)
+
+@click.command('import-orders')
+@click.argument('input_path', metavar='INPUT', default='-')
+@click.option('--format', 'file_format', type=click.Choice(order_transfer.FORMATS), default=None, help='Defaults to csv for *.csv inputs, ndjson otherwise.')
+@click.option('--batch-size', default=order_transfer.DEFAULT_BATCH_SIZE, show_default=True, help='Rows inserted per transaction.')
+@click.option('--skip-profiles', is_flag=True, help="Don't rebuild user_taste_profiles afterwards (run `flask rebuild-taste-profiles` later).")
+@with_appcontext
+def import_orders(input_path, file_format, batch_size, skip_profiles):
+    """
+    Loads an export-orders file (or stdin) in batched transactions, keeping the exported ids.
+    Stops at the first batch whose item or order ids are used by other data in this database;
+    items imported by an earlier run are left as they are.
+    """
+    file_format = file_format or order_transfer.guess_format(input_path)
+    importer = order_transfer.OrderImporter()
+    started = time.perf_counter()
+    next_report = PROGRESS_EVERY
+
+    file = order_transfer.open_input(input_path, file_format)
+    try:
+        for batch in order_transfer.chunked(order_transfer.read_records(file, file_format), batch_size):
+            importer.import_batch(batch)
+            if importer.inserted + importer.already_imported >= next_report:
+                report_throughput('Processed', importer.inserted + importer.already_imported, started)
+                next_report += PROGRESS_EVERY
+    except ValueError as e:
+        raise click.ClickException(f"{e} ({importer.inserted} rows were imported before it).")
+    finally:
+        if file is not sys.stdin:
+            file.close()
+    importer.finish()
+    report_throughput('Imported', importer.inserted, started, err=False)
+    if importer.already_imported:
+        click.echo(f"{importer.already_imported} rows had already been imported.")
+
+    if not skip_profiles and importer.inserted:
+        rebuild_started = time.perf_counter()
+        rebuild_taste_profile_rows()
+        db.session.commit()
+        click.echo(f"Rebuilt taste profiles in {time.perf_counter() - rebuild_started:.1f}s.")
+
+@click.command('profile-token')
+@click.option('--mode', type=click.Choice(PROFILE_MODES[1:]), default=None, help='Profiler to use instead of PROFILE_MODE.')
+@with_appcontext
+def profile_token(mode):
+    """Prints a signed X-Profile-Token header value that makes the server profile a request."""
+    if current_app.config['PROFILE_MODE'] == 'off':
+        click.echo("Warning: PROFILE_MODE is 'off', so the server ignores profile tokens.", err=True)
+    click.echo(make_profile_token(current_app.config['SECRET_KEY'], mode))
+    click.echo(f"Valid for {current_app.config['PROFILE_TOKEN_MAX_AGE']}s; profiles are written to {current_app.config['PROFILE_DIR']}.", err=True)
+
+def register_commands(app):
+    for command in (rebuild_taste_profiles, seed_menu, build_similarity, export_orders, import_orders, profile_token):
+        app.cli.add_command(command)
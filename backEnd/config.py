@@ -0,0 +1,106 @@
+import os
+
+from db_profiles import database_config
+from file_serving import SERVE_MODES
+from profiling import PROFILE_MODES
+
+
+def load_config(app):
+    """
+    Fills app.config from the environment (and .env). Returns the SQLite pragmas of the
+    selected engine profile, which create_app() installs once the engine exists.
+    """
+    # --- Flask Configuration for CSRF and Sessions ---
+    # Set a SECRET_KEY for CSRF protection and Sessions to work.
+    # It should be a long, random string. Ensure this is set and secret.
+    # For development, loading from .env is okay, but ensure the .env file exists
+    # and contains a SECRET_KEY.
+    secret_key = os.environ.get("SECRET_KEY")
+    if not secret_key:
+        # Fallback for development if .env is missing or key is not set
+        secret_key = os.urandom(24)
+
+    app.config["SECRET_KEY"] = secret_key
+
+    # Enable CSRF protection. This is usually True by default if SECRET_KEY is set,
+    # but it's good to be explicit.
+    app.config['WTF_CSRF_ENABLED'] = True
+
+    # Tell Flask-WTF to check for the CSRF token in the JSON body for POST requests.
+    # This is crucial when frontend sends data as JSON instead of form data.
+    app.config['WTF_CSRF_CHECK_JSON'] = True
+
+    # Flask Session Configuration
+    app.config["SESSION_PERMANENT"] = True # Suggested Change for Testing (was True already in PDF)
+    app.config["SESSION_TYPE"] = "filesystem" # Okay for development
+    # --- End Flask Session Configuration ---
+    app.config['SERVER_NAME'] = 'localhost:5000' # Ensure this matches backend's host and port - Only needed if using url_for(_external=True) outside of a request context or with subdomains
+
+    # Engine profile (DB_PROFILE=sqlite|pooled|default) decides the database URL, pool settings and SQLite pragmas
+    database_uri, engine_options, sqlite_pragmas = database_config(os.environ)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config['UPLOAD_FOLDER'] = os.environ.get("UPLOAD_FOLDER")
+    app.config['ALLOWED_EXTENSIONS'] = os.environ.get("ALLOWED_EXTENSIONS") # Corrected variable name back to ALLOWED_EXTENSIONS
+    # How often (in seconds) each worker checks whether the menu catalog changed
+    app.config['MENU_RELOAD_INTERVAL'] = int(os.environ.get("MENU_RELOAD_INTERVAL", 30))
+    # Password hashing: method/cost for new hashes (older hashes are upgraded on login) and where hashing runs.
+    # At most PASSWORD_HASH_MAX_PENDING hashes run or wait per worker process; requests beyond that wait
+    # PASSWORD_HASH_QUEUE_TIMEOUT seconds for a slot, then get a 503. PASSWORD_HASH_BACKEND=process hashes in a pool of
+    # PASSWORD_HASH_WORKERS processes: the request still waits for the result, so this only takes hashing off the
+    # worker's GIL (useful with threaded gunicorn workers), it doesn't free a sync worker.
+    app.config['PASSWORD_HASH_METHOD'] = os.environ.get("PASSWORD_HASH_METHOD", "pbkdf2:sha256")
+    app.config['PASSWORD_HASH_BACKEND'] = os.environ.get("PASSWORD_HASH_BACKEND", "inline")
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+    app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 32))
+    app.config['PASSWORD_HASH_QUEUE_TIMEOUT'] = float(os.environ.get("PASSWORD_HASH_QUEUE_TIMEOUT", 5))
+    # Users kept in each worker's user_loader cache, and how long (in seconds) an entry is trusted
+    app.config['USER_CACHE_SIZE'] = int(os.environ.get("USER_CACHE_SIZE", 1024))
+    app.config['USER_CACHE_TTL'] = float(os.environ.get("USER_CACHE_TTL", 60))
+    # Threads per worker that resize uploaded profile pictures into their size variants
+    app.config['PICTURE_WORKERS'] = int(os.environ.get("PICTURE_WORKERS", 2))
+    # How uploaded pictures are sent: 'sendfile' (from the worker, zero-copy under gunicorn), or 'x-sendfile' /
+    # 'x-accel-redirect' to hand the file to Apache / nginx (nginx needs an internal location at PICTURE_ACCEL_PREFIX)
+    app.config['PICTURE_SERVE_MODE'] = os.environ.get("PICTURE_SERVE_MODE", "sendfile")
+    app.config['PICTURE_ACCEL_PREFIX'] = os.environ.get("PICTURE_ACCEL_PREFIX", "/protected/profile_pictures")
+    # Browser/CDN lifetime (in seconds) of content-addressed pictures, whose bytes never change
+    app.config['PICTURE_MAX_AGE'] = int(os.environ.get("PICTURE_MAX_AGE", 365 * 24 * 3600))
+    if app.config['PICTURE_SERVE_MODE'] not in SERVE_MODES:
+        raise ValueError(f"PICTURE_SERVE_MODE must be one of: {', '.join(SERVE_MODES)}")
+    # Google's OpenID discovery document (point it at a local stand-in server for testing). Discovery metadata and
+    # signing keys are cached in memory and in OIDC_CACHE_DIR for OIDC_CACHE_TTL seconds, refreshed in the background
+    app.config['GOOGLE_OIDC_METADATA_URL'] = os.environ.get("GOOGLE_OIDC_METADATA_URL", "https://accounts.google.com/.well-known/openid-configuration")
+    app.config['OIDC_CACHE_DIR'] = os.environ.get("OIDC_CACHE_DIR", os.path.join(app.instance_path, 'oidc_cache'))
+    app.config['OIDC_CACHE_TTL'] = int(os.environ.get("OIDC_CACHE_TTL", 6 * 3600))
+    # Facebook endpoints (overridable to point the login flow at a local mock provider)
+    app.config['FACEBOOK_GRAPH_URL'] = os.environ.get("FACEBOOK_GRAPH_URL", "https://graph.facebook.com/")
+    app.config['FACEBOOK_DIALOG_URL'] = os.environ.get("FACEBOOK_DIALOG_URL", "https://www.facebook.com/dialog/oauth")
+    # Outbound calls to OAuth providers: timeouts in seconds, retries of failed connections / idempotent requests,
+    # and keep-alive connections kept per provider host in each worker
+    app.config['OAUTH_HTTP_CONNECT_TIMEOUT'] = float(os.environ.get("OAUTH_HTTP_CONNECT_TIMEOUT", 3.05))
+    app.config['OAUTH_HTTP_READ_TIMEOUT'] = float(os.environ.get("OAUTH_HTTP_READ_TIMEOUT", 10))
+    app.config['OAUTH_HTTP_RETRIES'] = int(os.environ.get("OAUTH_HTTP_RETRIES", 2))
+    app.config['OAUTH_HTTP_POOL_SIZE'] = int(os.environ.get("OAUTH_HTTP_POOL_SIZE", 10))
+    # Item-item neighbour table written by `flask build-similarity` and memory-mapped by each worker
+    app.config['SIMILARITY_PATH'] = os.environ.get("SIMILARITY_PATH", os.path.join(app.instance_path, 'item_similarity.npy'))
+    # Per-worker request/SQL metrics, written to METRICS_DIR every METRICS_FLUSH_INTERVAL seconds and added up by /metrics.
+    # Statements slower than SLOW_QUERY_MS (0 turns the log off) are logged to SLOW_QUERY_LOG, or stderr when unset
+    app.config['METRICS_DIR'] = os.environ.get("METRICS_DIR", os.path.join(app.instance_path, 'metrics'))
+    app.config['METRICS_FLUSH_INTERVAL'] = float(os.environ.get("METRICS_FLUSH_INTERVAL", 5))
+    app.config['SLOW_QUERY_MS'] = float(os.environ.get("SLOW_QUERY_MS", 200))
+    app.config['SLOW_QUERY_LOG'] = os.environ.get("SLOW_QUERY_LOG")
+    # Opt-in request profiling: PROFILE_MODE 'cprofile' (pstats files) or 'sampling' (collapsed stacks, sampled every
+    # PROFILE_SAMPLE_INTERVAL ms). Requests are profiled when they carry a signed X-Profile-Token header (valid for
+    # PROFILE_TOKEN_MAX_AGE seconds), or at random at PROFILE_SAMPLE_RATE (0..1), optionally only for the comma-separated
+    # PROFILE_ENDPOINTS (e.g. "orders.get_past_orders,auth.login"). PROFILE_DIR keeps at most PROFILE_MAX_BYTES of profiles
+    app.config['PROFILE_MODE'] = os.environ.get("PROFILE_MODE", "off")
+    app.config['PROFILE_SAMPLE_RATE'] = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+    app.config['PROFILE_SAMPLE_INTERVAL'] = float(os.environ.get("PROFILE_SAMPLE_INTERVAL", 5))
+    app.config['PROFILE_ENDPOINTS'] = [endpoint.strip() for endpoint in os.environ.get("PROFILE_ENDPOINTS", "").split(',') if endpoint.strip()]
+    app.config['PROFILE_TOKEN_MAX_AGE'] = int(os.environ.get("PROFILE_TOKEN_MAX_AGE", 24 * 3600))
+    app.config['PROFILE_DIR'] = os.environ.get("PROFILE_DIR", os.path.join(app.instance_path, 'profiles'))
+    app.config['PROFILE_MAX_BYTES'] = int(os.environ.get("PROFILE_MAX_BYTES", 100 * 1024 * 1024))
+    if app.config['PROFILE_MODE'] not in PROFILE_MODES:
+        raise ValueError(f"PROFILE_MODE must be one of: {', '.join(PROFILE_MODES)}")
+    return sqlite_pragmas
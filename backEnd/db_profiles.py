@@ -0,0 +1,69 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# DB_PROFILE values:
+#   sqlite  - SQLite tuned for several gunicorn workers: WAL, busy timeout and the pragmas below (the default)
+#   pooled  - a server database (PostgreSQL, MySQL...) at DATABASE_URL behind a tuned connection pool
+#   default - SQLAlchemy's own defaults, as the app used before profiles existed
+PROFILES = ('sqlite', 'pooled', 'default')
+DEFAULT_SQLITE_URI = 'sqlite:///site.db'
+
+
+def sqlite_pragmas(environ):
+    # Applied, in order, to every new SQLite connection
+    return (
+        # Readers don't block the writer and the writer doesn't block readers
+        ('journal_mode', 'WAL'),
+        # Wait this long (ms) for a lock instead of failing with "database is locked"
+        ('busy_timeout', int(environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))),
+        # Safe with WAL: a power loss can only lose the last transactions, never corrupt the file
+        ('synchronous', 'NORMAL'),
+        ('mmap_size', int(environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))),
+        # Negative values are KiB rather than pages
+        ('cache_size', -int(environ.get('SQLITE_CACHE_KIB', 64 * 1024))),
+    )
+
+
+def database_config(environ):
+    """
+    Returns (database_uri, engine_options, pragmas) for the profile named by DB_PROFILE.
+    pragmas is empty unless the SQLite profile is used.
+    """
+    profile = environ.get('DB_PROFILE', 'sqlite')
+    if profile not in PROFILES:
+        raise ValueError(f"DB_PROFILE must be one of: {', '.join(PROFILES)}")
+
+    if profile == 'pooled':
+        database_url = environ.get('DATABASE_URL')
+        if not database_url:
+            raise ValueError("DB_PROFILE=pooled requires DATABASE_URL")
+        engine_options = {
+            'pool_size': int(environ.get('DB_POOL_SIZE', 10)),
+            'max_overflow': int(environ.get('DB_MAX_OVERFLOW', 20)),
+            'pool_timeout': float(environ.get('DB_POOL_TIMEOUT', 30)),
+            # Recycle before typical server-side idle timeouts, and test connections before handing them out
+            'pool_recycle': int(environ.get('DB_POOL_RECYCLE', 1800)),
+            'pool_pre_ping': True,
+        }
+        return database_url, engine_options, ()
+
+    database_uri = environ.get('DATABASE_URL', DEFAULT_SQLITE_URI)
+    if profile == 'default':
+        return database_uri, {}, ()
+    # The driver timeout and the pragmas below only exist on SQLite
+    if make_url(database_uri).get_backend_name() != 'sqlite':
+        raise ValueError("DB_PROFILE=sqlite requires a sqlite:// DATABASE_URL; use DB_PROFILE=pooled for a server database")
+    # The driver's own lock timeout (seconds) matches busy_timeout
+    engine_options = {'connect_args': {'timeout': int(environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)) / 1000}}
+    return database_uri, engine_options, sqlite_pragmas(environ)
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
@@ -0,0 +1,108 @@
+import threading
+from functools import partial
+
+from flask import current_app
+from flask_cors import CORS
+from flask_login import LoginManager
+from flask_sqlalchemy import SQLAlchemy
+from flask_wtf.csrf import CSRFProtect
+from werkzeug.local import LocalProxy
+
+# Bound to the app by create_app()
+db = SQLAlchemy()
+login_manager = LoginManager()
+csrf = CSRFProtect()
+cors = CORS()
+
+_services_lock = threading.RLock()
+
+
+def _password_hasher(config):
+    from password_hashing import PasswordHasher
+    return PasswordHasher(
+        method=config['PASSWORD_HASH_METHOD'],
+        backend=config['PASSWORD_HASH_BACKEND'],
+        workers=config['PASSWORD_HASH_WORKERS'],
+        max_pending=config['PASSWORD_HASH_MAX_PENDING'],
+        queue_timeout=config['PASSWORD_HASH_QUEUE_TIMEOUT'],
+    )
+
+
+def _user_cache(config):
+    from user_cache import UserCache
+    return UserCache(max_size=config['USER_CACHE_SIZE'], ttl=config['USER_CACHE_TTL'])
+
+
+def _menu_catalog(config):
+    # numpy comes in with the catalog, so CLI commands that never touch the menu don't load it
+    from menu_catalog import MenuCatalog
+    from models import load_menu_catalog_version, load_menu_items
+    return MenuCatalog(load_menu_catalog_version, load_menu_items, reload_interval=config['MENU_RELOAD_INTERVAL'])
+
+
+def _neighbour_table(config):
+    from similarity import NeighbourTable
+    return NeighbourTable(config['SIMILARITY_PATH'])
+
+
+def _picture_variant_worker(config):
+    from picture_store import PictureVariantWorker
+    return PictureVariantWorker(workers=config['PICTURE_WORKERS'])
+
+
+def _outbound_http(config):
+    from http_client import OutboundHTTP
+    return OutboundHTTP(
+        connect_timeout=config['OAUTH_HTTP_CONNECT_TIMEOUT'],
+        read_timeout=config['OAUTH_HTTP_READ_TIMEOUT'],
+        retries=config['OAUTH_HTTP_RETRIES'],
+        pool_size=config['OAUTH_HTTP_POOL_SIZE'],
+    )
+
+
+def _google_oidc(config):
+    from oidc_cache import OIDCProviderCache
+    return OIDCProviderCache('google', config['GOOGLE_OIDC_METADATA_URL'], config['OIDC_CACHE_DIR'],
+                             ttl=config['OIDC_CACHE_TTL'], fetch=service('outbound_http').get_json)
+
+
+SERVICE_FACTORIES = {
+    'password_hasher': _password_hasher,
+    'user_cache': _user_cache,
+    'menu_catalog': _menu_catalog,
+    'neighbour_table': _neighbour_table,
+    'picture_variant_worker': _picture_variant_worker,
+    'outbound_http': _outbound_http,
+    'google_oidc': _google_oidc,
+}
+
+
+def service(name):
+    """
+    Returns the current app's instance of a per-worker service, building it (and importing
+    its module) on first use. Needs an app context.
+    """
+    services = current_app.extensions.setdefault('taste_tailor_services', {})
+    instance = services.get(name)
+    if instance is None:
+        with _services_lock:
+            instance = services.get(name)
+            if instance is None:
+                instance = services[name] = SERVICE_FACTORIES[name](current_app.config)
+    return instance
+
+
+# Module-level handles on the services above, resolved against the current app
+password_hasher = LocalProxy(partial(service, 'password_hasher'))
+user_cache = LocalProxy(partial(service, 'user_cache'))
+menu_catalog = LocalProxy(partial(service, 'menu_catalog'))
+neighbour_table = LocalProxy(partial(service, 'neighbour_table'))
+picture_variant_worker = LocalProxy(partial(service, 'picture_variant_worker'))
+outbound_http = LocalProxy(partial(service, 'outbound_http'))
+google_oidc = LocalProxy(partial(service, 'google_oidc'))
+
+
+def init_migrations(app):
+    # Flask-Migrate pulls in alembic, which only the `flask db` commands and scripts that migrate need
+    from flask_migrate import Migrate
+    return Migrate(app, db)
@@ -0,0 +1,100 @@
+import mimetypes
+import os
+
+from flask import current_app, request
+
+# Bytes per read when the server can't sendfile and the body is streamed from Python
+STREAM_BLOCK_SIZE = 64 * 1024
+SERVE_MODES = ('sendfile', 'x-sendfile', 'x-accel-redirect')
+
+
+def iter_file_range(file, length, block_size=STREAM_BLOCK_SIZE):
+    try:
+        while length > 0:
+            block = file.read(min(block_size, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        file.close()
+
+
+def requested_range(size, etag, last_modified):
+    """
+    Returns (start, length) for a satisfiable single-range request, None to send the whole file,
+    or False when the range can't be satisfied. Multi-range requests get the whole file.
+    """
+    byte_range = request.range
+    if byte_range is None or byte_range.units != 'bytes' or len(byte_range.ranges) != 1:
+        return None
+    # If-Range: only honour the range when the client's copy is still the current one
+    if_range = request.if_range
+    if if_range.etag is not None and if_range.etag != etag:
+        return None
+    if if_range.date is not None and if_range.date.timestamp() < int(last_modified):
+        return None
+
+    content_range = byte_range.range_for_length(size)
+    if content_range is None:
+        return False
+    start, stop = content_range
+    return start, stop - start
+
+
+def serve_file(directory, filename, etag, cache_control, mode='sendfile', accel_prefix=None):
+    """
+    Serves directory/filename with a strong ETag (derived from mtime and size when etag is None),
+    Last-Modified and the given Cache-Control, answering If-None-Match with 304 and single byte
+    ranges with 206.
+
+    mode 'x-sendfile' and 'x-accel-redirect' only send headers and let the front server (Apache
+    mod_xsendfile / nginx internal location at accel_prefix) stream the file, ranges included.
+    mode 'sendfile' streams from the worker: under gunicorn the open file is handed back as
+    wsgi.file_wrapper, which gunicorn sends with os.sendfile from the current offset for
+    Content-Length bytes, so the bytes never pass through Python.
+    Raises FileNotFoundError when the file doesn't exist.
+    """
+    path = os.path.join(directory, filename)
+    stat = os.stat(path)
+    if etag is None:
+        etag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+    response = current_app.response_class(status=200, mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+    response.set_etag(etag)
+    response.last_modified = int(stat.st_mtime)
+    response.headers['Cache-Control'] = cache_control
+    response.headers['Accept-Ranges'] = 'bytes'
+
+    if request.if_none_match.contains(etag):
+        response.status_code = 304 # Not Modified
+        return response
+
+    if mode == 'x-sendfile':
+        response.headers['X-Sendfile'] = os.path.abspath(path)
+        return response
+    if mode == 'x-accel-redirect':
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{filename}"
+        return response
+
+    byte_range = requested_range(stat.st_size, etag, stat.st_mtime)
+    if byte_range is False:
+        response.status_code = 416 # Range Not Satisfiable
+        response.headers['Content-Range'] = f"bytes */{stat.st_size}"
+        return response
+    start, length = byte_range or (0, stat.st_size)
+    if byte_range:
+        response.status_code = 206 # Partial Content
+        response.headers['Content-Range'] = f"bytes {start}-{start + length - 1}/{stat.st_size}"
+
+    file = open(path, 'rb')
+    file.seek(start)
+    file_wrapper = request.environ.get('wsgi.file_wrapper')
+    # Only gunicorn is known to stop a wrapped file at Content-Length; other servers get a bounded stream
+    if file_wrapper is not None and request.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn'):
+        response.response = file_wrapper(file, STREAM_BLOCK_SIZE)
+    else:
+        response.response = iter_file_range(file, length)
+    response.direct_passthrough = True
+    response.content_length = length
+    return response
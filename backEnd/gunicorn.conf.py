@@ -0,0 +1,25 @@
+# Gunicorn picks this file up automatically when started from the backEnd directory (see Procfile)
+
+def post_worker_init(worker):
+    from extensions import google_oidc, menu_catalog
+    app = worker.wsgi
+
+    # Load the menu snapshot before the worker starts accepting requests
+    with app.app_context():
+        try:
+            menu_catalog.refresh(force=True)
+        except Exception as e:
+            print(f"Error preloading menu catalog: {e}")
+
+        # Google's discovery metadata and signing keys, so the first login doesn't wait on them
+        try:
+            google_oidc.prewarm()
+        except Exception as e:
+            print(f"Error prewarming Google OpenID metadata: {e}")
+
+
+def worker_exit(server, worker):
+    # Write the worker's final counts, so they keep adding up in /metrics after it exits
+    app = getattr(worker, 'wsgi', None)
+    if app is not None:
+        app.extensions['taste_tailor_metrics'].flush()
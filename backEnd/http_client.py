@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Upper bounds (seconds) of the outbound latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyStats:
+    """Per-host request counts, failures and a latency histogram for outbound calls."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def record(self, host, seconds, failed):
+        with self._lock:
+            stats = self._hosts.get(host)
+            if stats is None:
+                stats = self._hosts[host] = {'count': 0, 'failures': 0, 'seconds': 0.0, 'buckets': [0] * len(self.buckets)}
+            stats['count'] += 1
+            stats['failures'] += int(failed)
+            stats['seconds'] += seconds
+            for position, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    stats['buckets'][position] += 1
+                    break
+
+    def snapshot(self):
+        with self._lock:
+            return {host: {**stats, 'buckets': list(stats['buckets'])} for host, stats in self._hosts.items()}
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter shared by every session of a worker, so connections to a provider are kept alive
+    between requests. Applies a default (connect, read) timeout, records latency per host, and
+    ignores close() from short-lived sessions (authlib closes its session after each call).
+    """
+
+    def __init__(self, timeout, stats, **kwargs):
+        self.timeout = timeout
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        host = urlsplit(request.url).netloc
+        started = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except Exception:
+            self.stats.record(host, time.perf_counter() - started, failed=True)
+            raise
+        self.stats.record(host, time.perf_counter() - started, failed=response.status_code >= 500)
+        return response
+
+    def close(self):
+        pass
+
+    def shutdown(self):
+        super().close()
+
+
+class OutboundHTTP:
+    """
+    Keep-alive HTTP for calls to OAuth providers, one connection pool per worker process.
+
+    Every request gets connect_timeout / read_timeout unless the caller passes its own. Connection
+    failures are retried up to `retries` times for any method (nothing was sent yet); read failures and
+    502/503/504 answers only for GET, since a token exchange must not be replayed.
+    """
+
+    def __init__(self, connect_timeout=3.05, read_timeout=10, retries=2, pool_size=10):
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.pool_size = pool_size
+        self.stats = LatencyStats()
+        self._adapter = None
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def adapter(self):
+        # Created per process: connections opened before a fork must not be shared by workers
+        if self._adapter is None or self._pid != os.getpid():
+            with self._lock:
+                if self._adapter is None or self._pid != os.getpid():
+                    retry = Retry(total=self.retries, connect=self.retries, read=self.retries, status=self.retries,
+                                  status_forcelist=(502, 503, 504), allowed_methods=frozenset({'GET', 'HEAD'}),
+                                  backoff_factor=0.1, raise_on_status=False)
+                    self._adapter = PooledHTTPAdapter(self.timeout, self.stats, max_retries=retry,
+                                                      pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                    self._session = None
+                    self._pid = os.getpid()
+        return self._adapter
+
+    def mount(self, session):
+        """Routes an existing requests session (e.g. authlib's OAuth2Session) through the shared pool."""
+        adapter = self.adapter()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def session(self):
+        self.adapter()
+        if self._session is None:
+            self._session = self.mount(requests.Session())
+        return self._session
+
+    def get_json(self, url):
+        response = self.session().get(url)
+        response.raise_for_status()
+        return response.json()
+
+    def shutdown(self):
+        if self._adapter is not None and self._pid == os.getpid():
+            self._adapter.shutdown()
+        self._adapter = None
+        self._session = None
+
+
+def pooled_oauth_client_cls(outbound_http, base=None):
+    """Returns an authlib Flask client class whose token and API calls go through outbound_http's pool."""
+    if base is None:
+        from authlib.integrations.flask_client import FlaskOAuth2App as base
+
+    class PooledOAuthApp(base):
+        def _get_oauth_client(self, **metadata):
+            return outbound_http.mount(super()._get_oauth_client(**metadata))
+
+    return PooledOAuthApp
@@ -0,0 +1,111 @@
+import json
+import threading
+import time
+
+import numpy as np
+
+import recommender
+from facet_index import FacetIndex
+
+
+class MenuItemRecord:
+    """Read-only, slot-based copy of a MenuItem row. Much smaller than an ORM instance."""
+    __slots__ = ('id', 'name', 'cuisine', 'rating', 'reviews', 'delivery_fee', 'image_url',
+                 'price_level', 'description', 'price', 'tastes', 'recommended')
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError('MenuItemRecord is read-only')
+
+    def to_dict(self):
+        # Keys follow the Restaurant interface used by the frontend, with a numeric deliveryFee
+        return {
+            'id': self.id,
+            'name': self.name,
+            'cuisine': self.cuisine,
+            'rating': self.rating,
+            'reviews': self.reviews,
+            'deliveryFee': self.delivery_fee,
+            'imageUrl': self.image_url,
+            'priceLevel': self.price_level,
+            'description': self.description,
+            'actualPrice': self.price,
+            'tastes': list(self.tastes),
+            'recommended': list(self.recommended),
+        }
+
+
+class MenuSnapshot:
+    """
+    Immutable view of the whole catalog at one catalog version.
+    Everything a request needs (records, lookups, numeric columns, taste vectors, facet bitsets
+    and the serialized /menu payload) is computed once when the snapshot is built.
+    """
+    __slots__ = ('version', 'items', 'index_by_id', 'prices', 'delivery_fees', 'ratings',
+                 'price_levels', 'cuisine_codes', 'cuisine_code_by_name', 'taste_index', 'taste_matrix', 'facets', 'payload')
+
+    def __init__(self, version, items):
+        self.version = version
+        self.items = tuple(items)
+        self.index_by_id = {item.id: position for position, item in enumerate(self.items)}
+        self.prices = np.array([item.price for item in self.items], dtype=np.float64)
+        self.delivery_fees = np.array([item.delivery_fee for item in self.items], dtype=np.float64)
+        self.ratings = np.array([item.rating for item in self.items], dtype=np.float64)
+        self.price_levels = np.array([item.price_level for item in self.items], dtype=np.int8)
+        # Cuisines are stored as small integer codes so filters compare numbers, not strings
+        self.cuisine_code_by_name = {}
+        for item in self.items:
+            self.cuisine_code_by_name.setdefault(item.cuisine, len(self.cuisine_code_by_name))
+        self.cuisine_codes = np.array([self.cuisine_code_by_name[item.cuisine] for item in self.items], dtype=np.int32)
+        self.taste_index = recommender.build_taste_index(item.tastes for item in self.items)
+        self.taste_matrix = recommender.build_item_matrix([item.tastes for item in self.items], self.taste_index)
+        self.facets = FacetIndex(self.items)
+        self.payload = json.dumps([item.to_dict() for item in self.items]).encode('utf-8')
+
+    def get(self, item_id):
+        position = self.index_by_id.get(item_id)
+        return self.items[position] if position is not None else None
+
+
+class MenuCatalog:
+    """
+    Holds the current MenuSnapshot for this worker and swaps in a new one when the catalog
+    version changes.
+
+    load_version() returns the current catalog version and load_items(version) returns the
+    MenuItemRecords for it; both are supplied by the app so this module stays free of
+    database code. The version is checked at most once every reload_interval seconds, so
+    ordinary reads are a plain attribute access and never touch the database.
+    """
+
+    def __init__(self, load_version, load_items, reload_interval=30):
+        self._load_version = load_version
+        self._load_items = load_items
+        self.reload_interval = reload_interval
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.reload_interval:
+            return snapshot
+        return self.refresh()
+
+    def refresh(self, force=False):
+        """Reloads the snapshot if the catalog version changed (or always when force is set)."""
+        with self._lock:
+            # Another thread may have refreshed while this one waited on the lock
+            if not force and self._snapshot is not None and time.monotonic() - self._checked_at < self.reload_interval:
+                return self._snapshot
+
+            version = self._load_version()
+            if force or self._snapshot is None or self._snapshot.version != version:
+                # Build the new snapshot completely before publishing it,
+                # so readers only ever see the old one or the new one
+                self._snapshot = MenuSnapshot(version, self._load_items(version))
+            self._checked_at = time.monotonic()
+            return self._snapshot
@@ -0,0 +1,174 @@
+# Server-side copy of the menu catalog.
+# Mirrors the `initialRestaurants` array in frontEnd/taste-tailor/app/context/RestaurantContext.tsx,
+# but with numeric delivery fees so the backend never has to parse strings like "$2 Delivery Fee".
+
+MENU_ITEMS = [
+    {
+        'id': 1,
+        'name': 'Pork Cartilage Noodle Soup',
+        'cuisine': 'Chinese',
+        'rating': 5,
+        'reviews': '1000+',
+        'delivery_fee': 2.0,
+        'image_url': '/images/assets/lanzhou_noodle.jpg',
+        'price_level': 2,
+        'description': 'Savor the authentic blend of tender pork cartilage and hearty noodles in this classic Chinese soup.',
+        'price': 15.0,
+        'tastes': ['Savory', 'Umami', 'Mild Spicy'],
+        'recommended': ['Dim Sum', 'Peking Duck', 'Chow Mein'],
+    },
+    {
+        'id': 2,
+        'name': 'Signature Wagyu Rice Signature Teriyaki Sauce',
+        'cuisine': 'Japanese',
+        'rating': 4.9,
+        'reviews': '1000+',
+        'delivery_fee': 1.0,
+        'image_url': '/images/assets/omi_wagyu.jpg',
+        'price_level': 3,
+        'description': 'Indulge in premium Japanese flavors with tender Wagyu rice paired with a rich, authentic teriyaki sauce.',
+        'price': 100.0,
+        'tastes': ['Umami', 'Savory', 'Slightly Sweet'],
+        'recommended': ['Sushi Platter', 'Tempura', 'Miso Soup'],
+    },
+    {
+        'id': 3,
+        'name': 'Stone Pot Beef Bibimbap',
+        'cuisine': 'Korean',
+        'rating': 4.6,
+        'reviews': '500',
+        'delivery_fee': 2.5,
+        'image_url': '/images/assets/surasang_bibimbap.jpeg',
+        'price_level': 2,
+        'description': 'Experience the sizzling flavor and vibrant colors of this traditional Korean stone pot bibimbap.',
+        'price': 20.0,
+        'tastes': ['Spicy', 'Garlicky', 'Savory'],
+        'recommended': ['Korean BBQ', 'Kimchi Stew', 'Bibim Naengmyeon'],
+    },
+    {
+        'id': 4,
+        'name': 'Veggie Chilli Fries',
+        'cuisine': 'Mexican',
+        'rating': 4.2,
+        'reviews': '749',
+        'delivery_fee': 2.99,
+        'image_url': '/images/assets/veggie_fries.jpg',
+        'price_level': 1,
+        'description': 'Crunch into our zesty Mexican-inspired veggie chilli fries, a perfect blend of spice and crunch.',
+        'price': 5.0,
+        'tastes': ['Spicy', 'Zesty', 'Smoky'],
+        'recommended': ['Taco Salad', 'Quesadillas', 'Guacamole'],
+    },
+    {
+        'id': 5,
+        'name': 'Coffee Latte',
+        'cuisine': 'Coffee',
+        'rating': 5,
+        'reviews': '1000',
+        'delivery_fee': 0.99,
+        'image_url': '/images/assets/coffee_latte.jpg',
+        'price_level': 1,
+        'description': 'Enjoy a smooth and creamy coffee latte, crafted to perfection with a rich coffee aroma.',
+        'price': 8.0,
+        'tastes': ['Bitter', 'Smooth', 'Nutty'],
+        'recommended': ['Espresso', 'Cappuccino', 'Mocha'],
+    },
+    {
+        'id': 6,
+        'name': 'Signature Mango Milk Flower',
+        'cuisine': 'Bubble Tea',
+        'rating': 4.7,
+        'reviews': '500',
+        'delivery_fee': 1.99,
+        'image_url': '/images/assets/mango_milk.jpg',
+        'price_level': 1,
+        'description': 'Taste the tropical charm in our Signature Mango Milk Flower bubble tea, a refreshing burst of flavor.',
+        'price': 7.5,
+        'tastes': ['Sweet', 'Fruity', 'Creamy'],
+        'recommended': ['Taro Bubble Tea', 'Brown Sugar Boba', 'Matcha Latte Bubble Tea'],
+    },
+    {
+        'id': 7,
+        'name': 'Floraison de Myrtilles',
+        'cuisine': 'Dessert',
+        'rating': 4.8,
+        'reviews': '1000',
+        'delivery_fee': 2.99,
+        'image_url': '/images/assets/cake.png',
+        'price_level': 3,
+        'description': 'Indulge in this exquisite dessert featuring the delicate essence of blueberries in a refined presentation.',
+        'price': 120.0,
+        'tastes': ['Sweet', 'Rich', 'Decadent'],
+        'recommended': ['Chocolate Lava Cake', 'Creme Brulee', 'Macarons'],
+    },
+    {
+        'id': 8,
+        'name': 'Mighty Melbourne',
+        'cuisine': 'Burger',
+        'rating': 4.4,
+        'reviews': '946',
+        'delivery_fee': 1.5,
+        'image_url': '/images/assets/burger.png',
+        'price_level': 2,
+        'description': 'Sink your teeth into the Mighty Melbourne burger, a towering delight loaded with flavor and freshness.',
+        'price': 12.0,
+        'tastes': ['Juicy', 'Savory', 'Smoky'],
+        'recommended': ['Cheeseburger', 'Fries', 'Onion Rings'],
+    },
+    {
+        'id': 9,
+        'name': 'Habanero Hot & Crispy™ Variety Feast',
+        'cuisine': 'Fast Food',
+        'rating': 3.8,
+        'reviews': '428',
+        'delivery_fee': 1.5,
+        'image_url': '/images/assets/fast_food.png',
+        'price_level': 2,
+        'description': 'Experience a burst of bold flavors with our Habanero Hot & Crispy™ feast, a fast food favorite packed with heat.',
+        'price': 30.0,
+        'tastes': ['Crispy', 'Spicy', 'Tangy'],
+        'recommended': ['Loaded Nachos', 'Chicken Wings', 'Fries'],
+    },
+    {
+        'id': 10,
+        'name': 'Pizza by the Slice',
+        'cuisine': 'Pizza',
+        'rating': 4.5,
+        'reviews': '1000',
+        'delivery_fee': 3.0,
+        'image_url': '/images/assets/pizza.jpg',
+        'price_level': 2,
+        'description': 'Delight in the fiery kick of our Habanero Hot & Crispy™ pizza, merging bold spices with melty cheese.',
+        'price': 25.0,
+        'tastes': ['Cheesy', 'Spicy', 'Crispy'],
+        'recommended': ['Pepperoni Pizza', 'Margherita Pizza', 'BBQ Chicken Pizza'],
+    },
+    {
+        'id': 11,
+        'name': 'Miso Falalalafel',
+        'cuisine': 'Salad',
+        'rating': 4.9,
+        'reviews': '500',
+        'delivery_fee': 2.0,
+        'image_url': '/images/assets/salad.png',
+        'price_level': 2,
+        'description': 'Relish a fresh twist on traditional falafel with a miso infusion, combining crisp greens and bold flavors.',
+        'price': 35.0,
+        'tastes': ['Fresh', 'Crisp', 'Tangy'],
+        'recommended': ['Caesar Salad', 'Greek Salad', 'Quinoa Salad'],
+    },
+    {
+        'id': 12,
+        'name': 'Pad Thai Chicken Noodles',
+        'cuisine': 'Thai',
+        'rating': 4.9,
+        'reviews': '825',
+        'delivery_fee': 0.5,
+        'image_url': '/images/assets/pad_thai.jpg',
+        'price_level': 2,
+        'description': 'Enjoy the perfect balance of sweet, sour, and savory flavors in our traditional Pad Thai Chicken Noodles.',
+        'price': 20.0,
+        'tastes': ['Spicy', 'Tangy', 'Herbal'],
+        'recommended': ['Green Curry', 'Tom Yum Soup', 'Mango Sticky Rice'],
+    },
+]
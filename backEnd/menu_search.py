@@ -0,0 +1,43 @@
+import re
+
+from extensions import db
+from models import MenuItem
+
+# bm25() weight of a match in each indexed column (name, description, cuisine, tastes)
+COLUMN_WEIGHTS = (10.0, 1.0, 4.0, 3.0)
+# Words of a query beyond this are ignored
+MAX_QUERY_TERMS = 8
+
+
+def query_terms(text):
+    return re.findall(r'\w+', text.lower())[:MAX_QUERY_TERMS]
+
+
+def match_expression(terms):
+    """
+    FTS5 query where every term must match the start of a word, so 'spic nood' finds 'Spicy
+    Noodles'. Terms are quoted, so user input can't inject FTS operators.
+    """
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_menu_ids(terms, limit, offset):
+    """
+    Returns [(menu_item_id, score)] for the menu items matching every term, best first.
+    On SQLite the menu_items_fts index ranks them by BM25 (higher score is better); on other
+    databases they are matched with LIKE and ordered by rating, with a score of None.
+    """
+    if db.engine.dialect.name == 'sqlite':
+        weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+        rows = db.session.execute(db.text(
+            f"SELECT rowid, bm25(menu_items_fts, {weights}) AS rank FROM menu_items_fts "
+            "WHERE menu_items_fts MATCH :query ORDER BY rank, rowid LIMIT :limit OFFSET :offset"
+        ), {'query': match_expression(terms), 'limit': limit, 'offset': offset})
+        # bm25() is lower for better matches
+        return [(item_id, round(-rank, 4)) for item_id, rank in rows]
+
+    columns = (MenuItem.name, MenuItem.description, MenuItem.cuisine, MenuItem.tastes)
+    query = db.select(MenuItem.id).order_by(MenuItem.rating.desc(), MenuItem.id).limit(limit).offset(offset)
+    for term in terms:
+        query = query.where(db.or_(*(db.func.lower(column).contains(term, autoescape=True) for column in columns)))
+    return [(item_id, None) for item_id in db.session.execute(query).scalars()]
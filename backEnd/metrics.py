@@ -0,0 +1,317 @@
+import glob
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+PREFIX = 'taste_tailor'
+# Upper bounds (seconds) of the request latency histogram buckets
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds of the SQL-queries-per-request histogram buckets
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# name: (type, help), in the order they are exported
+METRICS = {
+    'http_requests_total': ('counter', 'HTTP requests by endpoint, method and status code.'),
+    'http_request_duration_seconds': ('histogram', 'Time from request start until the response is returned (excludes streamed bodies).'),
+    'sql_queries_per_request': ('histogram', 'SQL statements executed while handling one request.'),
+    'sql_queries_total': ('counter', 'SQL statements executed, by endpoint.'),
+    'sql_duration_seconds_total': ('counter', 'Time spent executing SQL statements, by endpoint.'),
+    'sql_slow_queries_total': ('counter', 'SQL statements slower than SLOW_QUERY_MS, by endpoint.'),
+    'user_cache_hits_total': ('counter', 'user_loader lookups answered from the per-worker user cache.'),
+    'user_cache_misses_total': ('counter', 'user_loader lookups that had to query the users table.'),
+    'user_cache_entries': ('gauge', 'Users held in the user caches of the live workers.'),
+    'outbound_requests_total': ('counter', 'Requests to OAuth providers, by host.'),
+    'outbound_failures_total': ('counter', 'Requests to OAuth providers that failed or got a 5xx, by host.'),
+    'outbound_request_duration_seconds': ('histogram', 'Latency of requests to OAuth providers, by host.'),
+    'workers': ('gauge', 'Live worker processes reporting metrics.'),
+}
+
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _process_group():
+    # gunicorn workers report under their master, so a restarted server never adds up an older run's files
+    return os.getppid() if 'gunicorn.arbiter' in sys.modules else os.getpid()
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class WorkerMetrics:
+    """
+    Counters and histograms of one worker process, periodically written to
+    <directory>/<group>-<pid>.json (write-then-rename) so any worker can add up every worker's
+    numbers when /metrics is scraped. Counters of exited workers keep counting towards the totals;
+    their gauges are dropped.
+
+    collectors are called at each flush and return {'counters': [...], 'gauges': [...],
+    'histograms': [...]} lists of (name, labels, value) for state kept outside this class.
+    """
+
+    def __init__(self, directory, flush_interval=5.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.collectors = []
+        self._lock = threading.Lock()
+        self._pid = None
+        self._reset()
+
+    def _reset(self):
+        # Called in each new process: a forked worker must not re-export its parent's numbers
+        self._counters = {}
+        self._histograms = {}
+        self._dirty = False
+        self._pid = os.getpid()
+        self._flusher = None
+
+    def _ensure_process(self):
+        if self._pid != os.getpid():
+            self._reset()
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_periodically, name='metrics-flush', daemon=True)
+            self._flusher.start()
+
+    def inc(self, name, labels, value=1):
+        with self._lock:
+            self._ensure_process()
+            key = (name, _key(labels))
+            self._counters[key] = self._counters.get(key, 0) + value
+            self._dirty = True
+
+    def observe(self, name, labels, value, bounds):
+        with self._lock:
+            self._ensure_process()
+            key = (name, _key(labels))
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # One slot per bound plus +Inf; counts are per bucket, made cumulative when rendered
+                histogram = self._histograms[key] = {'bounds': list(bounds), 'buckets': [0] * (len(bounds) + 1), 'sum': 0.0, 'count': 0}
+            for position, bound in enumerate(bounds):
+                if value <= bound:
+                    histogram['buckets'][position] += 1
+                    break
+            else:
+                histogram['buckets'][-1] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+            self._dirty = True
+
+    def snapshot(self):
+        with self._lock:
+            counters = [(name, dict(labels), value) for (name, labels), value in self._counters.items()]
+            histograms = [(name, dict(labels), dict(histogram, buckets=list(histogram['buckets'])))
+                          for (name, labels), histogram in self._histograms.items()]
+        gauges = []
+        for collector in self.collectors:
+            try:
+                collected = collector()
+            except Exception as e:
+                print(f"Error collecting metrics from {collector}: {e}")
+                continue
+            counters.extend(collected.get('counters', ()))
+            gauges.extend(collected.get('gauges', ()))
+            histograms.extend(collected.get('histograms', ()))
+        return {'pid': os.getpid(), 'counters': counters, 'gauges': gauges, 'histograms': histograms}
+
+    def flush(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{_process_group()}-{os.getpid()}.json")
+            temporary_path = f"{path}.tmp"
+            with open(temporary_path, 'w', encoding='utf-8') as file:
+                json.dump(self.snapshot(), file)
+            os.replace(temporary_path, path)
+            self._dirty = False
+        except OSError as e:
+            print(f"Error writing metrics to {self.directory}: {e}")
+
+    def _flush_periodically(self):
+        remove_stale_files(self.directory)
+        while True:
+            time.sleep(self.flush_interval)
+            if self._dirty:
+                self.flush()
+
+
+def remove_stale_files(directory):
+    """Deletes the files of earlier runs (whose master, or single process, has exited)."""
+    group = _process_group()
+    for path in glob.glob(os.path.join(directory, '*-*.json')):
+        file_group = int(os.path.basename(path).split('-')[0])
+        if file_group != group and not _is_alive(file_group):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels_text(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in sorted(labels.items())) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def collect(directory):
+    """Adds up the files of every worker of this server and renders them in the Prometheus text format."""
+    group = _process_group()
+    counters, gauges, histograms = {}, {}, {}
+    live_workers = 0
+    for path in glob.glob(os.path.join(directory, f"{group}-*.json")):
+        try:
+            with open(path, encoding='utf-8') as file:
+                snapshot = json.load(file)
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in snapshot['counters']:
+            key = (name, _key(labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, histogram in snapshot['histograms']:
+            key = (name, _key(labels))
+            total = histograms.get(key)
+            if total is None or total['bounds'] != histogram['bounds']:
+                histograms[key] = dict(histogram, buckets=list(histogram['buckets']))
+                continue
+            total['buckets'] = [a + b for a, b in zip(total['buckets'], histogram['buckets'])]
+            total['sum'] += histogram['sum']
+            total['count'] += histogram['count']
+        if _is_alive(snapshot['pid']):
+            live_workers += 1
+            for name, labels, value in snapshot['gauges']:
+                key = (name, _key(labels))
+                gauges[key] = gauges.get(key, 0) + value
+    gauges[('workers', ())] = live_workers
+
+    lines = []
+    for name, (metric_type, help_text) in METRICS.items():
+        full_name = f"{PREFIX}_{name}"
+        if metric_type == 'histogram':
+            samples = sorted((labels, histogram) for (metric, labels), histogram in histograms.items() if metric == name)
+        else:
+            values = counters if metric_type == 'counter' else gauges
+            samples = sorted((labels, value) for (metric, labels), value in values.items() if metric == name)
+        if not samples:
+            continue
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} {metric_type}")
+        for labels, value in samples:
+            labels = dict(labels)
+            if metric_type != 'histogram':
+                lines.append(f"{full_name}{_labels_text(labels)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(value['bounds'] + [float('inf')], value['buckets']):
+                cumulative += count
+                lines.append(f"{full_name}_bucket{_labels_text(dict(labels, le=_number(float(bound))))} {cumulative}")
+            lines.append(f"{full_name}_sum{_labels_text(labels)} {_number(float(value['sum']))}")
+            lines.append(f"{full_name}_count{_labels_text(labels)} {value['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+def _endpoint():
+    return request.endpoint or 'unmatched'
+
+
+def init_request_metrics(app, registry):
+    """Times every request and counts the SQL it ran, per endpoint."""
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        g.sql_queries = 0
+
+    @app.after_request
+    def record_request(response):
+        started = g.get('request_started')
+        if started is not None:
+            labels = {'endpoint': _endpoint(), 'method': request.method}
+            registry.inc('http_requests_total', dict(labels, status=str(response.status_code)))
+            registry.observe('http_request_duration_seconds', labels, time.perf_counter() - started, REQUEST_BUCKETS)
+            registry.observe('sql_queries_per_request', {'endpoint': labels['endpoint']}, g.get('sql_queries', 0), QUERY_COUNT_BUCKETS)
+        return response
+
+
+def slow_query_logger(path=None):
+    logger = logging.getLogger(f"{PREFIX}.slow_queries")
+    if not logger.handlers:
+        handler = logging.FileHandler(path) if path else logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(asctime)s [%(process)d] %(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.WARNING)
+        logger.propagate = False
+    return logger
+
+
+def install_query_metrics(engine, registry, slow_query_seconds=0, logger=None):
+    """
+    Counts statements and SQL time per endpoint and logs statements slower than slow_query_seconds
+    (0 disables the log). Parameters are never logged: they can hold emails and password hashes.
+    """
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def record_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started'].pop()
+        if not has_request_context():
+            return
+        endpoint = _endpoint()
+        g.sql_queries = g.get('sql_queries', 0) + 1
+        registry.inc('sql_queries_total', {'endpoint': endpoint})
+        registry.inc('sql_duration_seconds_total', {'endpoint': endpoint}, elapsed)
+        if slow_query_seconds and elapsed >= slow_query_seconds:
+            registry.inc('sql_slow_queries_total', {'endpoint': endpoint})
+            if logger is not None:
+                logger.warning(f"Slow query ({elapsed * 1000:.1f} ms) in {request.method} {endpoint}: {' '.join(statement.split())[:1000]}")
+
+    @event.listens_for(engine, 'handle_error')
+    def forget_failed_query(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get('query_started'):
+            connection.info['query_started'].pop()
+
+
+def service_metrics(services):
+    """Collector for the per-worker services in app.extensions that keep their own statistics."""
+    collected = {'counters': [], 'gauges': [], 'histograms': []}
+    user_cache = services.get('user_cache')
+    if user_cache is not None:
+        stats = user_cache.stats()
+        collected['counters'].append(('user_cache_hits_total', {}, stats['hits']))
+        collected['counters'].append(('user_cache_misses_total', {}, stats['misses']))
+        collected['gauges'].append(('user_cache_entries', {}, stats['size']))
+    outbound_http = services.get('outbound_http')
+    if outbound_http is not None:
+        bounds = list(outbound_http.stats.buckets)
+        for host, stats in outbound_http.stats.snapshot().items():
+            collected['counters'].append(('outbound_requests_total', {'host': host}, stats['count']))
+            collected['counters'].append(('outbound_failures_total', {'host': host}, stats['failures']))
+            # LatencyStats doesn't count calls slower than its last bound; they go in +Inf
+            buckets = stats['buckets'] + [stats['count'] - sum(stats['buckets'])]
+            collected['histograms'].append(('outbound_request_duration_seconds', {'host': host},
+                                            {'bounds': bounds, 'buckets': buckets, 'sum': stats['seconds'], 'count': stats['count']}))
+    return collected
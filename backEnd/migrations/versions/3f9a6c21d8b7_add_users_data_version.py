@@ -0,0 +1,26 @@
+"""Add per-user data version for ETag revalidation
+
+Revision ID: 3f9a6c21d8b7
+Revises: 7b4d09e2c815
+Create Date: 2026-10-16 15:02:41.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a6c21d8b7'
+down_revision = '7b4d09e2c815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('data_version')
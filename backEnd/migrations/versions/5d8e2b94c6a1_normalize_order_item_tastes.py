@@ -0,0 +1,92 @@
+"""Normalize order item tastes into tastes and order_item_tastes tables
+
+Revision ID: 5d8e2b94c6a1
+Revises: a3c1e7d52f10
+Create Date: 2026-10-16 10:02:47.551093
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8e2b94c6a1'
+down_revision = 'a3c1e7d52f10'
+branch_labels = None
+depends_on = None
+
+# Rows read from order_items per backfill batch
+BATCH_SIZE = 1000
+
+order_items = sa.table('order_items',
+    sa.column('id', sa.Integer),
+    sa.column('taste_selection', sa.String),
+)
+tastes = sa.table('tastes',
+    sa.column('id', sa.Integer),
+    sa.column('name', sa.String),
+)
+order_item_tastes = sa.table('order_item_tastes',
+    sa.column('order_item_id', sa.Integer),
+    sa.column('taste_id', sa.Integer),
+)
+
+
+def upgrade():
+    op.create_table('tastes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('order_item_tastes',
+    sa.Column('order_item_id', sa.Integer(), nullable=False),
+    sa.Column('taste_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['order_item_id'], ['order_items.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['taste_id'], ['tastes.id'], ),
+    sa.PrimaryKeyConstraint('order_item_id', 'taste_id')
+    )
+    with op.batch_alter_table('order_item_tastes', schema=None) as batch_op:
+        batch_op.create_index('ix_order_item_tastes_taste_id', ['taste_id', 'order_item_id'], unique=False)
+
+    backfill_order_item_tastes()
+
+
+def backfill_order_item_tastes():
+    # Walk order_items in id order, one batch at a time, so the backfill never holds the whole table in memory
+    connection = op.get_bind()
+    taste_ids = {}
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(order_items.c.id, order_items.c.taste_selection)
+            .where(order_items.c.id > last_id)
+            .order_by(order_items.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+
+        links = []
+        for order_item_id, taste_selection in rows:
+            for name in dict.fromkeys(json.loads(taste_selection) if taste_selection else []):
+                if name not in taste_ids:
+                    connection.execute(sa.insert(tastes).values(name=name))
+                    taste_ids[name] = connection.execute(
+                        sa.select(tastes.c.id).where(tastes.c.name == name)
+                    ).scalar_one()
+                links.append({'order_item_id': order_item_id, 'taste_id': taste_ids[name]})
+
+        if links:
+            connection.execute(sa.insert(order_item_tastes), links)
+        last_id = rows[-1][0]
+
+
+def downgrade():
+    with op.batch_alter_table('order_item_tastes', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_item_tastes_taste_id')
+
+    op.drop_table('order_item_tastes')
+    op.drop_table('tastes')
@@ -0,0 +1,142 @@
+"""Add orders table and move per-order fields off order_items
+
+Revision ID: 7b4d09e2c815
+Revises: e19b6f3d7a48
+Create Date: 2026-10-16 13:21:09.406529
+
+"""
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b4d09e2c815'
+down_revision = 'e19b6f3d7a48'
+branch_labels = None
+depends_on = None
+
+# Rows read from order_items per backfill batch
+BATCH_SIZE = 1000
+# place_order used to call datetime.now() once per item, so the items of one order are
+# microseconds (not exactly 0) apart. Rows closer than this with the same total and address are grouped.
+ORDER_GROUPING_WINDOW = timedelta(seconds=2)
+
+order_items = sa.table('order_items',
+    sa.column('id', sa.Integer),
+    sa.column('user_id', sa.Integer),
+    sa.column('order_id', sa.Integer),
+    sa.column('delivered_date', sa.DateTime),
+    sa.column('order_total_price', sa.Float),
+    sa.column('delivery_address', sa.String),
+)
+# A full Table (not sa.table) so inserts can report the new primary key
+orders = sa.Table('orders', sa.MetaData(),
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('user_id', sa.Integer),
+    sa.Column('placed_at', sa.DateTime),
+    sa.Column('total', sa.Float),
+    sa.Column('delivery_address', sa.String),
+)
+
+
+def upgrade():
+    op.create_table('orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('placed_at', sa.DateTime(), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('delivery_address', sa.String(length=500), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_user_id_placed_at', ['user_id', sa.text('placed_at DESC'), 'id'], unique=False)
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('order_id', sa.Integer(), nullable=True))
+
+    backfill_orders()
+
+    # SQLite batch mode recreates the table and would copy this index without its DESC,
+    # so it is dropped first and recreated afterwards
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_items_user_id_delivered_date')
+        batch_op.alter_column('order_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_order_items_order_id_orders', 'orders', ['order_id'], ['id'])
+        batch_op.create_index(batch_op.f('ix_order_items_order_id'), ['order_id'], unique=False)
+        batch_op.drop_column('delivery_address')
+        batch_op.drop_column('order_total_price')
+
+    op.create_index('ix_order_items_user_id_delivered_date', 'order_items', ['user_id', sa.text('delivered_date DESC'), 'id'], unique=False)
+
+
+def backfill_orders():
+    # Walk order_items in (user_id, delivered_date, id) order one batch at a time, starting a new
+    # order whenever the user, total or address changes or the gap to the previous item is too large
+    connection = op.get_bind()
+    update_order_id = sa.update(order_items) \
+        .where(order_items.c.id == sa.bindparam('item_id')) \
+        .values(order_id=sa.bindparam('new_order_id'))
+
+    last_key = None
+    previous = None # (user_id, delivered_date, total, address) of the previous item
+    order_id = None
+    while True:
+        query = sa.select(
+            order_items.c.id, order_items.c.user_id, order_items.c.delivered_date,
+            order_items.c.order_total_price, order_items.c.delivery_address,
+        ).order_by(order_items.c.user_id, order_items.c.delivered_date, order_items.c.id).limit(BATCH_SIZE)
+        if last_key is not None:
+            last_user_id, last_delivered_date, last_id = last_key
+            query = query.where(sa.or_(
+                order_items.c.user_id > last_user_id,
+                sa.and_(order_items.c.user_id == last_user_id, order_items.c.delivered_date > last_delivered_date),
+                sa.and_(order_items.c.user_id == last_user_id, order_items.c.delivered_date == last_delivered_date, order_items.c.id > last_id),
+            ))
+        rows = connection.execute(query).fetchall()
+        if not rows:
+            break
+
+        assignments = []
+        for item_id, user_id, delivered_date, total, address in rows:
+            same_order = previous is not None \
+                and previous[0] == user_id and previous[2] == total and previous[3] == address \
+                and delivered_date - previous[1] <= ORDER_GROUPING_WINDOW
+            if not same_order:
+                order_id = connection.execute(sa.insert(orders).values(
+                    user_id=user_id, placed_at=delivered_date, total=total, delivery_address=address,
+                )).inserted_primary_key[0]
+            assignments.append({'item_id': item_id, 'new_order_id': order_id})
+            previous = (user_id, delivered_date, total, address)
+
+        connection.execute(update_order_id, assignments)
+        last_key = (rows[-1][1], rows[-1][2], rows[-1][0])
+
+
+def downgrade():
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('order_total_price', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('delivery_address', sa.String(length=500), nullable=True))
+
+    # Copy the order fields back onto every item of the order
+    op.execute(
+        "UPDATE order_items SET "
+        "order_total_price = (SELECT orders.total FROM orders WHERE orders.id = order_items.order_id), "
+        "delivery_address = (SELECT orders.delivery_address FROM orders WHERE orders.id = order_items.order_id)"
+    )
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_items_user_id_delivered_date')
+        batch_op.alter_column('order_total_price', existing_type=sa.Float(), nullable=False)
+        batch_op.drop_index(batch_op.f('ix_order_items_order_id'))
+        batch_op.drop_constraint('fk_order_items_order_id_orders', type_='foreignkey')
+        batch_op.drop_column('order_id')
+
+    op.create_index('ix_order_items_user_id_delivered_date', 'order_items', ['user_id', sa.text('delivered_date DESC'), 'id'], unique=False)
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_user_id_placed_at')
+
+    op.drop_table('orders')
@@ -0,0 +1,50 @@
+"""Add menu catalog tables
+
+Revision ID: a3c1e7d52f10
+Revises: 4971da213a72
+Create Date: 2026-10-16 09:12:04.318220
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c1e7d52f10'
+down_revision = '4971da213a72'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('menu_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('cuisine', sa.String(length=100), nullable=False),
+    sa.Column('rating', sa.Float(), nullable=False),
+    sa.Column('reviews', sa.String(length=50), nullable=True),
+    sa.Column('delivery_fee', sa.Float(), nullable=False),
+    sa.Column('image_url', sa.String(length=500), nullable=True),
+    sa.Column('price_level', sa.Integer(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('tastes', sa.String(length=500), nullable=True),
+    sa.Column('recommended', sa.String(length=500), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('menu_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_menu_items_cuisine'), ['cuisine'], unique=False)
+
+    op.create_table('menu_catalog_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('menu_catalog_version')
+    with op.batch_alter_table('menu_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_menu_items_cuisine'))
+
+    op.drop_table('menu_items')
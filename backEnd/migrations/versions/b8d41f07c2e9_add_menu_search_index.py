@@ -0,0 +1,63 @@
+"""Add full-text search index over the menu
+
+Revision ID: b8d41f07c2e9
+Revises: 3f9a6c21d8b7
+Create Date: 2026-10-16 23:41:09.502113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8d41f07c2e9'
+down_revision = '3f9a6c21d8b7'
+branch_labels = None
+depends_on = None
+
+# FTS5 is SQLite-only; on other databases /search falls back to LIKE queries (see menu_search.py)
+INDEXED_COLUMNS = 'name, description, cuisine, tastes'
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    # External-content table: the index reads its text from menu_items and stores only the tokens.
+    # prefix='2 3' adds prefix indexes so 'sp*' / 'spi*' queries don't scan the vocabulary
+    op.execute(f"""
+        CREATE VIRTUAL TABLE menu_items_fts USING fts5(
+            {INDEXED_COLUMNS}, content='menu_items', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """)
+    # Triggers keep the index in sync with every write to menu_items, including `flask seed-menu`
+    op.execute(f"""
+        CREATE TRIGGER menu_items_fts_insert AFTER INSERT ON menu_items BEGIN
+            INSERT INTO menu_items_fts(rowid, {INDEXED_COLUMNS})
+            VALUES (new.id, new.name, new.description, new.cuisine, new.tastes);
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER menu_items_fts_delete AFTER DELETE ON menu_items BEGIN
+            INSERT INTO menu_items_fts(menu_items_fts, rowid, {INDEXED_COLUMNS})
+            VALUES ('delete', old.id, old.name, old.description, old.cuisine, old.tastes);
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER menu_items_fts_update AFTER UPDATE OF {INDEXED_COLUMNS} ON menu_items BEGIN
+            INSERT INTO menu_items_fts(menu_items_fts, rowid, {INDEXED_COLUMNS})
+            VALUES ('delete', old.id, old.name, old.description, old.cuisine, old.tastes);
+            INSERT INTO menu_items_fts(rowid, {INDEXED_COLUMNS})
+            VALUES (new.id, new.name, new.description, new.cuisine, new.tastes);
+        END
+    """)
+    # Index the items that already exist
+    op.execute("INSERT INTO menu_items_fts(menu_items_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for trigger in ('menu_items_fts_update', 'menu_items_fts_delete', 'menu_items_fts_insert'):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS menu_items_fts")
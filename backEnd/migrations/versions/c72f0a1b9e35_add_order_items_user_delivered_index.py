@@ -0,0 +1,26 @@
+"""Add composite index for keyset pagination of past orders
+
+Revision ID: c72f0a1b9e35
+Revises: 5d8e2b94c6a1
+Create Date: 2026-10-16 10:48:15.902716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c72f0a1b9e35'
+down_revision = '5d8e2b94c6a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.create_index('ix_order_items_user_id_delivered_date', ['user_id', sa.text('delivered_date DESC'), 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_items_user_id_delivered_date')
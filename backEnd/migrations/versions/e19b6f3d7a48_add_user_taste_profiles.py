@@ -0,0 +1,43 @@
+"""Add user_taste_profiles table
+
+Revision ID: e19b6f3d7a48
+Revises: c72f0a1b9e35
+Create Date: 2026-10-16 11:35:52.184467
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e19b6f3d7a48'
+down_revision = 'c72f0a1b9e35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_taste_profiles',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('taste_id', sa.Integer(), nullable=False),
+    sa.Column('max_rating', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('last_seen', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['taste_id'], ['tastes.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'taste_id')
+    )
+
+    # Build the initial profiles from existing orders in a single INSERT ... SELECT
+    op.execute(
+        "INSERT INTO user_taste_profiles (user_id, taste_id, max_rating, count, rating_sum, last_seen) "
+        "SELECT order_items.user_id, order_item_tastes.taste_id, MAX(order_items.rating), COUNT(order_items.id), "
+        "SUM(order_items.rating), MAX(order_items.delivered_date) "
+        "FROM order_items JOIN order_item_tastes ON order_item_tastes.order_item_id = order_items.id "
+        "GROUP BY order_items.user_id, order_item_tastes.taste_id"
+    )
+
+
+def downgrade():
+    op.drop_table('user_taste_profiles')
@@ -0,0 +1,333 @@
+import json
+from datetime import datetime # Import datetime
+
+from flask_login import UserMixin
+
+from extensions import db, password_hasher, user_cache
+
+class Users(UserMixin, db.Model):
+    __tablename__ = 'users'
+    id = db.Column(db.Integer, primary_key=True)
+    firstName = db.Column(db.String(150), nullable=False)
+    lastName = db.Column(db.String(150), nullable=False)
+    email = db.Column(db.String(300), unique=False, nullable=False) # unique=False here, consider making it True for user accounts
+    password = db.Column(db.String(200), nullable=False)
+    profile_picture_filename = db.Column(db.String)
+    # --- NEW COLUMNS FOR OAuth IDs ---
+    google_id = db.Column(db.String(255), unique=True, nullable=True)
+    facebook_id = db.Column(db.String(255), unique=True, nullable=True)
+    # --- END NEW COLUMNS ---
+    # Bumped whenever the user's orders, reviews or profile change; used as the ETag of their GET endpoints
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Add a relationship to the OrderItem model
+    order_items = db.relationship('OrderItem', backref='customer', lazy=True)
+
+    def set_password(self, password):
+        self.password = password_hasher.hash(password) # Corrected attribute name
+
+    def check_password(self, password):
+        return password_hasher.verify(self.password, password) # Corrected attribute name
+
+    def __repr__(self):
+        return '<Users %r>' % self.id
+
+# One row per placed order, holding the data shared by all of its items
+class Order(db.Model):
+    __tablename__ = 'orders'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False) # Link to the user who placed the order
+    placed_at = db.Column(db.DateTime, nullable=False)
+    total = db.Column(db.Float, nullable=False) # Total price of the entire order with fees
+    delivery_address = db.Column(db.String(500)) # Store the delivery address details as JSON string
+    items = db.relationship('OrderItem', backref='order', lazy=True, order_by='OrderItem.id')
+
+    def __repr__(self):
+        return f"<Order {self.id}>"
+
+# Serves keyset pagination of a user's orders: WHERE user_id = ? ORDER BY placed_at DESC, id
+db.Index('ix_orders_user_id_placed_at', Order.user_id, Order.placed_at.desc(), Order.id)
+
+#Define the OrderItem model to store individual items within an order
+class OrderItem(db.Model):
+    __tablename__ = 'order_items'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False) # Link to the user who placed the order
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True) # Order this item belongs to
+    item_name = db.Column(db.String(255), nullable=False)
+    item_image_url = db.Column(db.String(500))
+    quantity = db.Column(db.Integer, nullable=False)
+    price_per_item = db.Column(db.Float, nullable=False)
+    total_item_price = db.Column(db.Float, nullable=False) #Price quantity for this item
+    delivered_date = db.Column(db.DateTime, nullable=False, default=datetime.now()) # Use datetime, default to now
+    taste_selection = db.Column(db.String(500)) #Store tastes as JSON string
+    recommended_selection = db.Column(db.String(500)) # Store recommended as JSON string
+    rating = db.Column(db.Integer, nullable=False, default=0) # Initial rating is 0
+    review_comment = db.Column(db.Text) # New column for review comment
+    # Normalized copy of taste_selection, used for per-taste aggregation in SQL
+    selected_tastes = db.relationship('Taste', secondary='order_item_tastes', lazy=True)
+
+    def __repr__(self):
+        return f"<OrderItem {self.id} - {self.item_name}>"
+
+# Serves keyset pagination of a user's history: WHERE user_id = ? ORDER BY delivered_date DESC, id
+db.Index('ix_order_items_user_id_delivered_date', OrderItem.user_id, OrderItem.delivered_date.desc(), OrderItem.id)
+
+# Dictionary of taste names, so tastes are stored and grouped by integer id
+class Taste(db.Model):
+    __tablename__ = 'tastes'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+
+    def __repr__(self):
+        return f"<Taste {self.id} - {self.name}>"
+
+# Association table linking each order item to the tastes selected for it
+order_item_tastes = db.Table('order_item_tastes',
+    db.Column('order_item_id', db.Integer, db.ForeignKey('order_items.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('taste_id', db.Integer, db.ForeignKey('tastes.id'), primary_key=True),
+    db.Index('ix_order_item_tastes_taste_id', 'taste_id', 'order_item_id'),
+)
+
+def get_or_create_tastes(names):
+    """Returns a {name: Taste} dict for the given names, adding any tastes that don't exist yet."""
+    names = set(names)
+    if not names:
+        return {}
+    tastes = {taste.name: taste for taste in Taste.query.filter(Taste.name.in_(names))}
+    for name in names - tastes.keys():
+        tastes[name] = Taste(name=name)
+        db.session.add(tastes[name])
+    return tastes
+
+# Per-user, per-taste summary of order history, kept up to date by place_order and submit_review
+class UserTasteProfile(db.Model):
+    __tablename__ = 'user_taste_profiles'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    taste_id = db.Column(db.Integer, db.ForeignKey('tastes.id'), primary_key=True)
+    max_rating = db.Column(db.Integer, nullable=False, default=0) # Highest rating given to an item with this taste
+    count = db.Column(db.Integer, nullable=False, default=0) # Number of order items with this taste
+    rating_sum = db.Column(db.Integer, nullable=False, default=0) # Sum of those items' ratings (0 while unrated)
+    last_seen = db.Column(db.DateTime) # When an item with this taste was last ordered
+    taste = db.relationship('Taste', lazy='joined')
+
+    def __repr__(self):
+        return f"<UserTasteProfile {self.user_id} - {self.taste_id}>"
+
+def taste_profile_aggregates():
+    """
+    Select computing every (user_id, taste_id, max_rating, count, rating_sum, last_seen) row from scratch.
+    Aggregated with an indexed GROUP BY over order_item_tastes instead of decoding taste_selection JSON per row.
+    """
+    return db.select(
+        OrderItem.user_id,
+        order_item_tastes.c.taste_id,
+        db.func.max(OrderItem.rating),
+        db.func.count(OrderItem.id),
+        db.func.sum(OrderItem.rating),
+        db.func.max(OrderItem.delivered_date),
+    ).select_from(OrderItem) \
+        .join(order_item_tastes, order_item_tastes.c.order_item_id == OrderItem.id) \
+        .group_by(OrderItem.user_id, order_item_tastes.c.taste_id)
+
+def record_order_in_taste_profiles(user_id, item_tastes, ordered_at):
+    """
+    Adds newly placed (still unrated) order items to the user's taste profile.
+    item_tastes holds the list of Taste objects of each item. Touches one profile row per taste in the order.
+    """
+    counts = {}
+    for tastes in item_tastes:
+        for taste in tastes:
+            counts[taste] = counts.get(taste, 0) + 1
+    if not counts:
+        return
+
+    # Tastes created by this order have no id yet and so cannot have a profile row
+    existing_taste_ids = [taste.id for taste in counts if taste.id is not None]
+    profiles = {}
+    if existing_taste_ids:
+        profiles = {profile.taste_id: profile for profile in UserTasteProfile.query.filter(
+            UserTasteProfile.user_id == user_id, UserTasteProfile.taste_id.in_(existing_taste_ids))}
+
+    for taste, count in counts.items():
+        profile = profiles.get(taste.id)
+        if profile is None:
+            db.session.add(UserTasteProfile(user_id=user_id, taste=taste, max_rating=0, count=count, rating_sum=0, last_seen=ordered_at))
+        else:
+            # Increment in SQL so concurrent orders from the same user don't lose updates
+            profile.count = UserTasteProfile.count + count
+            profile.last_seen = ordered_at
+
+def record_rating_in_taste_profiles(order_item, old_rating, new_rating):
+    """Applies a rating change on one order item to the profile rows of that item's tastes."""
+    if old_rating == new_rating:
+        return
+    taste_ids = [taste.id for taste in order_item.selected_tastes]
+    if not taste_ids:
+        return
+
+    profiles = UserTasteProfile.query.filter(
+        UserTasteProfile.user_id == order_item.user_id, UserTasteProfile.taste_id.in_(taste_ids)).all()
+    for profile in profiles:
+        profile.rating_sum = UserTasteProfile.rating_sum + (new_rating - old_rating)
+        if new_rating >= profile.max_rating:
+            profile.max_rating = new_rating
+        elif old_rating == profile.max_rating:
+            # This item may have held the maximum, so recompute it for this one taste
+            profile.max_rating = db.session.query(db.func.max(OrderItem.rating)) \
+                .join(order_item_tastes, order_item_tastes.c.order_item_id == OrderItem.id) \
+                .filter(OrderItem.user_id == order_item.user_id, order_item_tastes.c.taste_id == profile.taste_id) \
+                .scalar() or 0
+
+def record_ratings_in_taste_profiles(user_id, changes):
+    """
+    record_rating_in_taste_profiles for many of one user's items at once, given (order_item_id, old_rating,
+    new_rating) changes: one query for the items' tastes, one for the profile rows and at most one to
+    recompute maximums, whatever the number of items.
+    """
+    changes = [change for change in changes if change[1] != change[2]]
+    if not changes:
+        return
+    changes_by_item = {order_item_id: (old_rating, new_rating) for order_item_id, old_rating, new_rating in changes}
+    changes_by_taste = {}
+    for order_item_id, taste_id in db.session.execute(
+            db.select(order_item_tastes.c.order_item_id, order_item_tastes.c.taste_id)
+            .where(order_item_tastes.c.order_item_id.in_(changes_by_item.keys()))):
+        changes_by_taste.setdefault(taste_id, []).append(changes_by_item[order_item_id])
+    if not changes_by_taste:
+        return
+
+    recompute = []
+    profiles = UserTasteProfile.query.filter(
+        UserTasteProfile.user_id == user_id, UserTasteProfile.taste_id.in_(changes_by_taste.keys())).all()
+    for profile in profiles:
+        taste_changes = changes_by_taste[profile.taste_id]
+        profile.rating_sum = UserTasteProfile.rating_sum + sum(new_rating - old_rating for old_rating, new_rating in taste_changes)
+        highest_new_rating = max(new_rating for _, new_rating in taste_changes)
+        if highest_new_rating >= profile.max_rating:
+            profile.max_rating = highest_new_rating
+        elif any(old_rating == profile.max_rating for old_rating, _ in taste_changes):
+            recompute.append(profile)
+    if recompute:
+        # Autoflush writes the new ratings first, so the maximums see them
+        maximums = dict(db.session.query(order_item_tastes.c.taste_id, db.func.max(OrderItem.rating))
+                        .join(OrderItem, order_item_tastes.c.order_item_id == OrderItem.id)
+                        .filter(OrderItem.user_id == user_id, order_item_tastes.c.taste_id.in_([profile.taste_id for profile in recompute]))
+                        .group_by(order_item_tastes.c.taste_id).all())
+        for profile in recompute:
+            profile.max_rating = maximums.get(profile.taste_id) or 0
+
+def rebuild_taste_profile_rows():
+    """Replaces every user_taste_profiles row with one aggregated from the order history. The caller commits."""
+    UserTasteProfile.query.delete()
+    db.session.execute(db.insert(UserTasteProfile.__table__).from_select(
+        ['user_id', 'taste_id', 'max_rating', 'count', 'rating_sum', 'last_seen'],
+        taste_profile_aggregates(),
+    ))
+
+def find_taste_profile_mismatches():
+    """Compares the stored profiles against a from-scratch aggregate. Returns a list of (key, stored, expected)."""
+    expected = {(row[0], row[1]): tuple(row[2:]) for row in db.session.execute(taste_profile_aggregates())}
+    stored = {
+        (profile.user_id, profile.taste_id): (profile.max_rating, profile.count, profile.rating_sum, profile.last_seen)
+        for profile in UserTasteProfile.query.all()
+    }
+    mismatches = []
+    for key in expected.keys() | stored.keys():
+        if expected.get(key) != stored.get(key):
+            mismatches.append((key, stored.get(key), expected.get(key)))
+    return mismatches
+
+# Menu catalog served by /menu and used for recommendations
+class MenuItem(db.Model):
+    __tablename__ = 'menu_items'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=False)
+    cuisine = db.Column(db.String(100), nullable=False, index=True)
+    rating = db.Column(db.Float, nullable=False, default=0)
+    reviews = db.Column(db.String(50)) # Display string such as '1000+'
+    delivery_fee = db.Column(db.Float, nullable=False, default=0) # Numeric fee in dollars
+    image_url = db.Column(db.String(500))
+    price_level = db.Column(db.Integer, nullable=False)
+    description = db.Column(db.Text)
+    price = db.Column(db.Float, nullable=False)
+    tastes = db.Column(db.String(500)) # Store tastes as JSON string
+    recommended = db.Column(db.String(500)) # Store recommended as JSON string
+
+    def __repr__(self):
+        return f"<MenuItem {self.id} - {self.name}>"
+
+# Single-row table holding the catalog version. Workers compare it against their snapshot to know when to reload.
+class MenuCatalogVersion(db.Model):
+    __tablename__ = 'menu_catalog_version'
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+@db.event.listens_for(db.session, 'before_flush')
+def bump_menu_catalog_version(session, flush_context, instances):
+    # Any change to a MenuItem bumps the catalog version (once) in the same transaction
+    if session.info.get('menu_catalog_bumped'):
+        return
+    if not any(isinstance(obj, MenuItem) for obj in (*session.new, *session.dirty, *session.deleted)):
+        return
+    # Increment in SQL, so concurrent writers each produce a new version instead of both writing the same one
+    result = session.execute(db.update(MenuCatalogVersion).where(MenuCatalogVersion.id == 1)
+                             .values(version=MenuCatalogVersion.version + 1))
+    if result.rowcount == 0:
+        session.add(MenuCatalogVersion(id=1, version=1))
+    session.info['menu_catalog_bumped'] = True
+
+@db.event.listens_for(db.session, 'after_transaction_end')
+def reset_menu_catalog_bump(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('menu_catalog_bumped', None)
+
+@db.event.listens_for(db.session, 'before_flush')
+def collect_changed_users(session, flush_context, instances):
+    # Remember which users this transaction changes (profile info, password, picture, OAuth links)
+    changed = {obj.id for obj in session.dirty if isinstance(obj, Users) and session.is_modified(obj, include_collections=False)}
+    changed.update(obj.id for obj in session.deleted if isinstance(obj, Users))
+    if changed:
+        session.info.setdefault('changed_user_ids', set()).update(changed)
+
+@db.event.listens_for(db.session, 'after_commit')
+def invalidate_changed_users(session):
+    # Drop cached copies only once the change is committed, so readers never cache a rolled-back state
+    changed = session.info.pop('changed_user_ids', None)
+    if changed:
+        user_cache.invalidate(*changed)
+
+@db.event.listens_for(db.session, 'after_rollback')
+def forget_changed_users(session):
+    session.info.pop('changed_user_ids', None)
+
+def bump_user_data_version(user_id):
+    # Core UPDATE in the caller's transaction, so an order doesn't mark the Users row dirty (and evict it from user_cache)
+    db.session.execute(db.update(Users).where(Users.id == user_id).values(data_version=Users.data_version + 1))
+
+def load_menu_catalog_version():
+    # Read on a connection of its own, so a catalog check never touches the calling request's transaction
+    with db.engine.connect() as connection:
+        return connection.execute(db.select(MenuCatalogVersion.version).where(MenuCatalogVersion.id == 1)).scalar() or 0
+
+def load_menu_items(version):
+    from menu_catalog import MenuItemRecord
+    records = []
+    # Own connection, closed (ending its read transaction) when the load is done; the request's
+    # session and whatever it has pending are left alone
+    with db.engine.connect() as connection:
+        for item in connection.execute(db.select(MenuItem.__table__).order_by(MenuItem.id)):
+            records.append(MenuItemRecord(
+                id=item.id,
+                name=item.name,
+                cuisine=item.cuisine,
+                rating=item.rating,
+                reviews=item.reviews,
+                delivery_fee=item.delivery_fee,
+                image_url=item.image_url,
+                price_level=item.price_level,
+                description=item.description,
+                price=item.price,
+                tastes=tuple(json.loads(item.tastes)) if item.tastes else (),
+                recommended=tuple(json.loads(item.recommended)) if item.recommended else (),
+            ))
+    return records
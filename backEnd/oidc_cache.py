@@ -0,0 +1,148 @@
+import json
+import os
+import threading
+import time
+
+
+def fetch_json(url, timeout=5):
+    import requests
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+class CachedDocument:
+    """
+    One JSON document fetched over HTTP and cached in memory and in a file.
+
+    A copy younger than refresh_after seconds is served as is. Between refresh_after and ttl it is
+    still served, while a background thread fetches a new one. Past ttl the caller fetches it;
+    if that fails, the stale copy is served rather than failing the login.
+    The file lets a restarted worker start with the last good copy instead of a network round trip.
+    """
+
+    def __init__(self, get_url, path, ttl, refresh_after, fetch=fetch_json):
+        self._get_url = get_url
+        self.path = path
+        self.ttl = ttl
+        self.refresh_after = refresh_after
+        self._fetch = fetch
+        self._document = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self):
+        if self._document is None:
+            self._load_file()
+        age = time.time() - self._fetched_at
+        if self._document is None or age >= self.ttl:
+            return self.refresh(fallback_to_stale=True, max_age=self.ttl)
+        if age >= self.refresh_after:
+            self._refresh_in_background()
+        return self._document
+
+    def refresh(self, fallback_to_stale=False, max_age=None):
+        """
+        Fetches the document and stores it in memory and on disk. With max_age, a copy younger than
+        that (e.g. fetched by another thread while this one waited for the lock) is returned instead.
+        """
+        with self._lock:
+            if max_age is not None and self._document is not None and time.time() - self._fetched_at < max_age:
+                return self._document
+            try:
+                document = self._fetch(self._get_url())
+            except Exception as e:
+                if fallback_to_stale and self._document is not None:
+                    print(f"Error refreshing {self.path}, serving the cached copy: {e}")
+                    return self._document
+                raise
+            self._document, self._fetched_at = document, time.time()
+            self._save_file()
+            return document
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh(max_age=self.refresh_after)
+            except Exception as e:
+                print(f"Error refreshing {self.path} in the background: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name='oidc-cache-refresh', daemon=True).start()
+
+    def _load_file(self):
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                cached = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return
+        with self._lock:
+            if self._document is None:
+                self._document, self._fetched_at = cached['document'], cached['fetched_at']
+
+    def _save_file(self):
+        # Write-then-rename, so another worker never reads half a file
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temporary_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary_path, 'w', encoding='utf-8') as file:
+                json.dump({'fetched_at': self._fetched_at, 'document': self._document}, file)
+            os.replace(temporary_path, self.path)
+        except OSError as e:
+            print(f"Error writing {self.path}: {e}")
+
+
+class OIDCProviderCache:
+    """
+    Discovery metadata and signing keys (JWKS) of one OpenID Connect provider, cached with
+    CachedDocument. A forced JWKS refresh (an ID token signed with an unknown key id) is allowed
+    at most once every min_forced_refresh seconds, so bogus tokens can't make us hammer the provider.
+    """
+
+    def __init__(self, name, metadata_url, cache_dir, ttl=6 * 3600, min_forced_refresh=60, fetch=fetch_json):
+        self.name = name
+        self.min_forced_refresh = min_forced_refresh
+        refresh_after = ttl * 0.75
+        self.metadata_document = CachedDocument(
+            lambda: metadata_url, os.path.join(cache_dir, f"{name}-metadata.json"), ttl, refresh_after, fetch)
+        self.jwks_document = CachedDocument(
+            lambda: self.metadata()['jwks_uri'], os.path.join(cache_dir, f"{name}-jwks.json"), ttl, refresh_after, fetch)
+        self._forced_at = 0.0
+
+    def metadata(self):
+        return self.metadata_document.get()
+
+    def jwks(self, force=False):
+        if force and time.time() - self._forced_at >= self.min_forced_refresh:
+            self._forced_at = time.time()
+            return self.jwks_document.refresh(fallback_to_stale=True)
+        return self.jwks_document.get()
+
+    def prewarm(self):
+        self.metadata()
+        self.jwks()
+
+
+def cached_oidc_client_cls(provider_cache, base=None):
+    """Returns an authlib Flask client class that reads metadata and JWKS from provider_cache instead of fetching them."""
+    if base is None:
+        from authlib.integrations.flask_client import FlaskOAuth2App as base
+
+    class CachedOIDCApp(base):
+        def load_server_metadata(self):
+            self.server_metadata.update(provider_cache.metadata())
+            return self.server_metadata
+
+        def fetch_jwk_set(self, force=False):
+            jwk_set = provider_cache.jwks(force=force)
+            self.server_metadata['jwks'] = jwk_set
+            return jwk_set
+
+    return CachedOIDCApp
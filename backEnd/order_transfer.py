@@ -0,0 +1,231 @@
+import csv
+import json
+import sys
+from datetime import datetime
+
+from extensions import db
+from models import Order, OrderItem, Users, get_or_create_tastes, order_item_tastes
+
+FORMATS = ('ndjson', 'csv')
+# One record per order item, carrying its order's fields so an import can recreate the orders.
+# taste_selection, recommended_selection and delivery_address keep their stored JSON text.
+COLUMNS = (
+    'id', 'order_id', 'user_id', 'placed_at', 'order_total', 'delivery_address',
+    'item_name', 'item_image_url', 'quantity', 'price_per_item', 'total_item_price', 'delivered_date',
+    'taste_selection', 'recommended_selection', 'rating', 'review_comment',
+)
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _datetime(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+# Parses each column of an imported record. CSV gives every value as a string, with '' for NULL.
+COLUMN_TYPES = {
+    'id': int, 'order_id': int, 'user_id': int, 'quantity': int, 'rating': int,
+    'order_total': float, 'price_per_item': float, 'total_item_price': float,
+    'placed_at': _datetime, 'delivered_date': _datetime,
+}
+NULLABLE_COLUMNS = ('delivery_address', 'item_image_url', 'taste_selection', 'recommended_selection', 'review_comment')
+
+
+def export_query(user_id=None, since=None):
+    """Core select of the export records in id order, without building ORM objects."""
+    query = db.select(
+        OrderItem.id, OrderItem.order_id, OrderItem.user_id, Order.placed_at, Order.total.label('order_total'),
+        Order.delivery_address, OrderItem.item_name, OrderItem.item_image_url, OrderItem.quantity,
+        OrderItem.price_per_item, OrderItem.total_item_price, OrderItem.delivered_date,
+        OrderItem.taste_selection, OrderItem.recommended_selection, OrderItem.rating, OrderItem.review_comment,
+    ).join(Order, Order.id == OrderItem.order_id).order_by(OrderItem.id)
+    if user_id is not None:
+        query = query.where(OrderItem.user_id == user_id)
+    if since is not None:
+        query = query.where(OrderItem.delivered_date >= since)
+    return query
+
+
+def iter_export_rows(batch_size=DEFAULT_BATCH_SIZE, user_id=None, since=None):
+    # yield_per streams the result: a server-side cursor where the driver has one, fetchmany() batches otherwise
+    result = db.session.execute(export_query(user_id, since).execution_options(yield_per=batch_size))
+    for row in result:
+        yield row
+
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def write_rows(rows, file, file_format, on_row=None):
+    """Writes the rows as NDJSON or CSV (with a header). Returns the number written."""
+    count = 0
+    if file_format == 'csv':
+        writer = csv.writer(file)
+        writer.writerow(COLUMNS)
+        for row in rows:
+            writer.writerow(['' if value is None else _export_value(value) for value in row])
+            count += 1
+            if on_row is not None:
+                on_row(count)
+        return count
+
+    for row in rows:
+        file.write(json.dumps(dict(zip(COLUMNS, map(_export_value, row)))))
+        file.write('\n')
+        count += 1
+        if on_row is not None:
+            on_row(count)
+    return count
+
+
+def read_records(file, file_format):
+    """Yields each record of an NDJSON or CSV export as a dict of parsed column values."""
+    if file_format == 'csv':
+        records = csv.DictReader(file)
+        missing = set(COLUMNS) - set(records.fieldnames or ())
+        if missing:
+            raise ValueError(f"CSV header is missing columns: {', '.join(sorted(missing))}")
+    else:
+        records = (json.loads(line) for line in file if line.strip())
+
+    for line_number, record in enumerate(records, start=1):
+        try:
+            parsed = {}
+            for column in COLUMNS:
+                value = record[column]
+                if value == '' and column in NULLABLE_COLUMNS:
+                    value = None
+                elif column in COLUMN_TYPES and value is not None:
+                    value = COLUMN_TYPES[column](value)
+                parsed[column] = value
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Record {line_number} is invalid: {e!r}") from e
+        yield parsed
+
+
+def chunked(records, size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Item fields that never change after an order is placed; an existing row with the same id and these
+# values is the record itself, imported earlier (ratings and reviews may have been updated since)
+ITEM_IDENTITY_COLUMNS = ('user_id', 'order_id', 'item_name', 'quantity', 'delivered_date')
+
+
+class OrderImporter:
+    """
+    Writes export records in batches, one transaction per batch, with executemany INSERTs for the
+    orders, items and taste links. Ids are kept, so they must not collide with different data:
+    an item id that exists with other contents, or an order id that belongs to another user,
+    fails the batch with ValueError. Items already imported by an earlier run (same id and
+    identity columns) are counted in `already_imported`, so an interrupted import can simply be run again.
+    """
+
+    def __init__(self):
+        self.taste_ids = {}
+        self.inserted = 0
+        self.already_imported = 0
+
+    def import_batch(self, records):
+        try:
+            self._insert(records)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _insert(self, records):
+        item_ids = [record['id'] for record in records]
+        existing_items = {row.id: row for row in db.session.execute(
+            db.select(OrderItem.id, *(getattr(OrderItem, column) for column in ITEM_IDENTITY_COLUMNS))
+            .where(OrderItem.id.in_(item_ids)))}
+        collisions = [record['id'] for record in records if record['id'] in existing_items and any(
+            getattr(existing_items[record['id']], column) != record[column] for column in ITEM_IDENTITY_COLUMNS)]
+        if collisions:
+            raise ValueError(f"Order item ids already used by different items in this database: {collisions[:10]}")
+        new_records = [record for record in records if record['id'] not in existing_items]
+        self.already_imported += len(records) - len(new_records)
+        if not new_records:
+            return
+
+        user_ids = {record['user_id'] for record in new_records}
+        known_users = set(db.session.execute(db.select(Users.id).where(Users.id.in_(user_ids))).scalars())
+        if user_ids - known_users:
+            raise ValueError(f"Unknown user ids (import the users first): {sorted(user_ids - known_users)[:10]}")
+
+        orders = {}
+        for record in new_records:
+            order = orders.setdefault(record['order_id'], {
+                'id': record['order_id'], 'user_id': record['user_id'], 'placed_at': record['placed_at'],
+                'total': record['order_total'], 'delivery_address': record['delivery_address'],
+            })
+            if order['user_id'] != record['user_id']:
+                raise ValueError(f"Order {record['order_id']} has items of several users ({order['user_id']}, {record['user_id']})")
+        # An existing order is only reused for items of the same user
+        existing_orders = dict(db.session.execute(db.select(Order.id, Order.user_id).where(Order.id.in_(orders.keys()))).all())
+        mismatched = [order_id for order_id, user_id in existing_orders.items() if orders[order_id]['user_id'] != user_id]
+        if mismatched:
+            raise ValueError(f"Order ids already belong to other users in this database: {sorted(mismatched)[:10]}")
+        new_orders = [order for order_id, order in orders.items() if order_id not in existing_orders]
+        if new_orders:
+            db.session.execute(Order.__table__.insert(), new_orders)
+
+        db.session.execute(OrderItem.__table__.insert(), [{
+            column: record[column] for column in COLUMNS if column not in ('placed_at', 'order_total', 'delivery_address')
+        } for record in new_records])
+
+        item_taste_names = [list(dict.fromkeys(json.loads(record['taste_selection'] or '[]'))) for record in new_records]
+        self._resolve_tastes({name for names in item_taste_names for name in names})
+        taste_links = [
+            {'order_item_id': record['id'], 'taste_id': self.taste_ids[name]}
+            for record, names in zip(new_records, item_taste_names)
+            for name in names
+        ]
+        if taste_links:
+            db.session.execute(order_item_tastes.insert(), taste_links)
+
+        # New history invalidates the users' past-orders ETags
+        db.session.execute(db.update(Users).where(Users.id.in_(user_ids)).values(data_version=Users.data_version + 1))
+        self.inserted += len(new_records)
+
+    def _resolve_tastes(self, names):
+        missing = names - self.taste_ids.keys()
+        if not missing:
+            return
+        tastes = get_or_create_tastes(missing)
+        db.session.flush()
+        self.taste_ids.update((name, taste.id) for name, taste in tastes.items())
+
+    def finish(self):
+        """Moves PostgreSQL id sequences past the imported ids (SQLite and MySQL follow max(id) on their own)."""
+        if db.engine.dialect.name != 'postgresql':
+            return
+        for table in (Order.__table__, OrderItem.__table__):
+            db.session.execute(db.text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                f"GREATEST((SELECT MAX(id) FROM {table.name}), 1))"))
+        db.session.commit()
+
+
+def open_output(path, file_format):
+    if path == '-':
+        return sys.stdout
+    # The csv module does its own line endings
+    return open(path, 'w', encoding='utf-8', newline='' if file_format == 'csv' else None)
+
+
+def open_input(path, file_format):
+    if path == '-':
+        return sys.stdin
+    return open(path, encoding='utf-8', newline='' if file_format == 'csv' else None)
+
+
+def guess_format(path):
+    return 'csv' if path.lower().endswith('.csv') else 'ndjson'
@@ -0,0 +1,95 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+class HashingBusyError(Exception):
+    """Raised when the hashing queue is full, so the caller can shed load instead of piling up requests."""
+
+
+# werkzeug's defaults for the parameters a method string may leave out
+DEFAULT_SCRYPT_PARAMETERS = (2**15, 8, 1)
+
+
+def normalize_method(method):
+    """
+    Spells out every parameter werkzeug would fill in, giving the prefix it stores in front of the
+    hash ('pbkdf2' -> 'pbkdf2:sha256:<default iterations>', 'scrypt' -> 'scrypt:32768:8:1'), so a
+    stored hash can be compared to the configured method.
+    """
+    name, *args = method.split(':')
+    if name == 'pbkdf2' and len(args) <= 2:
+        hash_name = args[0] if args else 'sha256'
+        iterations = int(args[1]) if len(args) == 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    if name == 'scrypt' and len(args) in (0, 3):
+        n, r, p = map(int, args) if args else DEFAULT_SCRYPT_PARAMETERS
+        return f"scrypt:{n}:{r}:{p}"
+    raise ValueError(f"Unsupported password hash method: {method}")
+
+
+class PasswordHasher:
+    """
+    Hashes and checks passwords with a configurable cost.
+
+    backend='inline' hashes on the calling thread. backend='process' runs the hash in a process pool
+    of `workers` processes. That only isolates the GIL: the calling thread still waits for the
+    result, so a sync gunicorn worker is just as busy as with 'inline'; with threaded workers
+    (gthread) the worker's other threads keep running while a hash is computed.
+
+    With either backend, the admission control is the `max_pending` bound on hashes in flight
+    per process: beyond it callers wait up to `queue_timeout` seconds for a slot and then get
+    HashingBusyError (a 503), so bursts are shed instead of piling up behind the hashing.
+    """
+
+    def __init__(self, method='pbkdf2:sha256', backend='inline', workers=None, max_pending=32, queue_timeout=5.0):
+        if backend not in ('inline', 'process'):
+            raise ValueError(f"Unknown password hashing backend: {backend}")
+        self.method = normalize_method(method)
+        self.backend = backend
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        # Created on first use, and again after a fork, so each gunicorn worker owns its own pool
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HashingBusyError('Too many password hashing requests in progress')
+        try:
+            if self.backend == 'inline':
+                return function(*args)
+            # Blocks this thread until the pool returns the result (see the class docstring)
+            return self._get_pool().submit(function, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when a stored hash was made with a different method or cost than the configured one."""
+        try:
+            return normalize_method(password_hash.partition('$')[0]) != self.method
+        except ValueError:
+            return True
+
+    def shutdown(self):
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.shutdown()
+        self._pool = None
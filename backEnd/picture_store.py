@@ -0,0 +1,104 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Precomputed variants served by ?size=; the value is the longest side in pixels
+PICTURE_SIZES = {'small': 64, 'medium': 256}
+# Bytes read from the upload stream per step while it is hashed and written out
+CHUNK_SIZE = 64 * 1024
+# <sha256>.<ext> originals and <sha256>_<size>.<ext> variants; their content can never change
+CONTENT_ADDRESSED_NAME = re.compile(r'^([0-9a-f]{64}(?:_(?:%s))?)\.[A-Za-z0-9]+$' % '|'.join(PICTURE_SIZES))
+
+
+def save_upload(stream, folder, extension, chunk_size=CHUNK_SIZE):
+    """
+    Streams an upload into folder while hashing it and stores it as <sha256>.<extension>.
+    Identical uploads share one file. Returns (filename, created), where created is False
+    when the same content was already stored.
+    """
+    os.makedirs(folder, exist_ok=True)
+    digest = hashlib.sha256()
+    descriptor, temporary_path = tempfile.mkstemp(dir=folder, suffix='.upload')
+    try:
+        with os.fdopen(descriptor, 'wb') as temporary_file:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                temporary_file.write(chunk)
+
+        filename = f"{digest.hexdigest()}.{extension.lower()}"
+        path = os.path.join(folder, filename)
+        if os.path.exists(path):
+            os.remove(temporary_path)
+            return filename, False
+        os.replace(temporary_path, path)
+        return filename, True
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def content_hash_tag(filename):
+    """Returns the hash part of a content-addressed name (usable as its ETag), or None for any other name."""
+    match = CONTENT_ADDRESSED_NAME.match(filename)
+    return match.group(1) if match else None
+
+
+def variant_filename(filename, size):
+    stem, extension = os.path.splitext(filename)
+    return f"{stem}_{size}{extension}"
+
+
+def generate_variants(folder, filename):
+    """Writes every missing PICTURE_SIZES variant of folder/filename next to it."""
+    # Imported here so the app doesn't load Pillow until the first upload
+    from PIL import Image, ImageOps
+
+    with Image.open(os.path.join(folder, filename)) as original:
+        image_format = original.format
+        image = ImageOps.exif_transpose(original)
+        for size, pixels in PICTURE_SIZES.items():
+            path = os.path.join(folder, variant_filename(filename, size))
+            if os.path.exists(path):
+                continue
+            variant = image.copy()
+            variant.thumbnail((pixels, pixels))
+            if image_format == 'JPEG' and variant.mode not in ('RGB', 'L'):
+                variant = variant.convert('RGB')
+            # Same write-then-rename as the original, so the serving route never sees a partial file
+            temporary_path = f"{path}.tmp"
+            variant.save(temporary_path, format=image_format)
+            os.replace(temporary_path, path)
+
+
+class PictureVariantWorker:
+    """Generates picture variants on a small thread pool so uploads return without waiting for resizing."""
+
+    def __init__(self, workers=2):
+        self.workers = workers
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def submit(self, folder, filename):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='picture-variants')
+        return self._pool.submit(self._generate, folder, filename)
+
+    def _generate(self, folder, filename):
+        try:
+            generate_variants(folder, filename)
+        except Exception as e:
+            print(f"Error generating picture variants for {filename}: {e}")
+
+    def shutdown(self, wait=True):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
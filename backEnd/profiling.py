@@ -0,0 +1,180 @@
+import cProfile
+import glob
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app, g, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+PROFILE_MODES = ('off', 'cprofile', 'sampling')
+TOKEN_HEADER = 'X-Profile-Token'
+TOKEN_SALT = 'taste-tailor-profile-request'
+# Only one cProfile profiler can be active per process on newer Pythons, and two at once would skew each other
+_cprofile_lock = threading.Lock()
+
+
+def _serializer(secret_key):
+    return URLSafeTimedSerializer(secret_key, salt=TOKEN_SALT)
+
+
+def make_profile_token(secret_key, mode=None):
+    """A signed token for the X-Profile-Token header. mode overrides PROFILE_MODE for that request."""
+    return _serializer(secret_key).dumps({'mode': mode})
+
+
+def _token_mode(token, config):
+    """The profiler a valid header token asks for, or None when the token is invalid or expired."""
+    try:
+        payload = _serializer(config['SECRET_KEY']).loads(token, max_age=config['PROFILE_TOKEN_MAX_AGE'])
+    except BadSignature as e:
+        print(f"Ignoring invalid profile token: {e}")
+        return None
+    mode = payload.get('mode') or config['PROFILE_MODE']
+    return mode if mode in PROFILE_MODES[1:] else None
+
+
+class StackSampler:
+    """
+    Records the stack of one thread every interval seconds from a background thread, as counts of
+    collapsed stacks ("outer;...;inner count" lines, the input format of flamegraph.pl/speedscope).
+    Unlike cProfile it costs the profiled request nothing between samples.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            if stack:
+                key = ';'.join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            for stack, count in sorted(self.counts.items()):
+                file.write(f"{stack} {count}\n")
+
+
+def rotate_profiles(directory, max_bytes):
+    """Deletes the oldest profiles until the directory holds at most max_bytes."""
+    files = []
+    for path in glob.glob(os.path.join(directory, '*')):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def _profile_mode(config):
+    """Which profiler, if any, should run for the current request."""
+    endpoints = config['PROFILE_ENDPOINTS']
+    if endpoints and request.endpoint not in endpoints:
+        return None
+    token = request.headers.get(TOKEN_HEADER)
+    if token:
+        return _token_mode(token, config)
+    if config['PROFILE_SAMPLE_RATE'] > 0 and random.random() < config['PROFILE_SAMPLE_RATE']:
+        return config['PROFILE_MODE']
+    return None
+
+
+def start_profile():
+    config = current_app.config
+    mode = _profile_mode(config)
+    if mode == 'cprofile':
+        if not _cprofile_lock.acquire(blocking=False):
+            return
+        profiler = cProfile.Profile()
+        profiler.enable()
+    elif mode == 'sampling':
+        profiler = StackSampler(threading.get_ident(), config['PROFILE_SAMPLE_INTERVAL'] / 1000)
+        profiler.start()
+    else:
+        return
+    g.profile = (mode, profiler, time.perf_counter())
+
+
+def stop_profile(response=None):
+    """Stops the request's profiler, if any, and writes its file. Returns the file name."""
+    profile = g.pop('profile', None)
+    if profile is None:
+        return None
+    mode, profiler, started = profile
+    if mode == 'cprofile':
+        profiler.disable()
+        _cprofile_lock.release()
+    else:
+        profiler.stop()
+
+    config = current_app.config
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    extension = 'pstats' if mode == 'cprofile' else 'collapsed'
+    status = response.status_code if response is not None else 'error'
+    filename = (f"{datetime.now():%Y%m%dT%H%M%S}-{request.endpoint or 'unmatched'}-{status}-"
+                f"{elapsed_ms:.0f}ms-{os.getpid()}-{threading.get_ident()}.{extension}")
+    try:
+        os.makedirs(config['PROFILE_DIR'], exist_ok=True)
+        path = os.path.join(config['PROFILE_DIR'], filename)
+        if mode == 'cprofile':
+            profiler.dump_stats(path)
+        else:
+            profiler.write(path)
+        rotate_profiles(config['PROFILE_DIR'], config['PROFILE_MAX_BYTES'])
+    except OSError as e:
+        print(f"Error writing profile {filename}: {e}")
+        return None
+    return filename
+
+
+def init_profiling(app):
+    """
+    Installed when PROFILE_MODE isn't 'off'. Profiles requests that carry a valid X-Profile-Token
+    header (see `flask profile-token`), or a PROFILE_SAMPLE_RATE share of all requests, limited to
+    PROFILE_ENDPOINTS when set. The profile's file name is returned in the X-Profile-Id header.
+    Streamed response bodies are not included.
+    """
+    @app.before_request
+    def start_request_profile():
+        start_profile()
+
+    @app.after_request
+    def finish_request_profile(response):
+        filename = stop_profile(response)
+        if filename is not None:
+            response.headers['X-Profile-Id'] = filename
+        return response
+
+    @app.teardown_request
+    def stop_abandoned_profile(exception=None):
+        # after_request doesn't run when a request fails before producing a response
+        stop_profile()
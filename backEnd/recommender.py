@@ -0,0 +1,119 @@
+import numpy as np
+
+# Ratings are stored as integers from 0 (not rated yet) to 5
+MAX_RATING = 5.0
+# Weight given to a taste the user has ordered but never rated,
+# so it still ranks above tastes they have never tried
+UNRATED_TASTE_WEIGHT = 0.1
+
+
+def build_taste_index(taste_lists):
+    """Assigns a column number to every distinct taste, in first-seen order."""
+    taste_index = {}
+    for tastes in taste_lists:
+        for taste in tastes:
+            if taste not in taste_index:
+                taste_index[taste] = len(taste_index)
+    return taste_index
+
+
+def build_item_matrix(item_tastes, taste_index):
+    """
+    Builds an (items x tastes) float32 matrix with one L2-normalised row per menu item,
+    so items with many tastes don't outscore items with few.
+    """
+    matrix = np.zeros((len(item_tastes), len(taste_index)), dtype=np.float32)
+    for row, tastes in enumerate(item_tastes):
+        columns = [taste_index[taste] for taste in tastes if taste in taste_index]
+        matrix[row, columns] = 1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def build_user_vectors(order_users, order_tastes, order_ratings, n_users, taste_index):
+    """
+    Builds a (users x tastes) preference matrix from order history.
+
+    order_users holds the row (0..n_users-1) each order belongs to, order_tastes the list of
+    tastes selected on that order and order_ratings its rating. A taste's weight is the
+    highest rating the user gave an order containing it (the same rule recommendationMenu.tsx
+    used client side), scaled to 0..1.
+    """
+    # Flatten (order, taste) pairs so the per-taste max can be taken in one vectorised call
+    pair_users, pair_columns, pair_ratings = [], [], []
+    for user_row, tastes, rating in zip(order_users, order_tastes, order_ratings):
+        for taste in tastes:
+            column = taste_index.get(taste)
+            if column is not None:
+                pair_users.append(user_row)
+                pair_columns.append(column)
+                pair_ratings.append(rating or 0)
+
+    vectors = np.zeros((n_users, len(taste_index)), dtype=np.float32)
+    if not pair_users:
+        return vectors
+
+    pair_users = np.asarray(pair_users, dtype=np.intp)
+    pair_columns = np.asarray(pair_columns, dtype=np.intp)
+    weights = np.asarray(pair_ratings, dtype=np.float32) / MAX_RATING
+    np.maximum.at(vectors, (pair_users, pair_columns), np.maximum(weights, UNRATED_TASTE_WEIGHT))
+    return vectors
+
+
+# Items scored per block; keeps each intermediate score array small enough to stay in cache
+DEFAULT_BLOCK_SIZE = 8192
+
+
+def build_filter_mask(n_items, cuisine_codes=None, cuisine_code=None, price_levels=None, price_level=None,
+                      delivery_fees=None, max_delivery_fee=None):
+    """
+    Combines the optional catalog filters into one boolean mask over the items.
+    Returns None when no filter is set, so callers can skip masking entirely.
+    """
+    mask = None
+    for column, wanted in ((cuisine_codes, cuisine_code), (price_levels, price_level)):
+        if wanted is not None:
+            matches = column == wanted
+            mask = matches if mask is None else mask & matches
+    if max_delivery_fee is not None:
+        matches = delivery_fees <= max_delivery_fee
+        mask = matches if mask is None else mask & matches
+    if mask is not None and mask.shape[0] != n_items:
+        raise ValueError('filter columns must have one entry per item')
+    return mask
+
+
+def blocked_top_k(user_vector, item_matrix, k, mask=None, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Returns (indices, scores) of the k best items for one user, best first.
+
+    The catalog is scored block_size items at a time. Each block only scores the rows allowed by
+    mask, and keeps a running top-k with argpartition, so the full score array is never sorted.
+    """
+    n_items = item_matrix.shape[0]
+    best_indices = np.empty(0, dtype=np.intp)
+    best_scores = np.empty(0, dtype=np.float32)
+    if k <= 0:
+        return best_indices, best_scores
+
+    for start in range(0, n_items, block_size):
+        stop = min(start + block_size, n_items)
+        if mask is None:
+            block_indices = np.arange(start, stop)
+            block_scores = item_matrix[start:stop] @ user_vector
+        else:
+            block_indices = start + np.flatnonzero(mask[start:stop])
+            if block_indices.size == 0:
+                continue
+            block_scores = item_matrix[block_indices] @ user_vector
+
+        candidate_indices = np.concatenate([best_indices, block_indices])
+        candidate_scores = np.concatenate([best_scores, block_scores])
+        if candidate_scores.size > k:
+            keep = np.argpartition(-candidate_scores, k - 1)[:k]
+            candidate_indices, candidate_scores = candidate_indices[keep], candidate_scores[keep]
+        best_indices, best_scores = candidate_indices, candidate_scores
+
+    order = np.argsort(-best_scores, kind='stable')
+    return best_indices[order], best_scores[order]
@@ -0,0 +1,142 @@
+import os
+import threading
+
+import numpy as np
+
+# Rows of the similarity matrix computed at once; bounds memory to block_size x n_items floats
+DEFAULT_BLOCK_SIZE = 1024
+
+
+def neighbour_dtype(n_neighbours):
+    # One row per menu item: its id, then its neighbours' ids and scores, best first (-1 / 0 when padded)
+    return np.dtype([
+        ('item_id', np.int32),
+        ('neighbour_ids', np.int32, (n_neighbours,)),
+        ('scores', np.float32, (n_neighbours,)),
+    ])
+
+
+def count_co_purchases(orders, n_items):
+    """
+    Counts how often each pair of items was bought in the same order.
+    orders is an iterable of item-position lists. Returns (item_counts, pair_rows, pair_columns, pair_counts),
+    with each unordered pair listed in both directions.
+    """
+    item_counts = np.zeros(n_items, dtype=np.float32)
+    pairs = {}
+    for positions in orders:
+        positions = sorted(set(positions))
+        item_counts[positions] += 1
+        for a in range(len(positions)):
+            for b in range(a + 1, len(positions)):
+                key = (positions[a], positions[b])
+                pairs[key] = pairs.get(key, 0) + 1
+
+    if not pairs:
+        empty = np.empty(0, dtype=np.intp)
+        return item_counts, empty, empty, np.empty(0, dtype=np.float32)
+
+    keys = np.array(list(pairs.keys()), dtype=np.intp)
+    counts = np.array(list(pairs.values()), dtype=np.float32)
+    pair_rows = np.concatenate([keys[:, 0], keys[:, 1]])
+    pair_columns = np.concatenate([keys[:, 1], keys[:, 0]])
+    order = np.argsort(pair_rows, kind='stable')
+    return item_counts, pair_rows[order], pair_columns[order], np.concatenate([counts, counts])[order]
+
+
+def build_neighbour_table(item_ids, taste_matrix, co_purchases, n_neighbours, content_weight=0.5, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Computes each item's top n_neighbours most similar items.
+
+    Similarity is content_weight * taste cosine similarity plus (1 - content_weight) * co-purchase
+    cosine similarity (pair count / sqrt(count_a * count_b)). The matrix is scored block_size rows at a
+    time so the full items x items matrix is never held in memory.
+    """
+    item_ids = np.asarray(item_ids, dtype=np.int32)
+    n_items = len(item_ids)
+    item_counts, pair_rows, pair_columns, pair_counts = co_purchases
+    n_neighbours = min(n_neighbours, max(n_items - 1, 0))
+
+    table = np.zeros(n_items, dtype=neighbour_dtype(n_neighbours))
+    table['item_id'] = item_ids
+    table['neighbour_ids'] = -1
+    if n_neighbours == 0:
+        return table
+
+    count_norms = np.sqrt(item_counts)
+    for start in range(0, n_items, block_size):
+        stop = min(start + block_size, n_items)
+        block = content_weight * (taste_matrix[start:stop] @ taste_matrix.T)
+
+        # Scatter this block's co-purchase pairs into a dense block of the same shape
+        first, last = np.searchsorted(pair_rows, [start, stop])
+        if last > first:
+            rows, columns = pair_rows[first:last], pair_columns[first:last]
+            co_similarity = pair_counts[first:last] / (count_norms[rows] * count_norms[columns])
+            np.add.at(block, (rows - start, columns), (1 - content_weight) * co_similarity)
+
+        # An item is never its own neighbour
+        block[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+        candidates = np.argpartition(-block, n_neighbours - 1, axis=1)[:, :n_neighbours]
+        candidate_scores = np.take_along_axis(block, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind='stable')
+        candidates = np.take_along_axis(candidates, order, axis=1)
+        candidate_scores = np.take_along_axis(candidate_scores, order, axis=1)
+
+        # Items with nothing in common are padding, not neighbours
+        similar = candidate_scores > 0
+        table['neighbour_ids'][start:stop] = np.where(similar, item_ids[candidates], -1)
+        table['scores'][start:stop] = np.where(similar, candidate_scores, 0)
+
+    # Rows are kept sorted by item id so readers can binary search the memory map
+    return table[np.argsort(table['item_id'], kind='stable')]
+
+
+def save_neighbour_table(table, path):
+    # Write to a temporary file and rename it over the old table, so readers never see a partial file
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary_path = f"{path}.tmp.npy"
+    np.save(temporary_path, table)
+    os.replace(temporary_path, path)
+
+
+class NeighbourTable:
+    """
+    Read-only, memory-mapped view of a neighbour table written by save_neighbour_table.
+    The file is mapped lazily and remapped when it is replaced by a new build.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._table = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _current(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._table = np.load(self.path, mmap_mode='r')
+                    self._mtime = mtime
+        return self._table
+
+    def neighbours(self, item_id, limit=None):
+        """Returns [(neighbour_id, score), ...] for an item, best first, or None if the item isn't in the table."""
+        table = self._current()
+        if table is None:
+            return None
+        item_ids = table['item_id']
+        row = int(np.searchsorted(item_ids, item_id))
+        if row >= len(item_ids) or item_ids[row] != item_id:
+            return None
+
+        neighbour_ids = table['neighbour_ids'][row][:limit]
+        scores = table['scores'][row][:limit]
+        return [(int(neighbour_id), float(score)) for neighbour_id, score in zip(neighbour_ids, scores) if neighbour_id >= 0]
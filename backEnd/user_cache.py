@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask_login import UserMixin
+
+
+class UserRecord(UserMixin):
+    """
+    Read-only copy of the Users columns that request handlers read through current_user.
+    Cached in place of the ORM instance, so it never needs a session and carries no password hash.
+    """
+    __slots__ = ('id', 'firstName', 'lastName', 'email', 'profile_picture_filename', 'google_id', 'facebook_id',
+                 'data_version')
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError('UserRecord is read-only')
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(**{name: getattr(user, name) for name in cls.__slots__})
+
+    def __repr__(self):
+        return '<UserRecord %r>' % self.id
+
+
+class UserCache:
+    """
+    Per-worker LRU cache of UserRecords keyed by user id.
+
+    Entries expire ttl seconds after they were loaded, which bounds how stale another worker's copy
+    can get; within this worker, invalidate() drops an entry as soon as the user row changes.
+    At most max_size users are kept, least recently used first out.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Bumped by every invalidation, so a load that raced with one isn't cached
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id, load):
+        """Returns the cached record for user_id, calling load(user_id) to fill it on a miss or expiry."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self._generation
+
+        record = load(user_id)
+        if record is not None:
+            with self._lock:
+                if generation != self._generation:
+                    return record
+                self._entries[user_id] = (record, now + self.ttl)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return record
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
@@ -0,0 +1,4 @@
+# Entry point for gunicorn (see Procfile) and the `flask` CLI, which both look for `app` here
+from app import create_app
+
+app = create_app()
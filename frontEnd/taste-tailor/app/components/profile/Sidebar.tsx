@@ -120,7 +120,7 @@ const Sidebar: React.FC = () => {
             profilePicUrl = profilePictureCookie;
         } else {
             // Regular users get picture from upload directory
-            profilePicUrl = `http://localhost:5000/uploads/profile_pictures/${profilePictureCookie}`;
+            profilePicUrl = `http://localhost:5000/uploads/profile_pictures/${profilePictureCookie}?size=small`;
         }
     }
     setProfilePicture(profilePicUrl);
@@ -38,7 +38,7 @@ const PersonalInfoUpdate: React.FC<PersonalInfoUpdateProps> = ({ userFirstName,
     const [email, setEmail] = useState(userEmail);
     // Construct the initial profile picture URL, providing a fallback
     const [profilePicture, setProfilePicture] = useState(
-        userProfilePicture ? `http://localhost:5000/uploads/profile_pictures/${userProfilePicture}` : '/images/assets/profile.jpg'
+        userProfilePicture ? `http://localhost:5000/uploads/profile_pictures/${userProfilePicture}?size=medium` : '/images/assets/profile.jpg'
     );
     const [selectedFile, setSelectedFile] = useState<File | null>(null);
     // Use a state that can hold a string or an array of strings for error messages
@@ -244,7 +244,7 @@ const PersonalInfoUpdate: React.FC<PersonalInfoUpdateProps> = ({ userFirstName,
                  pictureUploadSuccess = true;
                  // Update the profile picture state with the new image URL
                  if (pictureData.filename) {
-                     const newImageUrl = `http://localhost:5000/uploads/profile_pictures/${pictureData.filename}`;
+                     const newImageUrl = `http://localhost:5000/uploads/profile_pictures/${pictureData.filename}?size=medium`;
                      setProfilePicture(newImageUrl); // Update the state with the permanent URL
                      setCookie(null, 'profilePictureFileName', pictureData.filename, { path: '/' });
                      // Append picture update success message if info update was also successful